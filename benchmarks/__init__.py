@@ -0,0 +1,3 @@
+"""
+Benchmarks de rendimiento y precisión de Fake Music Hunter
+"""
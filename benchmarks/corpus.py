@@ -0,0 +1,152 @@
+"""
+Generación del corpus sintético de benchmarks
+
+Cada archivo es ruido o una suma de tonos limitados en banda a una
+frecuencia de corte conocida, de modo que la clasificación esperada se
+conoce de antemano:
+
+- Corte en 16 kHz o 19 kHz: simula un origen con pérdidas (MP3 128/192
+  kbps) y el detector debe marcarlo (fake o sospechoso).
+- Corte en 20 kHz o banda completa: contenido sin pérdidas, debe salir
+  legítimo.
+"""
+
+import json
+from itertools import product
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import soundfile as sf
+
+
+# Especificación por defecto del corpus
+SAMPLE_RATES = (44100, 48000, 96000)
+CUTOFFS = (16000, 19000, 20000, None)   # None = banda completa
+SIGNALS = ('noise', 'tones')
+FORMATS = ('.wav', '.flac')
+DURATIONS = (5, 30)
+
+# Frecuencias de corte que simulan un origen con pérdidas
+LOSSY_CUTOFFS = (16000, 19000)
+
+MANIFEST_NAME = 'manifest.json'
+
+# Ganancia por canal (estéreo no idéntico, como la música real)
+CHANNEL_GAINS = (1.0, 0.8)
+
+
+def band_limited_noise(rng: np.random.Generator, sr: int, seconds: float,
+                       cutoff: Optional[int]) -> np.ndarray:
+    """
+    Ruido rosado con un corte abrupto en el dominio de la frecuencia
+
+    Args:
+        rng: Generador aleatorio
+        sr: Frecuencia de muestreo
+        seconds: Duración en segundos
+        cutoff: Frecuencia de corte en Hz (None = banda completa)
+
+    Returns:
+        np.ndarray: Señal mono normalizada a 0.5 de pico
+    """
+    n = int(sr * seconds)
+    spectrum = np.fft.rfft(rng.standard_normal(n))
+    frequencies = np.fft.rfftfreq(n, d=1.0 / sr)
+    if cutoff:
+        spectrum[frequencies > cutoff] = 0
+    spectrum /= np.sqrt(np.maximum(frequencies, 20.0))
+    signal = np.fft.irfft(spectrum, n)
+    return (signal / np.max(np.abs(signal)) * 0.5).astype(np.float32)
+
+
+def band_limited_tones(rng: np.random.Generator, sr: int, seconds: float,
+                       cutoff: Optional[int]) -> np.ndarray:
+    """
+    Suma de tonos repartidos hasta la frecuencia de corte, más un ruido de
+    fondo limitado a la misma banda
+
+    Args:
+        rng: Generador aleatorio
+        sr: Frecuencia de muestreo
+        seconds: Duración en segundos
+        cutoff: Frecuencia de corte en Hz (None = hasta 21.5 kHz)
+
+    Returns:
+        np.ndarray: Señal mono normalizada a 0.5 de pico
+    """
+    top = (cutoff or 21500) - 200
+    t = np.arange(int(sr * seconds)) / sr
+    signal = np.zeros_like(t)
+    for frequency in np.geomspace(55.0, top, 48):
+        signal += np.sin(2 * np.pi * frequency * t + rng.uniform(0, 2 * np.pi)) / np.sqrt(frequency)
+    signal = signal / np.max(np.abs(signal))
+    signal += band_limited_noise(rng, sr, seconds, cutoff) * 0.05
+    return (signal / np.max(np.abs(signal)) * 0.5).astype(np.float32)
+
+
+GENERATORS = {
+    'noise': band_limited_noise,
+    'tones': band_limited_tones,
+}
+
+
+def expected_class(cutoff: Optional[int]) -> str:
+    """Clasificación esperada: 'flagged' (fake o sospechoso) o 'legitimate'"""
+    return 'flagged' if cutoff in LOSSY_CUTOFFS else 'legitimate'
+
+
+def build_corpus(output_dir: str, sample_rates: Sequence[int] = SAMPLE_RATES,
+                 cutoffs: Sequence[Optional[int]] = CUTOFFS, signals: Sequence[str] = SIGNALS,
+                 formats: Sequence[str] = FORMATS, durations: Sequence[float] = DURATIONS,
+                 seed: int = 0) -> List[Dict]:
+    """
+    Genera el corpus (o reutiliza el existente si la especificación coincide)
+
+    Args:
+        output_dir: Directorio del corpus
+        sample_rates: Frecuencias de muestreo
+        cutoffs: Frecuencias de corte (None = banda completa)
+        signals: Tipos de señal ('noise', 'tones')
+        formats: Extensiones de salida ('.wav', '.flac')
+        durations: Duraciones en segundos
+        seed: Semilla del generador aleatorio
+
+    Returns:
+        list: Entradas del manifiesto (ruta, parámetros y clase esperada)
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = output_dir / MANIFEST_NAME
+
+    spec = {
+        'sample_rates': list(sample_rates), 'cutoffs': list(cutoffs),
+        'signals': list(signals), 'formats': list(formats),
+        'durations': list(durations), 'seed': seed,
+    }
+    if manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text(encoding='utf-8'))
+        if manifest['spec'] == spec and all((output_dir / e['file']).exists() for e in manifest['files']):
+            return manifest['files']
+
+    rng = np.random.default_rng(seed)
+    entries = []
+    for sr, cutoff, signal_type, seconds in product(sample_rates, cutoffs, signals, durations):
+        mono = GENERATORS[signal_type](rng, sr, seconds, cutoff)
+        stereo = np.stack([mono * gain for gain in CHANNEL_GAINS], axis=1)
+        stem = f"{signal_type}_{sr}_{cutoff or 'full'}_{seconds:g}s"
+        for extension in formats:
+            name = stem + extension
+            sf.write(str(output_dir / name), stereo, sr, subtype='PCM_16')
+            entries.append({
+                'file': name,
+                'signal': signal_type,
+                'sample_rate': sr,
+                'cutoff': cutoff,
+                'duration': seconds,
+                'format': extension,
+                'expected': expected_class(cutoff),
+            })
+
+    manifest_path.write_text(json.dumps({'spec': spec, 'files': entries}, indent=2), encoding='utf-8')
+    return entries
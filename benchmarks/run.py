@@ -0,0 +1,252 @@
+"""
+Benchmark de rendimiento y precisión sobre el corpus sintético
+
+Uso:
+    python -m benchmarks.run
+    python -m benchmarks.run --durations 5 --baseline output/benchmark_anterior.json
+"""
+
+import json
+import platform
+import subprocess
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import click
+import numpy as np
+
+from benchmarks.corpus import build_corpus, DURATIONS
+from src import config
+from src.analyzer import AudioAnalyzer
+from src.detector import FakeDetector
+from src.pipeline import analyze_file
+from src.spectral import accumulate, amplitude_to_db, dynamic_range, spectral_features
+
+
+DEFAULT_CORPUS_DIR = 'output/benchmark_corpus'
+
+# Etapas de AudioAnalyzer.analyze medidas por separado (el STFT y el RMS
+# comparten el enmarcado en SpectralAccumulator y se miden juntos; en el
+# análisis escalonado las características se calculan con el STFT de cada
+# nivel y cuentan en stft_rms)
+STAGES = ('metadata', 'load', 'stft_rms', 'features', 'detect')
+
+
+def time_stages(file_path: Path, options: Optional[Dict] = None) -> Dict[str, float]:
+    """
+    Analiza un archivo midiendo cada etapa por separado
+
+    Args:
+        file_path: Ruta al archivo de audio
+        options: Argumentos adicionales para AudioAnalyzer (los mismos
+            que la pasada completa)
+
+    Returns:
+        dict: Segundos de cada etapa de STAGES
+    """
+    timings = {}
+    analyzer = AudioAnalyzer(file_path, **(options or {}))
+
+    start = time.perf_counter()
+    metadata = analyzer.extract_metadata()
+    timings['metadata'] = time.perf_counter() - start
+
+    if analyzer.tiered and not analyzer.window_offsets():
+        # Cada nivel decodifica y acumula su tramo: el tiempo del STFT sale
+        # de la etapa 'features' del propio analizador
+        start = time.perf_counter()
+        analyzer.analyze_tiered(metadata)
+        elapsed = time.perf_counter() - start
+        spectral = analyzer.timer.stages.get('features', [0.0, 0.0])[0]
+        timings['load'] = elapsed - spectral
+        timings['stft_rms'] = spectral
+        timings['features'] = 0.0
+        features = analyzer.features
+    else:
+        start = time.perf_counter()
+        analyzer.load_audio()
+        timings['load'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        avg_spectrum, rms = accumulate(analyzer.audio_data, n_fft=config.FFT_SIZE,
+                                       hop_length=config.HOP_LENGTH,
+                                       segment_lengths=analyzer.segment_lengths,
+                                       center=analyzer.segment_lengths is None)
+        timings['stft_rms'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        spectrum_db = amplitude_to_db(avg_spectrum)
+        features = spectral_features(spectrum_db, analyzer.sr, n_fft=config.FFT_SIZE)
+        features['dynamic_range'] = dynamic_range(rms)
+        timings['features'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    FakeDetector.detect({**metadata, **features})
+    timings['detect'] = time.perf_counter() - start
+
+    return timings
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    """Media, p50, p95, máximo y total de una lista de tiempos (segundos)"""
+    values = np.asarray(values)
+    return {
+        'mean': float(values.mean()),
+        'p50': float(np.percentile(values, 50)),
+        'p95': float(np.percentile(values, 95)),
+        'max': float(values.max()),
+        'total': float(values.sum()),
+    }
+
+
+def git_revision() -> Optional[str]:
+    """Commit actual del repositorio, si está disponible"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(corpus_dir: str, durations, options: Dict) -> Dict:
+    """
+    Ejecuta el benchmark completo
+
+    Args:
+        corpus_dir: Directorio del corpus sintético
+        durations: Duraciones (s) de los archivos del corpus
+        options: Argumentos adicionales para AudioAnalyzer (etapas y
+            pasada completa)
+
+    Returns:
+        dict: Resultados (entorno, etapas, extremo a extremo y precisión)
+    """
+    import librosa
+
+    entries = build_corpus(corpus_dir, durations=durations)
+    paths = [Path(corpus_dir) / entry['file'] for entry in entries]
+
+    # Calentamiento (importaciones diferidas, cachés de librosa/scipy)
+    analyze_file(paths[0], options)
+
+    stage_times = defaultdict(list)
+    for file_path in paths:
+        for stage, seconds in time_stages(file_path, options).items():
+            stage_times[stage].append(seconds)
+
+    confusion = defaultdict(lambda: defaultdict(int))
+    misclassified = []
+    exact_hits = 0
+    start = time.perf_counter()
+    for entry, file_path in zip(entries, paths):
+        classification = analyze_file(file_path, options)['classification']
+        predicted = 'legitimate' if classification == config.CLASS_LEGITIMATE else 'flagged'
+        confusion[entry['expected']][classification] += 1
+        if predicted == entry['expected']:
+            exact_hits += 1
+        else:
+            misclassified.append({'file': entry['file'], 'expected': entry['expected'],
+                                  'classification': classification})
+    elapsed = time.perf_counter() - start
+
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+            'librosa': librosa.__version__,
+        },
+        'options': options,
+        'corpus': {
+            'directory': str(corpus_dir),
+            'files': len(entries),
+            'audio_seconds': float(sum(entry['duration'] for entry in entries)),
+        },
+        'stages': {stage: summarize(stage_times[stage]) for stage in STAGES},
+        'end_to_end': {
+            'seconds': elapsed,
+            'files_per_sec': len(entries) / elapsed,
+        },
+        'accuracy': {
+            'accuracy': exact_hits / len(entries),
+            'confusion': {expected: dict(row) for expected, row in confusion.items()},
+            'misclassified': misclassified,
+        },
+    }
+
+
+def compare(current: Dict, baseline: Dict) -> List[str]:
+    """
+    Compara dos resultados de benchmark
+
+    Returns:
+        list: Líneas con la variación de velocidad y precisión
+    """
+    lines = []
+    before = baseline['end_to_end']['files_per_sec']
+    after = current['end_to_end']['files_per_sec']
+    lines.append(f"Archivos/s: {before:.2f} -> {after:.2f} ({(after / before - 1) * 100:+.1f}%)")
+    for stage in STAGES:
+        if stage in baseline.get('stages', {}):
+            before = baseline['stages'][stage]['p50'] * 1000
+            after = current['stages'][stage]['p50'] * 1000
+            lines.append(f"  {stage:<9} p50: {before:8.2f} ms -> {after:8.2f} ms")
+    before = baseline['accuracy']['accuracy'] * 100
+    after = current['accuracy']['accuracy'] * 100
+    lines.append(f"Precisión: {before:.1f}% -> {after:.1f}%")
+    return lines
+
+
+@click.command()
+@click.option('--corpus', 'corpus_dir', type=click.Path(file_okay=False), default=DEFAULT_CORPUS_DIR,
+              help=f'Directorio del corpus sintético (default: {DEFAULT_CORPUS_DIR})')
+@click.option('--durations', type=float, multiple=True,
+              help=f'Duraciones en segundos de los archivos (default: {" ".join(map(str, DURATIONS))})')
+@click.option('--output', '-o', type=click.Path(dir_okay=False),
+              help='Archivo JSON de resultados (default: output/benchmark_<fecha>.json)')
+@click.option('--baseline', type=click.Path(exists=True, dir_okay=False),
+              help='Resultados anteriores con los que comparar')
+@click.option('--native-rate', is_flag=True, help='Analizar a la frecuencia nativa')
+@click.option('--tiered', is_flag=True, help='Análisis escalonado')
+@click.option('--windows', type=click.IntRange(min=0), default=0,
+              help='Analizar K ventanas repartidas por el archivo en lugar de los primeros segundos (0 = desactivado)')
+@click.option('--window-duration', type=click.FloatRange(min=0.5), default=config.SAMPLE_WINDOW_DURATION,
+              help=f'Segundos por ventana con --windows (default: {config.SAMPLE_WINDOW_DURATION})')
+def main(corpus_dir: str, durations: tuple, output: str, baseline: str,
+         native_rate: bool, tiered: bool, windows: int, window_duration: float):
+    """Mide velocidad por etapa, archivos/s y precisión sobre el corpus sintético"""
+    options = {'native_rate': native_rate, 'tiered': tiered}
+    if windows:
+        options.update(windows=windows, window_duration=window_duration)
+    results = run_benchmark(corpus_dir, durations or DURATIONS, options)
+
+    click.echo(f"Corpus: {results['corpus']['files']} archivos, "
+               f"{results['corpus']['audio_seconds']:.0f} s de audio")
+    for stage in STAGES:
+        stats = results['stages'][stage]
+        click.echo(f"  {stage:<9} p50 {stats['p50'] * 1000:8.2f} ms   p95 {stats['p95'] * 1000:8.2f} ms")
+    click.echo(f"Extremo a extremo: {results['end_to_end']['files_per_sec']:.2f} archivos/s")
+    click.echo(f"Precisión: {results['accuracy']['accuracy'] * 100:.1f}%")
+    for miss in results['accuracy']['misclassified']:
+        click.echo(f"  ✗ {miss['file']}: esperado {miss['expected']}, obtenido {miss['classification']}")
+
+    if baseline:
+        click.echo("\nComparación con " + baseline)
+        for line in compare(results, json.loads(Path(baseline).read_text(encoding='utf-8'))):
+            click.echo("  " + line)
+
+    if output is None:
+        output = Path(config.DEFAULT_OUTPUT_DIR) / f"benchmark_{datetime.now():%Y-%m-%d_%H-%M-%S}.json"
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2), encoding='utf-8')
+    click.echo(f"\nResultados guardados: {output}")
+
+
+if __name__ == '__main__':
+    main()
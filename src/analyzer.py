@@ -2,32 +2,94 @@
 Módulo para análisis espectral de archivos de audio
 """
 
+import io
 import librosa
 import numpy as np
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional
 from mutagen import File as MutagenFile
 from src.config import (
-    ANALYSIS_DURATION, SAMPLE_RATE, FFT_SIZE, 
-    HOP_LENGTH, MIN_FREQUENCY, MAX_FREQUENCY, ENERGY_THRESHOLD
+    ANALYSIS_DURATION, SAMPLE_RATE, FFT_SIZE, HOP_LENGTH, SAMPLE_WINDOW_DURATION,
+    WINDOW_CONTEXT, TIER_DURATIONS, LAME_LOWPASS_MARGIN, CLASS_FAKE, CLASS_LEGITIMATE
+)
+from src import decoder
+from src.detector import FakeDetector
+from src.mp3info import read_lame_info
+from src.profiling import StageTimer
+from src.spectral import (
+    SpectralAccumulator, amplitude_to_db, dynamic_range, extract_features,
+    extract_features_batch, spectral_features
 )
 
 
 class AudioAnalyzer:
     """Analiza archivos de audio para extraer características espectrales"""
     
-    def __init__(self, file_path: Path):
+    def __init__(self, file_path: Path, native_rate: bool = False, windows: int = 0,
+                 window_duration: float = SAMPLE_WINDOW_DURATION, prescreen: bool = True,
+                 tiered: bool = False, keep_spectrum: bool = False, data: Optional[bytes] = None):
         """
         Inicializa el analizador
         
         Args:
             file_path: Ruta al archivo de audio
+            native_rate: Si True, analiza a la frecuencia de muestreo del
+                archivo en lugar de remuestrear a SAMPLE_RATE
+            windows: Número de ventanas repartidas a lo largo del archivo
+                (0 = los primeros ANALYSIS_DURATION segundos)
+            window_duration: Duración de cada ventana en segundos
+            prescreen: Si True, los MP3 cuyo tag LAME ya es concluyente
+                se clasifican sin decodificar
+            tiered: Si True, analiza primero un fragmento corto y amplía
+                la duración (TIER_DURATIONS) solo si el veredicto es ambiguo
+            keep_spectrum: Si True, el resultado incluye el espectro medio
+                en dB ('spectrum', float16) para el almacén de espectros
+            data: Contenido del archivo ya leído en memoria (lectura
+                anticipada); si se indica, no se vuelve a leer del disco
         """
         self.file_path = file_path
+        self.data = data
+        self.native_rate = native_rate
+        self.windows = windows
+        self.window_duration = window_duration
+        self.prescreen = prescreen
+        self.tiered = tiered
+        self.keep_spectrum = keep_spectrum
         self.metadata = None
         self.audio_data = None
+        self.segment_lengths = None
         self.sr = None
+        self.features = None
+        self.spectrum_db = None
+        self.timer = StageTimer()
+    
+    def _decode(self, offset: float = 0.0, duration: Optional[float] = None) -> np.ndarray:
+        """
+        Decodifica un tramo del archivo a mono y lo remuestrea si hace falta
+        
+        Equivale a librosa.load(sr=SAMPLE_RATE), pero separa la
+        decodificación del remuestreo para medir cada etapa. WAV y FLAC
+        usan el decodificador propio (src.decoder): sin remuestreo, el
+        array devuelto es una vista de su buffer y solo es válido hasta la
+        siguiente decodificación.
+        
+        Args:
+            offset: Inicio del tramo en segundos
+            duration: Duración del tramo en segundos (None = hasta el final)
+            
+        Returns:
+            np.ndarray: Muestras del tramo (self.sr queda actualizado)
+        """
+        with self.timer.stage('decode'):
+            samples, native_sr = decoder.load(self.file_path, offset=offset, duration=duration,
+                                              data=self.data)
         
+        self.sr = native_sr if self.native_rate else SAMPLE_RATE
+        if native_sr != self.sr:
+            with self.timer.stage('resample'):
+                samples = librosa.resample(samples, orig_sr=native_sr, target_sr=self.sr)
+        return samples
+    
     def load_audio(self) -> bool:
         """
         Carga el archivo de audio
@@ -36,18 +98,81 @@ class AudioAnalyzer:
             bool: True si se cargó correctamente, False en caso contrario
         """
         try:
-            # Cargar solo los primeros ANALYSIS_DURATION segundos
-            self.audio_data, self.sr = librosa.load(
-                str(self.file_path),
-                sr=SAMPLE_RATE,
-                duration=ANALYSIS_DURATION,
-                mono=True
-            )
+            offsets = self.window_offsets()
+            
+            if not offsets:
+                # Cargar solo los primeros ANALYSIS_DURATION segundos
+                # (con native_rate se evita el remuestreo)
+                self.audio_data = self._decode(duration=ANALYSIS_DURATION)
+                self.segment_lengths = None
+                return True
+            
+            # Decodificar solo las ventanas; se concatenan, pero cada una se
+            # enmarca por separado (segment_lengths) para no crear saltos
+            segments = [self._decode_window(offset) for offset in offsets]
+            segments = [segment for segment in segments if len(segment) > 2 * (FFT_SIZE // 2)]
+            
+            self.audio_data = np.concatenate(segments)
+            self.segment_lengths = [len(segment) for segment in segments]
             return True
         except Exception as e:
             print(f"Error cargando {self.file_path}: {e}")
             return False
     
+    def _decode_window(self, offset: float) -> np.ndarray:
+        """
+        Decodifica una ventana con FFT_SIZE // 2 muestras de contexto real
+        a cada lado
+        
+        Los frames del borde de la ventana ven así la señal que la rodea
+        (no un escalón a cero que añadiría energía de banda ancha por
+        encima del corte real). Solo en el inicio o el final del archivo,
+        donde no hay contexto, se completa con ceros, como en el análisis
+        contiguo.
+        
+        Args:
+            offset: Inicio de la ventana en segundos
+            
+        Returns:
+            np.ndarray: Contexto + ventana + contexto (copia propia)
+        """
+        pad = FFT_SIZE // 2
+        start = max(offset - WINDOW_CONTEXT, 0.0)
+        samples = self._decode(offset=start, duration=offset - start + self.window_duration + WINDOW_CONTEXT)
+        
+        head = min(int(round((offset - start) * self.sr)), len(samples))
+        end = min(head + int(round(self.window_duration * self.sr)), len(samples))
+        left = samples[max(head - pad, 0):head]
+        right = samples[end:end + pad]
+        return np.concatenate([np.zeros(pad - len(left), dtype=np.float32), left, samples[head:end],
+                               right, np.zeros(pad - len(right), dtype=np.float32)])
+    
+    def window_offsets(self) -> List[float]:
+        """
+        Calcula el inicio de cada ventana de muestreo
+        
+        Las ventanas se centran en K posiciones equiespaciadas de la
+        duración del archivo (metadato 'length'). Si no hay duración o el
+        archivo es demasiado corto para las ventanas, devuelve una lista
+        vacía (análisis contiguo desde el inicio).
+        
+        Returns:
+            list: Offsets en segundos
+        """
+        if not self.windows:
+            return []
+        
+        length = (self.metadata or {}).get('length')
+        if not length or length <= self.windows * self.window_duration:
+            return []
+        
+        offsets = []
+        for i in range(self.windows):
+            center = length * (i + 0.5) / self.windows
+            offsets.append(min(max(center - self.window_duration / 2, 0.0),
+                               length - self.window_duration))
+        return offsets
+    
     def extract_metadata(self) -> Dict:
         """
         Extrae metadatos del archivo (bitrate, sample rate, etc.)
@@ -56,7 +181,12 @@ class AudioAnalyzer:
             dict: Diccionario con metadatos
         """
         try:
-            audio_file = MutagenFile(str(self.file_path))
+            if self.data is not None:
+                audio_file = MutagenFile(io.BytesIO(self.data))
+                file_size = len(self.data)
+            else:
+                audio_file = MutagenFile(str(self.file_path))
+                file_size = self.file_path.stat().st_size
             
             metadata = {
                 'format': self.file_path.suffix.lower(),
@@ -64,7 +194,7 @@ class AudioAnalyzer:
                 'sample_rate': getattr(audio_file.info, 'sample_rate', None),
                 'channels': getattr(audio_file.info, 'channels', None),
                 'length': getattr(audio_file.info, 'length', None),
-                'file_size': self.file_path.stat().st_size,
+                'file_size': file_size,
             }
             
             self.metadata = metadata
@@ -74,90 +204,156 @@ class AudioAnalyzer:
             print(f"Error extrayendo metadatos de {self.file_path}: {e}")
             return {}
     
-    def calculate_spectral_stats(self) -> Dict[str, Optional[float]]:
+    def prescreen_mp3(self, results: Dict) -> bool:
         """
-        Calcula estadísticas espectrales del archivo de audio
+        Pre-clasifica un MP3 a partir de su tag LAME, sin decodificar
         
-        Analiza la distribución de energía en diferentes rangos de frecuencia
-        para determinar si el archivo es lossless o convertido desde lossy.
+        El paso-bajo declarado por el codificador es una cota superior de
+        la frecuencia de corte real: si incluso con un margen por encima
+        de él el detector ya da FAKE, el análisis espectral no puede
+        cambiar el veredicto. En cualquier otro caso el archivo es ambiguo
+        y se escala al análisis completo.
         
+        Args:
+            results: Resultados parciales (metadatos); se completan con la
+                información del tag LAME
+            
         Returns:
-            dict: Diccionario con estadísticas espectrales
+            bool: True si el veredicto es concluyente y se puede omitir la
+                decodificación
+        """
+        if results.get('format') != '.mp3':
+            return False
+        
+        with self.timer.stage('prescreen'):
+            lame_info = read_lame_info(self.file_path, data=self.data)
+        if not lame_info:
+            return False
+        
+        results['lame_encoder'] = lame_info['encoder']
+        results['lame_lowpass'] = lame_info['lowpass']
+        results['lame_vbr_method'] = lame_info['vbr_method']
+        
+        lowpass = lame_info['lowpass']
+        if lowpass is None:
+            return False
+        
+        classification, _ = FakeDetector.detect_mp3({
+            **results,
+            'cutoff_frequency': lowpass + LAME_LOWPASS_MARGIN
+        })
+        if classification != CLASS_FAKE:
+            return False
+        
+        results['cutoff_frequency'] = float(lowpass)
+        results['cutoff_source'] = 'lame_header'
+        return True
+    
+    def analyze_tiered(self, results: Dict) -> bool:
         """
+        Analiza el archivo por niveles de duración creciente
+        
+        Decodifica solo el tramo nuevo de cada nivel y lo añade a un
+        acumulador espectral común, así que cada nivel reutiliza el trabajo
+        del anterior. Tras cada nivel se consulta al detector: un veredicto
+        LEGITIMATE es concluyente (un origen con pérdidas no genera el
+        contenido de alta frecuencia ya encontrado) y detiene el análisis;
+        cualquier otro se confirma con el nivel siguiente, ya que un
+        fragmento corto puede ser una intro silenciosa o filtrada.
+        
+        Args:
+            results: Resultados parciales (metadatos); se completan con las
+                características del último nivel analizado
+            
+        Returns:
+            bool: True si se analizó correctamente, False si hubo error
+        """
+        accumulator = SpectralAccumulator(n_fft=FFT_SIZE, hop_length=HOP_LENGTH)
+        chunk = accumulator.block_frames * HOP_LENGTH
+        start = 0.0
+        
+        try:
+            for tier, duration in enumerate(TIER_DURATIONS, start=1):
+                segment = self._decode(offset=start, duration=duration - start)
+                
+                with self.timer.stage('features'):
+                    for position in range(0, len(segment), chunk):
+                        accumulator.update(segment[position:position + chunk])
+                    
+                    avg_spectrum, rms = accumulator.result()
+                    self.spectrum_db = amplitude_to_db(avg_spectrum)
+                    self.features = spectral_features(self.spectrum_db, self.sr, n_fft=FFT_SIZE)
+                    self.features['dynamic_range'] = dynamic_range(rms)
+                
+                results['analysis_tier'] = tier
+                classification, _ = FakeDetector.detect({**results, **self.features})
+                
+                # Fin del archivo o veredicto concluyente
+                end_of_file = len(segment) < int((duration - start) * self.sr)
+                if classification == CLASS_LEGITIMATE or end_of_file:
+                    break
+                start = duration
+        except Exception as e:
+            print(f"Error cargando {self.file_path}: {e}")
+            return False
+        
+        return True
+    
+    def extract_features(self) -> Optional[Dict]:
+        """
+        Extrae en una sola pasada todas las características espectrales
+        (espectro medio, métricas de altas frecuencias y rango dinámico)
+        
+        Returns:
+            dict: Características calculadas, o None si hay error
+        """
+        if self.features is not None:
+            return self.features
+        
         if self.audio_data is None:
             if not self.load_audio():
-                return {
-                    'cutoff_frequency': None,
-                    'high_freq_energy': None,
-                    'spectral_presence': None
-                }
+                return None
         
         try:
-            # Calcular STFT (Short-Time Fourier Transform)
-            stft = librosa.stft(
-                self.audio_data,
-                n_fft=FFT_SIZE,
-                hop_length=HOP_LENGTH
-            )
-            
-            # Obtener magnitud del espectro
-            magnitude = np.abs(stft)
-            
-            # Promediar sobre el tiempo
-            avg_spectrum = np.mean(magnitude, axis=1)
-            
-            # Convertir a dB
-            spectrum_db = librosa.amplitude_to_db(avg_spectrum, ref=np.max)
-            
-            # Obtener frecuencias correspondientes
-            frequencies = librosa.fft_frequencies(sr=self.sr, n_fft=FFT_SIZE)
-            
-            # Calcular energía promedio en el rango de altas frecuencias (18-22 kHz)
-            high_freq_mask = (frequencies >= 18000) & (frequencies <= 22000)
-            high_freq_energy = np.mean(spectrum_db[high_freq_mask]) if np.any(high_freq_mask) else -100
-            
-            # Contar cuántos bins tienen energía significativa en altas frecuencias
-            # (por encima de -70 dB relativo)
-            significant_high_freq = np.sum(spectrum_db[high_freq_mask] > -70)
-            total_high_freq_bins = np.sum(high_freq_mask)
-            spectral_presence = (significant_high_freq / total_high_freq_bins * 100) if total_high_freq_bins > 0 else 0
-            
-            # Detección simple: ¿hay contenido significativo por encima de 20 kHz?
-            ultra_high_freq_mask = (frequencies >= 20000) & (frequencies <= 22000)
-            has_content_above_20k = np.any(spectrum_db[ultra_high_freq_mask] > -65) if np.any(ultra_high_freq_mask) else False
-            
-            # Buscar frecuencia de corte tradicional (para compatibilidad)
-            cutoff_freq = None
-            for i in range(len(frequencies) - 1, -1, -1):
-                if MIN_FREQUENCY <= frequencies[i] <= MAX_FREQUENCY:
-                    if spectrum_db[i] > ENERGY_THRESHOLD:
-                        cutoff_freq = frequencies[i]
-                        break
-            
-            # Si no encontramos con umbral estricto, intentar con uno más permisivo
-            if cutoff_freq is None:
-                relaxed_threshold = ENERGY_THRESHOLD - 20
-                for i in range(len(frequencies) - 1, -1, -1):
-                    if MIN_FREQUENCY <= frequencies[i] <= MAX_FREQUENCY:
-                        if spectrum_db[i] > relaxed_threshold:
-                            cutoff_freq = frequencies[i]
-                            break
-            
-            return {
-                'cutoff_frequency': cutoff_freq,
-                'high_freq_energy': float(high_freq_energy),
-                'spectral_presence': float(spectral_presence),
-                'has_content_above_20k': bool(has_content_above_20k)
-            }
+            with self.timer.stage('features'):
+                self.features, self.spectrum_db = extract_features(
+                    self.audio_data,
+                    self.sr,
+                    n_fft=FFT_SIZE,
+                    hop_length=HOP_LENGTH,
+                    segment_lengths=self.segment_lengths,
+                    # Las ventanas ya traen su contexto (_decode_window)
+                    center=self.segment_lengths is None
+                )
+            return self.features
             
         except Exception as e:
-            print(f"Error calculando estadísticas espectrales para {self.file_path}: {e}")
+            print(f"Error calculando características espectrales para {self.file_path}: {e}")
+            return None
+    
+    def calculate_spectral_stats(self) -> Dict[str, Optional[float]]:
+        """
+        Calcula estadísticas espectrales del archivo de audio
+        
+        Analiza la distribución de energía en diferentes rangos de frecuencia
+        para determinar si el archivo es lossless o convertido desde lossy.
+        
+        Returns:
+            dict: Diccionario con estadísticas espectrales
+        """
+        features = self.extract_features()
+        
+        if features is None:
             return {
                 'cutoff_frequency': None,
                 'high_freq_energy': None,
                 'spectral_presence': None,
-                'has_content_above_20k': False
+                'has_content_above_20k': False,
+                'has_hires_content': None,
+                'hires_presence': None
             }
+        
+        return {k: v for k, v in features.items() if k != 'dynamic_range'}
     
     def calculate_dynamic_range(self) -> Optional[float]:
         """
@@ -166,58 +362,148 @@ class AudioAnalyzer:
         Returns:
             float: Rango dinámico en dB, o None si hay error
         """
-        if self.audio_data is None:
-            if not self.load_audio():
-                return None
-        
-        try:
-            # Calcular RMS por frames
-            rms = librosa.feature.rms(y=self.audio_data, hop_length=HOP_LENGTH)[0]
-            
-            # Filtrar silencio
-            rms_nonzero = rms[rms > 0]
-            
-            if len(rms_nonzero) == 0:
-                return None
-            
-            # Convertir a dB
-            rms_db = librosa.amplitude_to_db(rms_nonzero)
-            
-            # Calcular rango dinámico
-            dynamic_range = np.max(rms_db) - np.min(rms_db)
-            
-            return float(dynamic_range)
-            
-        except Exception as e:
-            print(f"Error calculando dynamic range para {self.file_path}: {e}")
-            return None
+        features = self.extract_features()
+        return features['dynamic_range'] if features is not None else None
     
     def analyze(self) -> Dict:
         """
         Realiza un análisis completo del archivo
         
         Returns:
-            dict: Diccionario con todos los resultados del análisis
+            dict: Diccionario con todos los resultados del análisis, con
+                los tiempos por etapa en 'timings'
         """
+        with self.timer.stage('total'):
+            results = self._analyze()
+        results['timings'] = self.timer.as_dict()
+        self._attach_spectrum(results)
+        return results
+    
+    def _attach_spectrum(self, results: Dict):
+        """Añade el espectro medio en dB (float16) si se pidió keep_spectrum"""
+        if self.keep_spectrum and self.spectrum_db is not None:
+            results['spectrum'] = self.spectrum_db.astype(np.float16)
+    
+    def _analyze(self) -> Dict:
+        """Pasos del análisis completo (ver analyze())"""
         results = {
             'file_path': str(self.file_path),
             'file_name': self.file_path.name,
         }
         
         # Extraer metadatos
-        metadata = self.extract_metadata()
+        with self.timer.stage('metadata'):
+            metadata = self.extract_metadata()
         results.update(metadata)
         
+        # Pre-clasificación de MP3 por la cabecera LAME
+        if self.prescreen and self.prescreen_mp3(results):
+            return results
+        
+        # Análisis escalonado (solo en modo contiguo)
+        if self.tiered and not self.window_offsets():
+            if not self.analyze_tiered(results):
+                results['error'] = 'No se pudo cargar el archivo de audio'
+                return results
+        
         # Cargar audio
-        if not self.load_audio():
+        elif not self.load_audio():
             results['error'] = 'No se pudo cargar el archivo de audio'
             return results
         
-        # Calcular estadísticas espectrales (incluye cutoff_frequency)
-        spectral_stats = self.calculate_spectral_stats()
-        results.update(spectral_stats)
+        results['analysis_sample_rate'] = self.sr
         
-        # Calcular rango dinámico
+        # Calcular estadísticas espectrales (incluye cutoff_frequency)
+        # y rango dinámico en una sola pasada
+        results.update(self.calculate_spectral_stats())
         results['dynamic_range'] = self.calculate_dynamic_range()
         
         return results
+    
+    @staticmethod
+    def analyze_batch(file_paths: List[Path], contents: Optional[List[Optional[bytes]]] = None,
+                      **options) -> List[Dict]:
+        """
+        Analiza varios archivos compartiendo una FFT por lotes
+        
+        Decodifica los clips (todos a SAMPLE_RATE) en un buffer 2-D
+        preasignado, transforma sus frames juntos y reparte las
+        características de cada archivo. Pensado para librerías de pistas
+        cortas y sample packs, donde domina el coste fijo por archivo. Con
+        native_rate las frecuencias de muestreo difieren y cada archivo se
+        analiza por separado, igual que con el muestreo por ventanas y el
+        análisis escalonado.
+        
+        Args:
+            file_paths: Rutas a los archivos de audio
+            contents: Contenido ya leído de cada archivo (None = leer del disco)
+            **options: Argumentos adicionales para AudioAnalyzer
+            
+        Returns:
+            list: Resultados del análisis de cada archivo, en el mismo orden
+        """
+        contents = contents or [None] * len(file_paths)
+        if options.get('native_rate') or options.get('windows') or options.get('tiered'):
+            return [AudioAnalyzer(file_path, data=data, **options).analyze()
+                    for file_path, data in zip(file_paths, contents)]
+        
+        pad = FFT_SIZE // 2
+        max_samples = int(ANALYSIS_DURATION * SAMPLE_RATE)
+        buffer = np.zeros((len(file_paths), max_samples + 2 * pad), dtype=np.float32)
+        
+        all_results = []
+        loaded = []
+        for file_path, data in zip(file_paths, contents):
+            analyzer = AudioAnalyzer(file_path, data=data, **options)
+            results = {
+                'file_path': str(file_path),
+                'file_name': file_path.name,
+            }
+            with analyzer.timer.stage('metadata'):
+                results.update(analyzer.extract_metadata())
+            all_results.append((analyzer, results))
+            
+            if analyzer.prescreen and analyzer.prescreen_mp3(results):
+                continue
+            
+            if not analyzer.load_audio():
+                results['error'] = 'No se pudo cargar el archivo de audio'
+                continue
+            
+            # Copiar el clip a su fila y liberar el array decodificado
+            row = len(loaded)
+            length = min(len(analyzer.audio_data), max_samples)
+            buffer[row, pad:pad + length] = analyzer.audio_data[:length]
+            analyzer.audio_data = None
+            loaded.append((analyzer, results, length))
+        
+        if loaded:
+            batch_timer = StageTimer()
+            with batch_timer.stage('features'):
+                batch = extract_features_batch(
+                    buffer[:len(loaded)],
+                    [length for _, _, length in loaded],
+                    SAMPLE_RATE,
+                    n_fft=FFT_SIZE,
+                    hop_length=HOP_LENGTH
+                )
+            # La FFT por lotes se reparte a partes iguales entre los archivos
+            wall, cpu = batch_timer.stages['features']
+            
+            for (analyzer, results, _), (features, spectrum_db) in zip(loaded, batch):
+                analyzer.timer.add('features', wall / len(loaded), cpu / len(loaded))
+                analyzer.features, analyzer.spectrum_db = features, spectrum_db
+                results['analysis_sample_rate'] = analyzer.sr
+                results.update(analyzer.calculate_spectral_stats())
+                results['dynamic_range'] = analyzer.calculate_dynamic_range()
+                analyzer._attach_spectrum(results)
+        
+        for analyzer, results in all_results:
+            timings = analyzer.timer.as_dict()
+            timings['total'] = {
+                'wall': sum(stage['wall'] for stage in timings.values()),
+                'cpu': sum(stage['cpu'] for stage in timings.values())
+            }
+            results['timings'] = timings
+        
+        return [results for _, results in all_results]
@@ -0,0 +1,121 @@
+"""
+API de Python para integrar el detector sin pasar por la CLI
+
+Uso:
+    from src.api import analyze_paths
+
+    for result in analyze_paths(['a.flac', 'b.mp3'], jobs=4, tiered=True):
+        print(result['file_path'], result['classification'])
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Union
+from src.cache import AnalysisCache
+from src.dedup import find_duplicates, fan_out
+from src.featurestore import FeatureStore
+from src.pipeline import iter_results
+from src.config import DEFAULT_JOBS, DEFAULT_BATCH_SIZE, PREFETCH_THREADS, SAMPLE_WINDOW_DURATION
+
+
+# Opciones de AudioAnalyzer y su valor por defecto (todas forman parte
+# de la clave de cada entrada de caché, así que se normalizan siempre al
+# conjunto completo)
+DEFAULT_OPTIONS = {
+    'native_rate': False,
+    'windows': 0,
+    'window_duration': SAMPLE_WINDOW_DURATION,
+    'prescreen': True,
+    'tiered': False,
+}
+
+
+def analysis_options(**options) -> Dict:
+    """
+    Completa las opciones del análisis con sus valores por defecto
+
+    Args:
+        **options: Opciones de AudioAnalyzer (native_rate, windows,
+            window_duration, prescreen, tiered)
+
+    Returns:
+        dict: Todas las opciones de DEFAULT_OPTIONS
+
+    Raises:
+        TypeError: Si alguna opción no existe
+    """
+    unknown = set(options) - set(DEFAULT_OPTIONS)
+    if unknown:
+        raise TypeError(f"Opciones de análisis desconocidas: {', '.join(sorted(unknown))}")
+    return {**DEFAULT_OPTIONS, **options}
+
+
+def open_cache(db_path: str, **options) -> AnalysisCache:
+    """
+    Abre una caché de análisis para las opciones dadas
+
+    La caché solo devuelve resultados calculados con las mismas opciones,
+    así que debe abrirse con las que se pasarán a analyze_paths(). Las
+    opciones forman parte de la clave de cada entrada, no del hash de
+    parámetros de src/config.py: ejecuciones con opciones distintas
+    comparten el archivo sin pisarse, y el mantenimiento (evict) no
+    necesita conocerlas.
+
+    Args:
+        db_path: Ruta del archivo SQLite
+        **options: Opciones del análisis (ver analysis_options)
+
+    Returns:
+        AnalysisCache: Caché abierta (cerrar con close() o usar con with)
+    """
+    return AnalysisCache(db_path, options=analysis_options(**options))
+
+
+def analyze_paths(paths: Iterable[Union[str, Path]], jobs: int = DEFAULT_JOBS,
+                  ordered: bool = False, batch_size: int = DEFAULT_BATCH_SIZE,
+                  cache: Optional[AnalysisCache] = None, dedup: bool = False,
+                  prefetch: int = 0, io_threads: int = PREFETCH_THREADS,
+                  features: Optional[FeatureStore] = None, **options) -> Iterator[Dict]:
+    """
+    Analiza y clasifica archivos de audio, generando cada resultado en
+    cuanto está listo
+
+    Las rutas se consumen de forma perezosa (pueden venir de un escaneo
+    en curso), salvo con dedup, que agrupa la lista completa al llamar. Las
+    rejillas de frecuencias, bandas y ventanas se calculan una vez por
+    proceso y se reutilizan entre archivos y llamadas.
+
+    Args:
+        paths: Rutas de los archivos (str o Path)
+        jobs: Procesos de análisis (1 = en el proceso actual)
+        ordered: Con jobs > 1, generar los resultados en el orden de entrada
+        batch_size: Archivos por lote de FFT (>1 para pistas cortas)
+        cache: Caché abierta con open_cache() y las mismas opciones (opcional)
+        dedup: Si True, los archivos con contenido idéntico se analizan
+            una sola vez y las copias llevan 'duplicate_of'
+        prefetch: Bytes leídos por adelantado en hilos de E/S mientras se
+            analiza (0 = desactivado; útil en almacenamiento de red). Los
+            archivos se leen completos; se ignora con la opción windows
+        io_threads: Hilos de E/S de la lectura anticipada
+        features: Almacén de espectros abierto con FeatureStore(), para
+            reclasificar después sin decodificar (opcional; con dedup solo
+            se guardan los originales)
+        **options: Opciones del análisis (native_rate, windows,
+            window_duration, prescreen, tiered)
+
+    Returns:
+        Iterator: Resultado de cada archivo, con 'classification' y 'reason'
+
+    Raises:
+        TypeError: Si alguna opción no existe (al llamar, no al iterar)
+    """
+    options = analysis_options(**options)
+    files = (Path(path) for path in paths)
+
+    duplicates = None
+    if dedup:
+        files, duplicates = find_duplicates(files)
+
+    results = iter_results(files, jobs=jobs, ordered=ordered, batch_size=batch_size,
+                           options=options, cache=cache, prefetch=prefetch, io_threads=io_threads,
+                           features=features)
+    return fan_out(results, duplicates)
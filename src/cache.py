@@ -0,0 +1,235 @@
+"""
+Módulo de caché persistente de análisis (SQLite)
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Optional
+from src import config
+
+
+# Parámetros que afectan al resultado del análisis; si cambia alguno,
+# las entradas almacenadas dejan de ser válidas. ANALYSIS_VERSION cubre los
+# cambios en el código de decodificación y STFT, que no tienen constante propia
+CACHE_PARAMS = [
+    'ANALYSIS_VERSION', 'ANALYSIS_DURATION', 'SAMPLE_RATE', 'FFT_SIZE', 'HOP_LENGTH', 'RMS_FRAME_LENGTH',
+    'MIN_FREQUENCY', 'MAX_FREQUENCY', 'ENERGY_THRESHOLD',
+    'CUTOFF_THRESHOLDS', 'SUSPICIOUS_THRESHOLD', 'FLAC_SUSPICIOUS_THRESHOLD',
+    'TIER_DURATIONS', 'WINDOW_CONTEXT', 'LAME_LOWPASS_MARGIN', 'HIRES_SAMPLE_RATE', 'HIRES_BAND_MIN',
+]
+
+# Claves del resultado que no se almacenan (se recalculan al leer o,
+# como los tiempos, solo tienen sentido en la ejecución que los midió)
+NON_CACHED_KEYS = ('classification', 'reason', 'timings')
+
+
+def analysis_params_hash() -> str:
+    """
+    Calcula un hash de los parámetros de análisis de src/config.py
+
+    Returns:
+        str: Hash hexadecimal de los parámetros
+    """
+    params = {name: getattr(config, name) for name in CACHE_PARAMS}
+    payload = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def options_key(options: Optional[Dict] = None) -> str:
+    """
+    Clave de las opciones del análisis (JSON con las claves ordenadas)
+
+    Args:
+        options: Opciones adicionales del análisis que alteran el resultado
+
+    Returns:
+        str: Clave de las opciones ('{}' sin opciones)
+    """
+    return json.dumps(options or {}, sort_keys=True, default=str)
+
+
+class AnalysisCache:
+    """
+    Caché en disco de resultados de análisis por archivo
+
+    Cada entrada se identifica por la ruta y las opciones del análisis
+    (ejecuciones con opciones distintas no se pisan) y guarda el hash de
+    los parámetros de src/config.py con que se calculó: si no coincide
+    con el actual, la entrada está obsoleta para cualquier conjunto de
+    opciones, así que evict() no necesita conocerlas.
+    """
+
+    def __init__(self, db_path: str, options: Optional[Dict] = None):
+        """
+        Abre (o crea) la base de datos de caché
+
+        Las cachés con el esquema anterior (sin columna de opciones) se
+        vacían: sus entradas no indican con qué opciones se calcularon.
+
+        Args:
+            db_path: Ruta del archivo SQLite
+            options: Opciones adicionales del análisis incluidas en la clave
+                (basta con omitirlas para mantenimiento: evict, vacuum)
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.params_hash = analysis_params_hash()
+        self.options = options_key(options)
+        self.hits = 0
+        self.misses = 0
+        self._pending_writes = 0
+
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        columns = [row[1] for row in self.conn.execute('PRAGMA table_info(analysis)')]
+        if columns and 'options' not in columns:
+            self.conn.execute('DROP TABLE analysis')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS analysis ('
+            ' path TEXT NOT NULL,'
+            ' options TEXT NOT NULL,'
+            ' size INTEGER NOT NULL,'
+            ' mtime_ns INTEGER NOT NULL,'
+            ' params TEXT NOT NULL,'
+            ' data TEXT NOT NULL,'
+            ' updated REAL NOT NULL,'
+            ' PRIMARY KEY (path, options))'
+        )
+        self.conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @staticmethod
+    def _key(file_path: Path):
+        """Devuelve (ruta absoluta, tamaño, mtime_ns) del archivo"""
+        stat = file_path.stat()
+        return str(file_path.absolute()), stat.st_size, stat.st_mtime_ns
+
+    def get(self, file_path: Path) -> Optional[Dict]:
+        """
+        Busca el análisis almacenado de un archivo
+
+        Args:
+            file_path: Ruta al archivo de audio
+
+        Returns:
+            dict: Análisis almacenado, o None si no hay entrada válida
+        """
+        try:
+            path, size, mtime_ns = self._key(file_path)
+        except OSError:
+            self.misses += 1
+            return None
+
+        row = self.conn.execute(
+            'SELECT size, mtime_ns, params, data FROM analysis WHERE path = ? AND options = ?',
+            (path, self.options)
+        ).fetchone()
+
+        if row is None or row[0] != size or row[1] != mtime_ns or row[2] != self.params_hash:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        analysis = json.loads(row[3])
+        # La ruta puede diferir (relativa/absoluta) de la usada al guardar
+        analysis['file_path'] = str(file_path)
+        analysis['file_name'] = file_path.name
+        return analysis
+
+    def put(self, file_path: Path, result: Dict):
+        """
+        Guarda el análisis de un archivo
+
+        Los resultados con error no se guardan, para reintentarlos en la
+        siguiente ejecución.
+
+        Args:
+            file_path: Ruta al archivo de audio
+            result: Resultado del análisis
+        """
+        if 'error' in result:
+            return
+
+        try:
+            path, size, mtime_ns = self._key(file_path)
+        except OSError:
+            return
+
+        analysis = {k: v for k, v in result.items() if k not in NON_CACHED_KEYS}
+        self.conn.execute(
+            'INSERT OR REPLACE INTO analysis (path, options, size, mtime_ns, params, data, updated) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (path, self.options, size, mtime_ns, self.params_hash,
+             json.dumps(analysis, ensure_ascii=False), time.time())
+        )
+
+        self._pending_writes += 1
+        if self._pending_writes >= config.CACHE_COMMIT_EVERY:
+            self.conn.commit()
+            self._pending_writes = 0
+
+    def commit(self):
+        """Confirma las escrituras pendientes"""
+        self.conn.commit()
+        self._pending_writes = 0
+
+    def evict(self, older_than_days: Optional[float] = None) -> int:
+        """
+        Elimina entradas obsoletas
+
+        Una entrada es obsoleta si fue calculada con otros parámetros de
+        src/config.py, si el archivo ya no existe o cambió, o si es más
+        antigua que el límite. Las opciones del análisis no cuentan: se
+        conservan las entradas válidas de todas ellas.
+
+        Args:
+            older_than_days: Antigüedad máxima en días (opcional)
+
+        Returns:
+            int: Número de entradas eliminadas
+        """
+        stale = []
+        limit = time.time() - older_than_days * 86400 if older_than_days is not None else None
+        files = {}
+
+        rows = self.conn.execute('SELECT path, options, size, mtime_ns, params, updated FROM analysis')
+        for path, options, size, mtime_ns, params, updated in rows.fetchall():
+            if params != self.params_hash or (limit is not None and updated < limit):
+                stale.append((path, options))
+                continue
+            if path not in files:
+                try:
+                    stat = Path(path).stat()
+                    files[path] = (stat.st_size, stat.st_mtime_ns)
+                except OSError:
+                    files[path] = None
+            if files[path] != (size, mtime_ns):
+                stale.append((path, options))
+
+        self.conn.executemany('DELETE FROM analysis WHERE path = ? AND options = ?', stale)
+        self.conn.commit()
+        return len(stale)
+
+    def vacuum(self):
+        """Compacta el archivo de la base de datos"""
+        self.conn.commit()
+        self.conn.execute('VACUUM')
+
+    def __len__(self) -> int:
+        return self.conn.execute('SELECT COUNT(*) FROM analysis').fetchone()[0]
+
+    def close(self):
+        """Confirma las escrituras pendientes y cierra la conexión"""
+        if self.conn is not None:
+            self.conn.commit()
+            self.conn.close()
+            self.conn = None
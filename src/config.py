@@ -21,21 +21,75 @@ FLAC_SUSPICIOUS_THRESHOLD = 3000  # Hz de margen más amplio para FLAC
 SUPPORTED_FORMATS = ['.mp3', '.flac', '.wav']
 
 # Parámetros de análisis
+ANALYSIS_VERSION = 1        # Versión del algoritmo de decodificación/STFT; subirla al cambiarlo invalida la caché
 ANALYSIS_DURATION = 30      # Segundos de audio a analizar (muestra)
 SAMPLE_RATE = 44100         # Sample rate para análisis
 FFT_SIZE = 4096             # Tamaño de la ventana FFT
 HOP_LENGTH = 512            # Hop length para STFT
+RMS_FRAME_LENGTH = 2048     # Longitud de frame para el RMS (rango dinámico)
+STFT_BLOCK_FRAMES = 32      # Frames STFT por bloque (acota la memoria)
+DECODE_BLOCK_FRAMES = 65536 # Frames convertidos por bloque al decodificar WAV/FLAC
+SAMPLE_WINDOW_DURATION = 3  # Segundos por ventana en el muestreo por ventanas
+WINDOW_CONTEXT = 0.2        # Segundos decodificados a cada lado de una ventana (contexto de sus frames del borde)
+TIER_DURATIONS = (5, 15, ANALYSIS_DURATION)  # Segundos analizados en cada nivel (modo escalonado)
+
+# Parámetros de ejecución
+DEFAULT_JOBS = 1            # Procesos de análisis (1 = secuencial)
+MAX_PENDING_PER_JOB = 4     # Tareas en vuelo por proceso en modo paralelo
+DEFAULT_BATCH_SIZE = 1      # Archivos por lote de FFT (1 = sin lotes)
+DEFAULT_SCAN_WORKERS = 4    # Hilos que recorren directorios en paralelo
+
+# Lectura anticipada (--prefetch)
+PREFETCH_THREADS = 4        # Hilos de E/S que leen por adelantado
+PREFETCH_MAX_FILE = 64 * 1024 * 1024  # Bytes; los archivos mayores los lee el análisis
+
+# Estimación de --dry-run: segundos de análisis por archivo en un proceso
+# (pista de 4 min, primeros ANALYSIS_DURATION segundos)
+ESTIMATED_SECONDS_PER_FILE = {'.mp3': 0.15, '.flac': 0.14, '.wav': 0.10}
+
+# Detección de duplicados (--dedup)
+DEDUP_SAMPLE_BLOCKS = 4      # Bloques muestreados por archivo para la huella rápida
+DEDUP_BLOCK_SIZE = 65536     # Bytes por bloque muestreado
+DEDUP_HASH_CHUNK = 1048576   # Bytes por lectura del hash completo
+
+# Modo vigilancia (--watch)
+WATCH_INTERVAL = 60         # Segundos entre sondeos
+WATCH_SWEEP_EVERY = 10      # Sondeos entre revisiones completas de archivos
+DEFAULT_WATCH_REPORT = 'output/report_watch.csv'
+
+# Caché de análisis
+DEFAULT_CACHE_PATH = 'output/analysis_cache.db'
+CACHE_COMMIT_EVERY = 100    # Escrituras por transacción
+RECLASSIFY_BATCH = 4096     # Resultados por lote de FakeDetector.detect_batch (tools reclassify)
 
 # Frecuencias de referencia
 MIN_FREQUENCY = 16000       # Frecuencia mínima para análisis de corte
 MAX_FREQUENCY = 22050       # Frecuencia máxima (Nyquist para 44.1kHz)
 
+# Pre-clasificación de MP3 por el tag LAME: margen (Hz) sobre el paso-bajo
+# declarado que debe seguir dando FAKE para omitir la decodificación
+LAME_LOWPASS_MARGIN = 1000
+
+# Archivos hi-res (solo con análisis a frecuencia nativa)
+HIRES_SAMPLE_RATE = 48000   # Por encima de esta frecuencia se considera hi-res
+HIRES_BAND_MIN = 24000      # Contenido esperado entre esta frecuencia y Nyquist
+
 # Umbral de energía espectral (dB)
 ENERGY_THRESHOLD = -60      # Threshold para considerar que hay contenido real
 
 # Configuración de reportes
 REPORT_FORMATS = ['console', 'csv', 'json']
 DEFAULT_OUTPUT_DIR = 'output'
+REPORT_FLUSH_EVERY = 100    # Filas entre volcados a disco de los reportes incrementales
+PARQUET_ROW_GROUP = 50000   # Filas por grupo del reporte Parquet (memoria máxima del escritor)
+JOURNAL_SYNC_INTERVAL = 2.0 # Segundos máximos entre fsync del journal (--journal/--resume)
+
+# Modos de salida de la consola
+OUTPUT_INTERACTIVE = 'interactive'  # Barra de progreso y resultados con rich
+OUTPUT_BATCH = 'batch'              # Texto plano agrupado (logs, cron, redirecciones)
+OUTPUT_QUIET = 'quiet'              # Solo resumen y reportes
+BATCH_FLUSH_INTERVAL = 2.0          # Segundos entre volcados de líneas en modo batch
+BATCH_PROGRESS_INTERVAL = 10.0      # Segundos entre líneas de progreso en modo batch
 
 # Estados de clasificación
 CLASS_LEGITIMATE = 'legitimate'
@@ -0,0 +1,277 @@
+"""
+Módulo de decodificación de audio sin copias intermedias para WAV y FLAC
+"""
+
+import io
+import struct
+import threading
+import librosa
+import numpy as np
+import soundfile as sf
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from src.config import DECODE_BLOCK_FRAMES
+
+
+# Formatos con decodificador propio (el resto pasa por librosa)
+LOSSLESS_FORMATS = ('.wav', '.flac')
+
+# Códigos de formato de la cabecera fmt de un WAV
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# (código, bits por muestra) -> (dtype en disco, factor a float32); el
+# factor es el mismo que aplica libsndfile, así que el resultado coincide
+# bit a bit con librosa.load
+WAV_DTYPES = {
+    (WAVE_FORMAT_PCM, 16): (np.dtype('<i2'), 1.0 / 0x8000),
+    (WAVE_FORMAT_PCM, 32): (np.dtype('<i4'), 1.0 / 0x80000000),
+    (WAVE_FORMAT_IEEE_FLOAT, 32): (np.dtype('<f4'), None),
+}
+
+
+def parse_wav_header(data: bytes) -> Optional[Dict]:
+    """
+    Localiza el bloque de muestras de un WAV en sus primeros bytes
+
+    Args:
+        data: Primeros bytes del archivo (cabecera RIFF)
+
+    Returns:
+        dict: format_tag, channels, sample_rate, bits, data_offset y
+            data_size, o None si no es un WAV o no se encuentra el bloque
+            'data' en data
+    """
+    if len(data) < 12 or data[:4] != b'RIFF' or data[8:12] != b'WAVE':
+        return None
+
+    info = {}
+    position = 12
+    while position + 8 <= len(data):
+        chunk_id, chunk_size = struct.unpack_from('<4sI', data, position)
+        body = position + 8
+
+        if chunk_id == b'fmt ' and body + 16 <= len(data):
+            format_tag, channels, sample_rate, _, _, bits = struct.unpack_from('<HHIIHH', data, body)
+            if format_tag == WAVE_FORMAT_EXTENSIBLE and chunk_size >= 40 and body + 26 <= len(data):
+                # El código real son los dos primeros bytes del GUID del subformato
+                format_tag = struct.unpack_from('<H', data, body + 24)[0]
+            info.update(format_tag=format_tag, channels=channels,
+                        sample_rate=sample_rate, bits=bits)
+        elif chunk_id == b'data':
+            if 'format_tag' not in info:
+                return None
+            info.update(data_offset=body, data_size=chunk_size)
+            return info
+
+        # Los bloques se alinean a 2 bytes
+        position = body + chunk_size + (chunk_size & 1)
+
+    return None
+
+
+class PCMDecoder:
+    """
+    Decodifica WAV y FLAC a mono float32 en buffers reutilizables
+
+    Los WAV PCM de 16/32 bits y float de 32 bits se leen a través de un
+    memmap del bloque de muestras (sin copiarlo a memoria de Python); el
+    resto de WAV y los FLAC se leen con soundfile directamente a un buffer
+    de bloque. En ambos casos la mezcla a mono se escribe en un buffer de
+    salida que se reutiliza entre archivos, así que decodificar no reserva
+    memoria nueva salvo para crecer.
+
+    Si el archivo ya está en memoria (lectura anticipada), los WAV se
+    leen con una vista sobre sus bytes en lugar del memmap.
+
+    El array devuelto es una vista de ese buffer: es válido hasta la
+    siguiente llamada a decode() del mismo decodificador.
+    """
+
+    def __init__(self, block_frames: int = DECODE_BLOCK_FRAMES):
+        """
+        Inicializa el decodificador
+
+        Args:
+            block_frames: Frames convertidos por bloque (acota el buffer
+                intermedio multicanal)
+        """
+        self.block_frames = block_frames
+        self._mono = np.empty(0, dtype=np.float32)
+        self._block = np.empty(0, dtype=np.float32)
+
+    def _buffers(self, frames: int, channels: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Devuelve buffers de al menos el tamaño pedido, creciendo si hace falta
+
+        Returns:
+            tuple: (vista mono de frames muestras, vista de bloque
+                (block_frames, channels))
+        """
+        if len(self._mono) < frames:
+            self._mono = np.empty(frames, dtype=np.float32)
+        block_size = self.block_frames * channels
+        if len(self._block) < block_size:
+            self._block = np.empty(block_size, dtype=np.float32)
+        return self._mono[:frames], self._block[:block_size].reshape(self.block_frames, channels)
+
+    @staticmethod
+    def _span(total: int, sample_rate: int, offset: float,
+              duration: Optional[float]) -> Tuple[int, int]:
+        """Primer frame y número de frames del tramo, igual que librosa.load"""
+        start = min(int(offset * sample_rate), total) if offset else 0
+        frames = total - start if duration is None else int(duration * sample_rate)
+        return start, max(min(frames, total - start), 0)
+
+    def decode(self, file_path: Path, offset: float = 0.0, duration: Optional[float] = None,
+               data: Optional[bytes] = None) -> Tuple[np.ndarray, int]:
+        """
+        Decodifica un tramo a mono a la frecuencia nativa
+
+        Args:
+            file_path: Ruta a un archivo WAV o FLAC
+            offset: Inicio del tramo en segundos
+            duration: Duración del tramo en segundos (None = hasta el final)
+            data: Contenido del archivo ya leído (opcional)
+
+        Returns:
+            tuple: (muestras float32, frecuencia de muestreo)
+        """
+        if Path(file_path).suffix.lower() == '.wav':
+            decoded = self._decode_wav(file_path, offset, duration, data)
+            if decoded is not None:
+                return decoded
+        return self._decode_soundfile(file_path, offset, duration, data)
+
+    def _decode_wav(self, file_path: Path, offset: float, duration: Optional[float],
+                    data: Optional[bytes] = None) -> Optional[Tuple[np.ndarray, int]]:
+        """
+        Decodifica un WAV mapeando su bloque de muestras en memoria
+
+        Returns:
+            tuple: (muestras, frecuencia), o None si la codificación no es
+                de las que admiten memmap (24 bits, ADPCM...)
+        """
+        if data is not None:
+            header = parse_wav_header(data[:4096])
+        else:
+            with open(file_path, 'rb') as f:
+                header = parse_wav_header(f.read(4096))
+        if header is None or header['channels'] < 1:
+            return None
+        encoding = WAV_DTYPES.get((header['format_tag'], header['bits']))
+        if encoding is None:
+            return None
+
+        dtype, scale = encoding
+        channels = header['channels']
+        sample_rate = header['sample_rate']
+        frame_bytes = dtype.itemsize * channels
+        # Un bloque 'data' truncado declara más bytes de los que hay
+        file_size = len(data) if data is not None else Path(file_path).stat().st_size
+        available = file_size - header['data_offset']
+        total = min(header['data_size'], available) // frame_bytes
+
+        start, frames = self._span(total, sample_rate, offset, duration)
+        mono, block = self._buffers(frames, channels)
+        if frames == 0:
+            return mono, sample_rate
+
+        position = header['data_offset'] + start * frame_bytes
+        if data is not None:
+            pcm = np.frombuffer(data, dtype=dtype, count=frames * channels,
+                                offset=position).reshape(frames, channels)
+        else:
+            pcm = np.memmap(file_path, dtype=dtype, mode='r', offset=position, shape=(frames, channels))
+        for position in range(0, frames, self.block_frames):
+            source = pcm[position:position + self.block_frames]
+            # Un solo canal se convierte directamente en la salida
+            target = block[:len(source)] if channels > 1 else mono[position:position + len(source), None]
+            if scale is None:
+                target[...] = source
+            else:
+                np.multiply(source, scale, out=target, dtype=np.float32, casting='unsafe')
+            if channels > 1:
+                self._downmix(target, mono[position:position + len(source)])
+        del pcm
+        return mono, sample_rate
+
+    def _decode_soundfile(self, file_path: Path, offset: float, duration: Optional[float],
+                          data: Optional[bytes] = None) -> Tuple[np.ndarray, int]:
+        """Decodifica con soundfile, bloque a bloque, sobre los buffers reutilizables"""
+        source = io.BytesIO(data) if data is not None else str(file_path)
+        with sf.SoundFile(source) as sound_file:
+            sample_rate = sound_file.samplerate
+            channels = sound_file.channels
+            start, frames = self._span(sound_file.frames, sample_rate, offset, duration)
+            mono, block = self._buffers(frames, channels)
+            if start:
+                sound_file.seek(start)
+
+            position = 0
+            while position < frames:
+                read = sound_file.read(dtype='float32',
+                                       out=block[:min(self.block_frames, frames - position)])
+                if len(read) == 0:
+                    break
+                self._downmix(read, mono[position:position + len(read)])
+                position += len(read)
+
+        return mono[:position], sample_rate
+
+    @staticmethod
+    def _downmix(block: np.ndarray, out: np.ndarray):
+        """Mezcla a mono como librosa.to_mono (media de los canales)"""
+        if block.shape[1] == 1:
+            out[...] = block[:, 0]
+        else:
+            np.mean(block, axis=1, out=out)
+
+
+# Un decodificador por hilo: sus buffers se reutilizan entre archivos, y
+# dos hilos (p. ej. analyze_paths llamado desde un servicio) no comparten
+# el buffer de salida
+_local = threading.local()
+
+
+def get_decoder() -> PCMDecoder:
+    """Devuelve el decodificador del hilo actual (lo crea la primera vez)"""
+    decoder = getattr(_local, 'decoder', None)
+    if decoder is None:
+        decoder = _local.decoder = PCMDecoder()
+    return decoder
+
+
+def load(file_path: Path, offset: float = 0.0, duration: Optional[float] = None,
+         data: Optional[bytes] = None) -> Tuple[np.ndarray, int]:
+    """
+    Decodifica un tramo de audio a mono a su frecuencia nativa
+
+    WAV y FLAC usan PCMDecoder (el resultado es una vista de su buffer,
+    válida hasta la siguiente decodificación en el mismo hilo); los demás
+    formatos, o un WAV/FLAC que libsndfile no pueda abrir, pasan por
+    librosa.load (que recurre a audioread). Con data, el archivo se
+    decodifica desde memoria; si libsndfile no lo admite, se lee del disco.
+
+    Args:
+        file_path: Ruta al archivo de audio
+        offset: Inicio del tramo en segundos
+        duration: Duración del tramo en segundos (None = hasta el final)
+        data: Contenido del archivo ya leído (opcional)
+
+    Returns:
+        tuple: (muestras float32, frecuencia de muestreo)
+    """
+    if Path(file_path).suffix.lower() in LOSSLESS_FORMATS:
+        try:
+            return get_decoder().decode(file_path, offset, duration, data)
+        except sf.SoundFileError:
+            pass
+    elif data is not None:
+        try:
+            return librosa.load(io.BytesIO(data), sr=None, offset=offset, duration=duration, mono=True)
+        except sf.SoundFileError:
+            pass
+
+    return librosa.load(str(file_path), sr=None, offset=offset, duration=duration, mono=True)
@@ -0,0 +1,160 @@
+"""
+Módulo para detectar archivos con contenido idéntico y analizar cada uno una sola vez
+"""
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from src.config import DEDUP_SAMPLE_BLOCKS, DEDUP_BLOCK_SIZE, DEDUP_HASH_CHUNK
+
+
+def sample_fingerprint(file_path: Path, size: int, blocks: int = DEDUP_SAMPLE_BLOCKS,
+                       block_size: int = DEDUP_BLOCK_SIZE) -> bytes:
+    """
+    Huella rápida: hash de unos pocos bloques repartidos por el archivo
+
+    Siempre incluye el primer y el último bloque (donde están los tags,
+    que es donde suelen diferir dos copias del mismo audio). Si el
+    archivo cabe en los bloques, se lee entero y la huella es exacta.
+
+    Args:
+        file_path: Ruta al archivo
+        size: Tamaño del archivo en bytes
+        blocks: Número de bloques muestreados
+        block_size: Bytes por bloque
+
+    Returns:
+        bytes: Digest de los bloques muestreados
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        if size <= blocks * block_size:
+            digest.update(f.read())
+        else:
+            step = (size - block_size) // max(blocks - 1, 1)
+            for index in range(blocks):
+                f.seek(index * step)
+                digest.update(f.read(block_size))
+    return digest.digest()
+
+
+def full_hash(file_path: Path, chunk_size: int = DEDUP_HASH_CHUNK) -> bytes:
+    """
+    Hash del contenido completo (solo para confirmar coincidencias)
+
+    Args:
+        file_path: Ruta al archivo
+        chunk_size: Bytes por lectura
+
+    Returns:
+        bytes: Digest del archivo
+    """
+    digest = hashlib.blake2b(digest_size=32)
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def _split(paths: List[Path], key) -> List[List[Path]]:
+    """
+    Divide un grupo de candidatos según key(ruta), conservando el orden
+
+    Las rutas que no se pueden leer (key lanza OSError) se tratan como
+    únicas: su error lo informará el análisis.
+
+    Returns:
+        list: Subgrupos con más de una ruta
+    """
+    groups: Dict[bytes, List[Path]] = {}
+    for file_path in paths:
+        try:
+            groups.setdefault(key(file_path), []).append(file_path)
+        except OSError:
+            continue
+    return [group for group in groups.values() if len(group) > 1]
+
+
+def find_duplicates(files: Iterable[Path],
+                    blocks: int = DEDUP_SAMPLE_BLOCKS,
+                    block_size: int = DEDUP_BLOCK_SIZE) -> Tuple[List[Path], Dict[str, List[Path]]]:
+    """
+    Agrupa los archivos de contenido idéntico
+
+    Tres filtros, de más barato a más caro: tamaño (solo stat), huella de
+    bloques muestreados (solo entre archivos del mismo tamaño) y hash
+    completo (solo entre archivos con la misma huella). La mayoría de los
+    archivos no comparte tamaño con ningún otro y no se llega a leer.
+
+    Args:
+        files: Rutas a agrupar
+        blocks: Bloques por huella rápida
+        block_size: Bytes por bloque
+
+    Returns:
+        tuple: (rutas a analizar en el orden de entrada, con un único
+            representante por grupo; {ruta del representante: copias})
+    """
+    files = list(files)
+    by_size: Dict[int, List[Path]] = {}
+    for file_path in files:
+        try:
+            size = os.stat(file_path).st_size
+        except OSError:
+            continue
+        by_size.setdefault(size, []).append(file_path)
+
+    duplicates: Dict[str, List[Path]] = {}
+    copies = set()
+    for size, paths in by_size.items():
+        if len(paths) < 2:
+            continue
+        for group in _split(paths, lambda p: sample_fingerprint(p, size, blocks, block_size)):
+            # Si la huella cubrió el archivo entero ya es una comparación exacta
+            confirmed = [group] if size <= blocks * block_size else _split(group, full_hash)
+            for same in confirmed:
+                duplicates[str(same[0])] = same[1:]
+                copies.update(same[1:])
+
+    unique = [file_path for file_path in files if file_path not in copies]
+    return unique, duplicates
+
+
+def duplicate_result(result: Dict, file_path: Path) -> Dict:
+    """
+    Construye el resultado de una copia a partir del de su representante
+
+    Args:
+        result: Resultado del archivo analizado
+        file_path: Ruta de la copia
+
+    Returns:
+        dict: Resultado de la copia, con 'duplicate_of' apuntando al
+            archivo analizado (sin tiempos: la copia no se analizó)
+    """
+    copy = {key: value for key, value in result.items() if key != 'timings'}
+    copy.update({
+        'file_path': str(file_path),
+        'file_name': file_path.name,
+        'format': file_path.suffix.lower(),
+        'duplicate_of': result.get('file_path'),
+    })
+    return copy
+
+
+def fan_out(results: Iterable[Dict], duplicates: Optional[Dict[str, List[Path]]]) -> Iterator[Dict]:
+    """
+    Genera cada resultado seguido de los de sus copias idénticas
+
+    Args:
+        results: Resultados de los archivos analizados
+        duplicates: Copias por ruta del representante (find_duplicates)
+
+    Yields:
+        dict: Resultado de cada archivo, analizado o copia
+    """
+    for result in results:
+        yield result
+        for file_path in (duplicates or {}).get(result.get('file_path'), ()):
+            yield duplicate_result(result, file_path)
@@ -2,11 +2,117 @@
 Módulo para detectar archivos de audio falsos o upscaleados
 """
 
-from typing import Dict, Tuple
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
 from src.config import (
-    CUTOFF_THRESHOLDS, SUSPICIOUS_THRESHOLD, FLAC_SUSPICIOUS_THRESHOLD,
+    CUTOFF_THRESHOLDS, SUSPICIOUS_THRESHOLD, FLAC_SUSPICIOUS_THRESHOLD, HIRES_BAND_MIN,
     CLASS_LEGITIMATE, CLASS_FAKE, CLASS_SUSPICIOUS, CLASS_ERROR
 )
+from src.results import CLASS_CODES
+
+
+# Columnas que usa FakeDetector.detect_batch()
+BATCH_COLUMNS = (
+    'format', 'bitrate', 'cutoff_frequency', 'spectral_presence', 'high_freq_energy',
+    'has_content_above_20k', 'has_hires_content', 'analysis_sample_rate', 'error'
+)
+
+# Razones de detect_batch(): el código es la posición y la plantilla solo se
+# formatea al pedir la razón de una fila (mismos textos que detect())
+REASON_TEMPLATES = (
+    ('error', "{error}"),
+    ('unsupported', "Formato no soportado: {format}"),
+    ('no_cutoff', "No se pudo calcular la frecuencia de corte"),
+    ('mp3_very_low', "Frecuencia de corte muy baja ({cutoff:.0f} Hz), probable archivo corrupto o de muy baja calidad"),
+    ('mp3_320_from_128', "Declarado como 320 kbps pero frecuencia de corte de {cutoff:.0f} Hz indica origen 128 kbps"),
+    ('mp3_320_from_192', "Declarado como 320 kbps pero frecuencia de corte de {cutoff:.0f} Hz indica origen 192 kbps"),
+    ('mp3_320_from_256', "Declarado como 320 kbps pero frecuencia de corte de {cutoff:.0f} Hz indica posible origen 256 kbps"),
+    ('mp3_320_ok', "Frecuencia de corte {cutoff:.0f} Hz coherente con MP3 320 kbps"),
+    ('mp3_ok', "Frecuencia de corte {cutoff:.0f} Hz coherente con bitrate declarado ({kbps:.0f} kbps)"),
+    ('mp3_low', "Frecuencia de corte {cutoff:.0f} Hz menor a la esperada para {kbps:.0f} kbps"),
+    ('above_20k', "Contenido detectado por encima de 20 kHz - FLAC lossless auténtico"),
+    ('high_presence', "Presencia espectral {presence:.1f}% en altas frecuencias - FLAC lossless auténtico"),
+    ('moderate_energy', "Presencia espectral {presence:.1f}% con energía adecuada - FLAC lossless"),
+    ('moderate', "Presencia espectral {presence:.1f}% moderada - posible conversión de alta calidad"),
+    ('low_presence', "Presencia espectral baja ({presence:.1f}%) - posible conversión desde MP3 de calidad media"),
+    ('no_presence', "Sin contenido espectral en altas frecuencias - conversión desde MP3 de baja calidad"),
+    ('very_low_presence', "Presencia espectral muy baja ({presence:.1f}%) - posible producción con filtrado"),
+    ('upsampled', "Archivo hi-res ({sample_rate:.1f} kHz) sin contenido por encima de {hires:.0f} kHz - posible upsampling"),
+)
+REASON_CODES = {name: code for code, (name, _) in enumerate(REASON_TEMPLATES)}
+
+# Parte fija inicial de cada plantilla, para descartar candidatas en reason_code()
+REASON_PREFIXES = tuple((template.split('{')[0], code) for code, (name, template) in enumerate(REASON_TEMPLATES)
+                        if name != 'error')
+
+# Nombre de cada código de clasificación de results.CLASS_CODES
+CLASS_NAMES = tuple(sorted(CLASS_CODES, key=CLASS_CODES.get))
+
+
+def reason_values(analysis_results: Mapping) -> Dict:
+    """
+    Valores con los que detect() formatea la razón de un resultado
+
+    Args:
+        analysis_results: Resultados del análisis (con o sin veredicto)
+
+    Returns:
+        dict: error, format, cutoff, kbps, presence y sample_rate (kHz)
+    """
+    bitrate = analysis_results.get('bitrate', 0)
+    return {
+        'error': analysis_results.get('error'),
+        'format': (analysis_results.get('format') or '').lower(),
+        'cutoff': analysis_results.get('cutoff_frequency'),
+        'kbps': bitrate / 1000 if bitrate else 0,
+        'presence': analysis_results.get('spectral_presence', 0),
+        'sample_rate': (analysis_results.get('analysis_sample_rate') or 0) / 1000,
+    }
+
+
+def format_reason(code: int, values: Mapping) -> str:
+    """
+    Formatea una razón de REASON_TEMPLATES
+
+    Args:
+        code: Código de la razón (REASON_CODES)
+        values: Valores de la fila (ver reason_values())
+
+    Returns:
+        str: Texto de la razón, el mismo que devuelve detect()
+    """
+    name, template = REASON_TEMPLATES[code]
+    if name == 'error':
+        return values['error']
+    return template.format(format=values['format'], cutoff=values['cutoff'], kbps=values['kbps'],
+                           presence=values['presence'], sample_rate=values['sample_rate'],
+                           hires=HIRES_BAND_MIN / 1000)
+
+
+def reason_code(reason: str, analysis_results: Mapping) -> Optional[int]:
+    """
+    Código de la plantilla que, con los valores del resultado, genera
+    exactamente la razón dada
+
+    Args:
+        reason: Texto de la razón
+        analysis_results: Resultado al que pertenece la razón
+
+    Returns:
+        int: Código de REASON_CODES, o None si ninguna plantilla la
+            reproduce (p. ej. mensajes de error)
+    """
+    values = None
+    for prefix, code in REASON_PREFIXES:
+        if not reason.startswith(prefix):
+            continue
+        if values is None:
+            values = reason_values(analysis_results)
+        try:
+            if format_reason(code, values) == reason:
+                return code
+        except (TypeError, ValueError):
+            continue
+    return None
 
 
 class FakeDetector:
@@ -124,6 +230,28 @@ class FakeDetector:
             else:
                 return CLASS_SUSPICIOUS, f"Presencia espectral muy baja ({spectral_presence:.1f}%) - posible producción con filtrado"
     
+    @staticmethod
+    def check_upsampling(analysis_results: Dict, verdict: Tuple[str, str]) -> Tuple[str, str]:
+        """
+        Revisa un veredicto LEGÍTIMO de un archivo hi-res analizado a su
+        frecuencia nativa
+        
+        Sin contenido por encima de HIRES_BAND_MIN el archivo es un
+        upsampling desde un original de 44.1/48 kHz. Los veredictos fake o
+        sospechoso no se modifican.
+        
+        Args:
+            analysis_results: Resultados del análisis de AudioAnalyzer
+            verdict: Clasificación y razón de detect_flac/detect_wav
+            
+        Returns:
+            tuple: (clasificación, razón)
+        """
+        if verdict[0] == CLASS_LEGITIMATE and analysis_results.get('has_hires_content') is False:
+            sample_rate = analysis_results.get('analysis_sample_rate') or 0
+            return CLASS_SUSPICIOUS, f"Archivo hi-res ({sample_rate/1000:.1f} kHz) sin contenido por encima de {HIRES_BAND_MIN/1000:.0f} kHz - posible upsampling"
+        return verdict
+    
     @staticmethod
     def detect_wav(analysis_results: Dict) -> Tuple[str, str]:
         """
@@ -158,10 +286,154 @@ class FakeDetector:
             return FakeDetector.detect_mp3(analysis_results)
         
         elif file_format == '.flac':
-            return FakeDetector.detect_flac(analysis_results)
+            verdict = FakeDetector.detect_flac(analysis_results)
+            return FakeDetector.check_upsampling(analysis_results, verdict)
         
         elif file_format == '.wav':
-            return FakeDetector.detect_wav(analysis_results)
+            verdict = FakeDetector.detect_wav(analysis_results)
+            return FakeDetector.check_upsampling(analysis_results, verdict)
         
         else:
             return CLASS_ERROR, f"Formato no soportado: {file_format}"
+    
+    @staticmethod
+    def detect_batch(columns: Mapping[str, Sequence]) -> 'DetectionBatch':
+        """
+        Clasifica muchos resultados a la vez, por columnas
+        
+        Aplica las mismas reglas que detect() (incluida check_upsampling)
+        con máscaras de NumPy en lugar de ramas por archivo, y devuelve
+        códigos: las razones no se formatean hasta pedirlas con
+        DetectionBatch.reason(), normalmente solo para las filas que se
+        muestran o se escriben.
+        
+        Args:
+            columns: {columna: valores} con las columnas de BATCH_COLUMNS
+                (listas o arrays de la misma longitud; None o NaN = sin
+                valor, igual que una clave ausente; las que falten se
+                consideran vacías)
+            
+        Returns:
+            DetectionBatch: Clasificación y razón codificadas de cada fila
+        """
+        import numpy as np
+        
+        size = len(next(iter(columns.values()))) if columns else 0
+        
+        def numbers(name: str, default: float):
+            values = columns.get(name)
+            if values is None:
+                return np.full(size, default)
+            values = np.asarray(values, dtype=np.float64)
+            return np.where(np.isnan(values), default, values)
+        
+        formats = np.array([(value or '').lower() for value in columns.get('format', [None] * size)], dtype=object)
+        errors = columns.get('error', [None] * size)
+        has_error = np.array([error is not None for error in errors], dtype=bool)
+        
+        cutoff = np.asarray(columns['cutoff_frequency'], dtype=np.float64) if 'cutoff_frequency' in columns \
+            else np.full(size, np.nan)
+        no_cutoff = np.isnan(cutoff)
+        kbps = numbers('bitrate', 0) / 1000
+        presence = numbers('spectral_presence', 0)
+        energy = numbers('high_freq_energy', -100)
+        above_20k = numbers('has_content_above_20k', 0) != 0
+        no_hires = numbers('has_hires_content', np.nan) == 0
+        sample_rate = numbers('analysis_sample_rate', 0) / 1000
+        
+        # MP3: umbral esperado según el bitrate declarado (detect_mp3)
+        expected = np.select([kbps >= 320, kbps >= 256, kbps >= 192],
+                             [CUTOFF_THRESHOLDS['mp3_320'], CUTOFF_THRESHOLDS['mp3_256'], CUTOFF_THRESHOLDS['mp3_192']],
+                             CUTOFF_THRESHOLDS['mp3_128'])
+        is_320 = kbps >= 320
+        mp3_class, mp3_reason = _select(size, [
+            (no_cutoff, CLASS_ERROR, 'no_cutoff'),
+            (cutoff < CUTOFF_THRESHOLDS['mp3_128'] - SUSPICIOUS_THRESHOLD, CLASS_FAKE, 'mp3_very_low'),
+            (is_320 & (cutoff < CUTOFF_THRESHOLDS['mp3_192']), CLASS_FAKE, 'mp3_320_from_128'),
+            (is_320 & (cutoff < CUTOFF_THRESHOLDS['mp3_256'] - SUSPICIOUS_THRESHOLD), CLASS_FAKE, 'mp3_320_from_192'),
+            (is_320 & (cutoff < CUTOFF_THRESHOLDS['mp3_320'] - SUSPICIOUS_THRESHOLD), CLASS_SUSPICIOUS, 'mp3_320_from_256'),
+            (is_320, CLASS_LEGITIMATE, 'mp3_320_ok'),
+            (cutoff >= expected - SUSPICIOUS_THRESHOLD, CLASS_LEGITIMATE, 'mp3_ok'),
+        ], (CLASS_SUSPICIOUS, 'mp3_low'))
+        
+        # FLAC y WAV (detect_flac), y después check_upsampling
+        lossless_class, lossless_reason = _select(size, [
+            (no_cutoff & (presence == 0), CLASS_ERROR, 'no_cutoff'),
+            (above_20k, CLASS_LEGITIMATE, 'above_20k'),
+            (presence > 30, CLASS_LEGITIMATE, 'high_presence'),
+            ((presence > 15) & (energy > -60), CLASS_LEGITIMATE, 'moderate_energy'),
+            (presence > 15, CLASS_SUSPICIOUS, 'moderate'),
+            (presence > 5, CLASS_SUSPICIOUS, 'low_presence'),
+            ((cutoff != 0) & (cutoff < 16500), CLASS_FAKE, 'no_presence'),
+        ], (CLASS_SUSPICIOUS, 'very_low_presence'))
+        upsampled = (lossless_class == CLASS_CODES[CLASS_LEGITIMATE]) & no_hires
+        lossless_class[upsampled] = CLASS_CODES[CLASS_SUSPICIOUS]
+        lossless_reason[upsampled] = REASON_CODES['upsampled']
+        
+        is_mp3 = formats == '.mp3'
+        is_lossless = (formats == '.flac') | (formats == '.wav')
+        classes = np.select([has_error, is_mp3, is_lossless],
+                            [CLASS_CODES[CLASS_ERROR], mp3_class, lossless_class],
+                            CLASS_CODES[CLASS_ERROR]).astype(np.int8)
+        reasons = np.select([has_error, is_mp3, is_lossless],
+                            [REASON_CODES['error'], mp3_reason, lossless_reason],
+                            REASON_CODES['unsupported']).astype(np.int8)
+        
+        return DetectionBatch(classes, reasons, {
+            'error': errors, 'format': formats, 'cutoff': cutoff, 'kbps': kbps,
+            'presence': presence, 'sample_rate': sample_rate
+        })
+
+
+def _select(size: int, rules, default: Tuple[str, str]):
+    """
+    Aplica reglas (máscara, clasificación, razón) en orden: cada fila se
+    queda con la primera que cumple, o con default
+    
+    Returns:
+        tuple: (códigos de clasificación, códigos de razón)
+    """
+    import numpy as np
+    
+    masks = [np.broadcast_to(mask, size) for mask, _, _ in rules]
+    classes = np.select(masks, [CLASS_CODES[classification] for _, classification, _ in rules],
+                        CLASS_CODES[default[0]])
+    reasons = np.select(masks, [REASON_CODES[reason] for _, _, reason in rules], REASON_CODES[default[1]])
+    return classes, reasons
+
+
+class DetectionBatch:
+    """
+    Resultado de FakeDetector.detect_batch(): un código de clasificación
+    (los de results.CLASS_CODES) y uno de razón (REASON_TEMPLATES) por fila
+    """
+    
+    def __init__(self, classes, reasons, values: Dict):
+        """
+        Args:
+            classes: Array de códigos de clasificación
+            reasons: Array de códigos de razón
+            values: Columnas con las que se formatean las razones
+        """
+        self.classes = classes
+        self.reasons = reasons
+        self._values = values
+    
+    def __len__(self) -> int:
+        return len(self.classes)
+    
+    def classification(self, index: int) -> str:
+        """Clasificación de una fila"""
+        return CLASS_NAMES[self.classes[index]]
+    
+    def classifications(self) -> List[str]:
+        """Clasificación de todas las filas"""
+        return [CLASS_NAMES[code] for code in self.classes.tolist()]
+    
+    def reason(self, index: int) -> str:
+        """Formatea la razón de una fila"""
+        return format_reason(self.reasons[index], {name: values[index] for name, values in self._values.items()})
+    
+    def verdict(self, index: int) -> Tuple[str, str]:
+        """(clasificación, razón) de una fila, como detect()"""
+        return self.classification(index), self.reason(index)
@@ -0,0 +1,246 @@
+"""
+Módulo del almacén de espectros (--features) para reclasificar sin decodificar
+
+Los umbrales del detector (CUTOFF_THRESHOLDS, SUSPICIOUS_THRESHOLD,
+ENERGY_THRESHOLD...) forman parte de la clave de la caché de análisis:
+cambiarlos obliga a decodificar toda la biblioteca otra vez. El espectro
+medio en dB que calcula el análisis no depende de ellos, así que se
+guarda (float16, unos 4 KB por archivo) y `tools reclassify` recalcula
+las métricas y el veredicto solo a partir de él.
+"""
+
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+from src.config import CACHE_COMMIT_EVERY, FFT_SIZE, RECLASSIFY_BATCH
+
+
+# Claves del resultado que no se guardan en el índice (se recalculan al
+# reclasificar o solo tienen sentido en la ejecución que las midió)
+NON_STORED_KEYS = ('classification', 'reason', 'timings', 'spectrum', 'file_name',
+                   'duplicate_of', 'shard')
+
+
+class FeatureStore:
+    """
+    Espectros medios de los archivos analizados, en un directorio con:
+
+    - spectra.f16: una fila float16 de FFT_SIZE // 2 + 1 bins por
+      análisis, solo se añade al final y se lee con un memmap
+    - index.db: SQLite con la ruta, tamaño y mtime de cada archivo, su
+      fila de espectro y el resto del análisis (metadatos, rango dinámico,
+      tag LAME...) en JSON
+
+    Reanalizar un archivo añade una fila nueva y apunta el índice a ella.
+    Los MP3 decididos por su tag LAME no tienen espectro (fila NULL).
+    """
+
+    def __init__(self, store_path: str, n_fft: int = FFT_SIZE):
+        """
+        Abre (o crea) el almacén
+
+        Args:
+            store_path: Directorio del almacén
+            n_fft: Tamaño de FFT de los espectros
+
+        Raises:
+            ValueError: Si el almacén se creó con otro tamaño de FFT
+        """
+        import numpy as np
+
+        self.store_path = Path(store_path)
+        self.store_path.mkdir(parents=True, exist_ok=True)
+        self.n_fft = n_fft
+        self.n_bins = n_fft // 2 + 1
+        self._dtype = np.dtype('<f2')
+        self._row_bytes = self.n_bins * self._dtype.itemsize
+        self._pending_writes = 0
+
+        self.conn = sqlite3.connect(str(self.store_path / 'index.db'))
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS features ('
+            ' path TEXT PRIMARY KEY,'
+            ' size INTEGER NOT NULL,'
+            ' mtime_ns INTEGER NOT NULL,'
+            ' row INTEGER,'
+            ' classification TEXT,'
+            ' data TEXT NOT NULL,'
+            ' updated REAL NOT NULL)'
+        )
+        self.conn.execute("INSERT OR IGNORE INTO meta VALUES ('n_fft', ?)", (str(n_fft),))
+        self.conn.commit()
+
+        stored_n_fft = int(self.conn.execute("SELECT value FROM meta WHERE key = 'n_fft'").fetchone()[0])
+        if stored_n_fft != n_fft:
+            self.conn.close()
+            raise ValueError(f"El almacén {store_path} usa FFT de {stored_n_fft} puntos (FFT_SIZE = {n_fft})")
+
+        # Descartar una fila a medio escribir (interrupción durante put())
+        self.spectra_path = self.store_path / 'spectra.f16'
+        self._file = open(self.spectra_path, 'ab')
+        size = self._file.tell()
+        if size % self._row_bytes:
+            self._file.truncate(size - size % self._row_bytes)
+        self._rows = size // self._row_bytes
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @staticmethod
+    def _key(file_path: Path) -> Tuple[str, int, int]:
+        """Devuelve (ruta absoluta, tamaño, mtime_ns) del archivo"""
+        stat = file_path.stat()
+        return str(file_path.absolute()), stat.st_size, stat.st_mtime_ns
+
+    def has(self, file_path: Path) -> bool:
+        """
+        Indica si el almacén tiene el análisis vigente de un archivo
+
+        Args:
+            file_path: Ruta al archivo de audio
+
+        Returns:
+            bool: True si hay entrada y el archivo no ha cambiado desde entonces
+        """
+        try:
+            path, size, mtime_ns = self._key(Path(file_path))
+        except OSError:
+            return False
+        row = self.conn.execute('SELECT size, mtime_ns FROM features WHERE path = ?', (path,)).fetchone()
+        return row is not None and row[0] == size and row[1] == mtime_ns
+
+    def put(self, file_path: Path, result: Dict, spectrum=None):
+        """
+        Guarda el análisis de un archivo y su espectro medio
+
+        Los resultados con error no se guardan.
+
+        Args:
+            file_path: Ruta al archivo de audio
+            result: Resultado del análisis (clasificado)
+            spectrum: Espectro medio en dB (FFT_SIZE // 2 + 1 bins), o None
+        """
+        if 'error' in result:
+            return
+        try:
+            path, size, mtime_ns = self._key(Path(file_path))
+        except OSError:
+            return
+
+        row = None
+        if spectrum is not None and len(spectrum) == self.n_bins:
+            self._file.write(spectrum.astype(self._dtype, copy=False).tobytes())
+            row = self._rows
+            self._rows += 1
+
+        analysis = {k: v for k, v in result.items() if k not in NON_STORED_KEYS}
+        self.conn.execute(
+            'INSERT OR REPLACE INTO features (path, size, mtime_ns, row, classification, data, updated) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (path, size, mtime_ns, row, result.get('classification'),
+             json.dumps(analysis, ensure_ascii=False), time.time())
+        )
+
+        self._pending_writes += 1
+        if self._pending_writes >= CACHE_COMMIT_EVERY:
+            self.commit()
+
+    def commit(self):
+        """Vuelca los espectros y confirma el índice (en ese orden)"""
+        self._file.flush()
+        self.conn.commit()
+        self._pending_writes = 0
+
+    def __len__(self) -> int:
+        return self.conn.execute('SELECT COUNT(*) FROM features').fetchone()[0]
+
+    def entries(self) -> Iterator[Tuple[Dict, Optional[object], Optional[str]]]:
+        """
+        Recorre los análisis almacenados, en el orden de sus espectros
+
+        Yields:
+            tuple: (análisis sin clasificar, espectro float16 de solo
+                lectura o None, clasificación que se obtuvo al analizar)
+        """
+        import numpy as np
+
+        self.commit()
+        spectra = None
+        if self._rows:
+            spectra = np.memmap(self.spectra_path, dtype=self._dtype, mode='r',
+                                shape=(self._rows, self.n_bins))
+
+        rows = self.conn.execute('SELECT path, row, classification, data FROM features ORDER BY row')
+        for path, row, classification, data in rows:
+            analysis = json.loads(data)
+            analysis['file_path'] = path
+            analysis['file_name'] = Path(path).name
+            yield analysis, (spectra[row] if row is not None else None), classification
+
+    def close(self):
+        """Confirma las escrituras pendientes y cierra el almacén"""
+        if self.conn is not None:
+            self.commit()
+            self._file.close()
+            self.conn.close()
+            self.conn = None
+
+
+def reclassify(store: FeatureStore, reasons: bool = True,
+               batch_size: int = RECLASSIFY_BATCH) -> Iterator[Tuple[Optional[str], Dict]]:
+    """
+    Reclasifica los archivos del almacén con los umbrales actuales de
+    src/config.py, sin leer el audio
+
+    La frecuencia de corte, la energía y presencia en altas frecuencias y
+    el contenido hi-res se recalculan a partir del espectro guardado; el
+    rango dinámico y los metadatos se toman del análisis original. Los MP3
+    decididos por su tag LAME se reclasifican con el paso-bajo declarado
+    (un cambio de umbrales que los hiciera ambiguos requiere reanalizarlos).
+    El veredicto se calcula por lotes con FakeDetector.detect_batch().
+
+    Args:
+        store: Almacén de espectros
+        reasons: Si False, solo llevan 'reason' los archivos que cambian
+            de veredicto (cuando no se escribe ningún reporte)
+        batch_size: Archivos por lote de clasificación
+
+    Yields:
+        tuple: (clasificación original, resultado reclasificado)
+    """
+    import numpy as np
+    from src.spectral import spectral_features
+
+    batch = []
+    for analysis, spectrum, previous in store.entries():
+        if spectrum is not None:
+            analysis.update(spectral_features(np.asarray(spectrum, dtype=np.float32),
+                                              analysis['analysis_sample_rate'], n_fft=store.n_fft))
+        batch.append((previous, analysis))
+        if len(batch) >= batch_size:
+            yield from _classify_batch(batch, reasons)
+            batch = []
+    yield from _classify_batch(batch, reasons)
+
+
+def _classify_batch(batch: List[Tuple[Optional[str], Dict]], reasons: bool) -> Iterator[Tuple[Optional[str], Dict]]:
+    """Clasifica un lote de (clasificación original, análisis) y lo genera"""
+    from src.detector import BATCH_COLUMNS, FakeDetector
+
+    if not batch:
+        return
+    verdicts = FakeDetector.detect_batch({name: [analysis.get(name) for _, analysis in batch]
+                                          for name in BATCH_COLUMNS})
+    for index, ((previous, analysis), classification) in enumerate(zip(batch, verdicts.classifications())):
+        analysis['classification'] = classification
+        if reasons or classification != previous:
+            analysis['reason'] = verdicts.reason(index)
+        yield previous, analysis
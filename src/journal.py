@@ -0,0 +1,112 @@
+"""
+Módulo del journal de resultados: permite reanudar un escaneo interrumpido
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterator
+from src.config import JOURNAL_SYNC_INTERVAL
+from src.writers import JSONLinesReportWriter
+
+
+def truncate_partial_line(journal_path: Path):
+    """
+    Elimina la última línea del journal si quedó a medio escribir (el
+    proceso murió durante una escritura), para poder seguir añadiendo
+
+    Args:
+        journal_path: Ruta del journal
+    """
+    journal_path = Path(journal_path)
+    if not journal_path.exists() or journal_path.stat().st_size == 0:
+        return
+
+    with open(journal_path, 'rb+') as f:
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) == b'\n':
+            return
+        # Buscar el último salto de línea hacia atrás, por bloques
+        end = f.tell()
+        position = end
+        while position > 0:
+            start = max(position - 65536, 0)
+            f.seek(start)
+            newline = f.read(position - start).rfind(b'\n')
+            if newline >= 0:
+                f.truncate(start + newline + 1)
+                return
+            position = start
+        f.truncate(0)
+
+
+def read_journal(journal_path: str) -> Iterator[Dict]:
+    """
+    Lee los resultados registrados en un journal
+
+    Las líneas que no son JSON válido (una escritura cortada) se omiten.
+
+    Args:
+        journal_path: Ruta del journal
+
+    Yields:
+        dict: Resultado de cada archivo ya analizado
+    """
+    if not Path(journal_path).exists():
+        return
+    with open(journal_path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+class Journal(JSONLinesReportWriter):
+    """
+    Registro de solo añadido (JSON Lines) de los resultados según terminan
+
+    A diferencia de los reportes, no se reescribe: cada ejecución añade al
+    final, e incluye siempre los tiempos por etapa. Se fuerza a disco
+    (fsync) como mucho cada sync_interval segundos, así que una caída
+    solo pierde los últimos segundos de trabajo.
+    """
+
+    mode = 'a'
+
+    def __init__(self, output_path: str, sync_interval: float = JOURNAL_SYNC_INTERVAL):
+        """
+        Inicializa el journal
+
+        Args:
+            output_path: Ruta del journal (se crea o se continúa)
+            sync_interval: Segundos máximos entre fsync
+        """
+        super().__init__(output_path, timings=True)
+        self.sync_interval = sync_interval
+        self._last_sync = time.monotonic()
+        truncate_partial_line(self.output_path)
+
+    def write(self, result: Dict):
+        """
+        Añade un resultado y lo fuerza a disco si toca
+
+        Args:
+            result: Diccionario con resultados del análisis y detección
+        """
+        super().write(result)
+        if time.monotonic() - self._last_sync >= self.sync_interval:
+            self.sync()
+
+    def sync(self):
+        """Vuelca el buffer y fuerza la escritura a disco (fsync)"""
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        """Fuerza a disco lo pendiente y cierra el journal"""
+        self.sync()
+        super().close()
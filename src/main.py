@@ -3,13 +3,135 @@ Punto de entrada principal para Fake Music Hunter
 """
 
 import click
+import cProfile
+import multiprocessing
+import sys
+import time
+from datetime import datetime
 from pathlib import Path
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
+from typing import Dict, Optional
 from src.scanner import AudioScanner
-from src.analyzer import AudioAnalyzer
-from src.detector import FakeDetector
+from src.api import analyze_paths, analysis_options, open_cache
+from src.cache import AnalysisCache
 from src.reporter import Reporter
-from src.config import SUPPORTED_FORMATS
+from src.watcher import LibraryWatcher
+from src.sharding import parse_shard, tag_results
+from src.results import check_parquet
+from src.featurestore import FeatureStore
+from src.journal import read_journal
+from src.config import (
+    SUPPORTED_FORMATS, DEFAULT_JOBS, DEFAULT_BATCH_SIZE, DEFAULT_CACHE_PATH,
+    DEFAULT_SCAN_WORKERS, PREFETCH_THREADS, SAMPLE_WINDOW_DURATION, WATCH_INTERVAL, DEFAULT_WATCH_REPORT,
+    OUTPUT_INTERACTIVE, OUTPUT_BATCH, OUTPUT_QUIET
+)
+
+
+def record_output_time(result: dict, wall: float, cpu: float):
+    """
+    Añade a los tiempos del resultado la etapa 'output' (consola), medida
+    desde los instantes wall (perf_counter) y cpu (process_time)
+    """
+    if 'timings' in result:
+        result['timings']['output'] = {
+            'wall': time.perf_counter() - wall,
+            'cpu': time.process_time() - cpu
+        }
+
+
+def shard_option(ctx, param, value):
+    """Valida --shard i/N y lo convierte en (i, N)"""
+    if value is None:
+        return None
+    try:
+        return parse_shard(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+
+def library_stats(scanner: AudioScanner, cache: Optional[AnalysisCache]) -> Dict[str, Dict[str, int]]:
+    """
+    Cuenta archivos, bytes y entradas válidas en caché por formato (--dry-run)
+    
+    Solo recorre el sistema de archivos y consulta la caché: no importa
+    librosa ni numpy.
+    
+    Args:
+        scanner: Escáner de la biblioteca
+        cache: Caché de análisis (o None)
+        
+    Returns:
+        dict: {formato: {'files', 'bytes', 'cached'}}
+    """
+    stats = {}
+    for file_format, file_paths in scanner.get_files_by_format().items():
+        total_bytes = 0
+        cached = 0
+        for file_path in file_paths:
+            try:
+                total_bytes += file_path.stat().st_size
+            except OSError:
+                continue
+            if cache is not None and cache.get(file_path) is not None:
+                cached += 1
+        stats[file_format] = {'files': len(file_paths), 'bytes': total_bytes, 'cached': cached}
+    return stats
+
+
+def watch_library(scanner: AudioScanner, reporter: Reporter, cache: AnalysisCache,
+                  interval: float, output: str, json_path: str, jsonl_path: str,
+                  parquet_path: Optional[str] = None, **run_options):
+    """
+    Bucle del modo vigilancia
+    
+    Tras el primer recorrido completo, cada ciclo analiza solo los
+    archivos nuevos o modificados, retira los eliminados y reescribe el
+    reporte en disco si hubo cambios. Termina con Ctrl+C.
+    
+    Args:
+        scanner: Escáner de la biblioteca
+        reporter: Reporter con el estado actual de la biblioteca
+        cache: Caché de análisis (o None)
+        interval: Segundos entre sondeos
+        output: Reporte CSV a mantener actualizado (opcional)
+        json_path: Reporte JSON a mantener actualizado (opcional)
+        jsonl_path: Reporte JSON Lines a mantener actualizado (opcional)
+        parquet_path: Reporte Parquet a mantener actualizado (opcional)
+        **run_options: Argumentos de analyze_paths (jobs, dedup, opciones
+            del análisis...); con dedup, las copias se agrupan por sondeo
+    """
+    watcher = LibraryWatcher(scanner)
+    reporter.console.print(f"👀 Vigilando cambios cada {interval:g} s (Ctrl+C para salir)\n")
+    
+    while True:
+        changed, removed = watcher.poll()
+        
+        for file_path in removed:
+            reporter.remove_result(str(file_path))
+        
+        for result in tag_results(analyze_paths(changed, cache=cache, **run_options), scanner.shard):
+            reporter.upsert_result(result)
+            reporter.print_result(result)
+        reporter.flush()
+        
+        if changed or removed:
+            if cache is not None:
+                cache.commit()
+            if run_options.get('features') is not None:
+                run_options['features'].commit()
+            if output:
+                reporter.export_csv(output)
+            if json_path:
+                reporter.export_json(json_path)
+            if jsonl_path:
+                reporter.export_jsonl(jsonl_path)
+            if parquet_path:
+                reporter.export_parquet(parquet_path)
+            reporter.console.print(
+                f"[dim]{datetime.now():%H:%M:%S} · {len(changed):,} analizados, "
+                f"{len(removed):,} eliminados, {len(watcher):,} en la biblioteca[/dim]"
+            )
+        
+        time.sleep(interval)
 
 
 @click.command()
@@ -23,87 +145,266 @@ from src.config import SUPPORTED_FORMATS
               help='Archivo de salida para el reporte CSV')
 @click.option('--json', '-j', type=click.Path(),
               help='Archivo de salida para el reporte JSON')
+@click.option('--jsonl', type=click.Path(),
+              help='Archivo de salida para el reporte JSON Lines (un resultado por línea)')
+@click.option('--parquet', type=click.Path(dir_okay=False),
+              help='Archivo de salida para el reporte Parquet (columnar, requiere pyarrow)')
 @click.option('--verbose', '-v', is_flag=True,
               help='Mostrar información detallada de todos los archivos')
-def main(path: str, recursive: bool, formats: tuple, output: str, json: str, verbose: bool):
+@click.option('--quiet', '-q', is_flag=True,
+              help='Sin salida por archivo ni barra de progreso: solo resumen y reportes')
+@click.option('--batch', is_flag=True,
+              help='Salida en texto plano agrupada, para logs (automático si la salida no es una terminal)')
+@click.option('--jobs', '-J', type=click.IntRange(min=1), default=DEFAULT_JOBS,
+              help='Número de procesos de análisis en paralelo (default: 1)')
+@click.option('--ordered', is_flag=True,
+              help='Mostrar los resultados en el orden del escaneo (con --jobs > 1)')
+@click.option('--batch-size', type=click.IntRange(min=1), default=DEFAULT_BATCH_SIZE,
+              help='Archivos por lote de FFT (útil con pistas cortas y sample packs)')
+@click.option('--scan-workers', type=click.IntRange(min=1), default=DEFAULT_SCAN_WORKERS,
+              help=f'Hilos que recorren directorios en paralelo (default: {DEFAULT_SCAN_WORKERS})')
+@click.option('--prefetch', 'prefetch_mb', type=click.IntRange(min=0), default=0, metavar='MB',
+              help='Leer por adelantado hasta MB megabytes mientras se analiza (0 = desactivado; útil en NAS)')
+@click.option('--io-threads', type=click.IntRange(min=1), default=PREFETCH_THREADS,
+              help=f'Hilos de E/S de la lectura anticipada (default: {PREFETCH_THREADS})')
+@click.option('--native-rate', is_flag=True,
+              help='Analizar a la frecuencia de muestreo del archivo (sin remuestreo; detecta upsampling hi-res)')
+@click.option('--windows', type=click.IntRange(min=0), default=0,
+              help='Analizar K ventanas repartidas por el archivo en lugar de los primeros segundos (0 = desactivado)')
+@click.option('--window-duration', type=click.FloatRange(min=0.5), default=SAMPLE_WINDOW_DURATION,
+              help=f'Segundos por ventana con --windows (default: {SAMPLE_WINDOW_DURATION})')
+@click.option('--shard', callback=shard_option, metavar='i/N',
+              help='Analizar solo la parte i de N de la biblioteca (reparto estable por ruta relativa)')
+@click.option('--tiered', is_flag=True,
+              help='Analizar primero unos segundos y ampliar solo si el veredicto es ambiguo')
+@click.option('--prescreen/--no-prescreen', default=True,
+              help='Clasificar MP3 por su tag LAME cuando es concluyente, sin decodificar (default: activado)')
+@click.option('--dedup', is_flag=True,
+              help='Analizar una sola vez los archivos con contenido idéntico (copias)')
+@click.option('--watch', is_flag=True,
+              help='Seguir ejecutándose y analizar solo archivos nuevos o modificados')
+@click.option('--interval', type=click.FloatRange(min=1), default=WATCH_INTERVAL,
+              help=f'Segundos entre comprobaciones con --watch (default: {WATCH_INTERVAL})')
+@click.option('--journal', 'journal_path', type=click.Path(dir_okay=False),
+              help='Registrar cada resultado en un journal (JSON Lines) para poder reanudar')
+@click.option('--resume', 'resume_path', type=click.Path(dir_okay=False),
+              help='Reanudar desde un journal: omite los archivos ya registrados y sigue añadiendo en él')
+@click.option('--dry-run', '--count', 'dry_run', is_flag=True,
+              help='Solo escanear: archivos y tamaño por formato y tiempo estimado de análisis')
+@click.option('--timings', is_flag=True,
+              help='Incluir los tiempos por etapa en los reportes y su resumen (p50/p95/máx)')
+@click.option('--profile', 'profile_path', type=click.Path(dir_okay=False),
+              help='Guardar un volcado de cProfile (pstats) del proceso principal')
+@click.option('--cache', 'cache_path', type=click.Path(dir_okay=False), default=DEFAULT_CACHE_PATH,
+              help=f'Base de datos de caché de análisis (default: {DEFAULT_CACHE_PATH})')
+@click.option('--no-cache', is_flag=True,
+              help='No leer ni escribir la caché de análisis')
+@click.option('--features', 'features_path', type=click.Path(file_okay=False),
+              help='Guardar el espectro medio de cada archivo en este directorio (para tools reclassify)')
+def main(path: str, recursive: bool, formats: tuple, output: str, json: str, jsonl: str, parquet: str,
+         verbose: bool,
+         quiet: bool, batch: bool,
+         jobs: int, ordered: bool, batch_size: int, scan_workers: int, prefetch_mb: int, io_threads: int,
+         native_rate: bool, windows: int, window_duration: float,
+         shard: tuple, tiered: bool, prescreen: bool, dedup: bool, watch: bool, interval: float,
+         journal_path: str, resume_path: str, dry_run: bool, timings: bool, profile_path: str, cache_path: str, no_cache: bool,
+         features_path: str):
     """
     🎵 Fake Music Hunter - Detector de archivos de audio falsos
     
     Analiza archivos de audio para detectar si han sido convertidos
     desde formatos de menor calidad.
     """
-    # Inicializar reporter
-    reporter = Reporter(verbose=verbose)
+    if watch and (journal_path or resume_path):
+        raise click.UsageError("--journal y --resume no se pueden combinar con --watch")
+    if journal_path and resume_path and journal_path != resume_path:
+        raise click.UsageError("--resume ya registra en su journal: no indiques otro con --journal")
+    journal_path = resume_path or journal_path
+    if parquet:
+        try:
+            check_parquet()
+        except ImportError as e:
+            raise click.UsageError(str(e))
+    
+    # Inicializar reporter (fuera del modo vigilancia los resultados no se
+    # retienen: se escriben en los reportes según llegan)
+    if quiet:
+        mode = OUTPUT_QUIET
+    elif batch or not sys.stdout.isatty():
+        mode = OUTPUT_BATCH
+    else:
+        mode = OUTPUT_INTERACTIVE
+    reporter = Reporter(verbose=verbose, keep_results=watch, mode=mode, timings=timings)
+    
+    if profile_path:
+        # Con --jobs > 1 el análisis ocurre en los workers: el perfil
+        # muestra el proceso principal (escaneo, caché y salida)
+        profiler = cProfile.Profile()
+        
+        def dump_profile():
+            profiler.disable()
+            Path(profile_path).parent.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(profile_path)
+            reporter.console.print(f"\n📈 Perfil guardado: [cyan]{profile_path}[/cyan]")
+        
+        click.get_current_context().call_on_close(dump_profile)
+        profiler.enable()
     reporter.print_header()
     
     # Preparar formatos
     selected_formats = list(formats) if formats else SUPPORTED_FORMATS
     
     # Crear scanner
-    scanner = AudioScanner(path, recursive=recursive, formats=selected_formats)
+    scanner = AudioScanner(path, recursive=recursive, formats=selected_formats,
+                           workers=scan_workers, shard=shard)
     
-    # Obtener lista de archivos
-    files = list(scanner.scan())
-    total_files = len(files)
+    reporter.print_scan_info(path, shard=shard)
     
-    if total_files == 0:
-        reporter.console.print(f"\n[yellow]No se encontraron archivos de audio en: {path}[/yellow]")
+    # Opciones del análisis (también forman parte de la clave de caché)
+    options = analysis_options(
+        native_rate=native_rate,
+        windows=windows,
+        window_duration=window_duration,
+        prescreen=prescreen,
+        tiered=tiered
+    )
+    run_options = dict(jobs=jobs, ordered=ordered, batch_size=batch_size, dedup=dedup,
+                       prefetch=prefetch_mb * 1024 * 1024, io_threads=io_threads, **options)
+    
+    if dry_run:
+        # Solo se consulta una caché existente (no se crea una vacía)
+        cache = None
+        if not no_cache and Path(cache_path).exists():
+            cache = open_cache(cache_path, **options)
+        try:
+            stats = library_stats(scanner, cache)
+        finally:
+            if cache is not None:
+                cache.close()
+        reporter.print_dry_run(stats, jobs)
         return
     
-    reporter.print_scan_info(path, total_files)
-    reporter.console.print("🔍 Analizando archivos...\n")
+    # Abrir caché de análisis y almacén de espectros
+    features = None
+    if features_path:
+        try:
+            features = FeatureStore(features_path)
+        except ValueError as e:
+            raise click.UsageError(str(e))
+        run_options['features'] = features
+    cache = None if no_cache else open_cache(cache_path, **options)
     
-    # Analizar archivos con barra de progreso
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        BarColumn(),
-        TaskProgressColumn(),
-        console=reporter.console
-    ) as progress:
-        
-        task = progress.add_task("[cyan]Procesando...", total=total_files)
-        
-        for file_path in files:
-            # Actualizar progreso
-            progress.update(task, description=f"[cyan]Analizando: {file_path.name}")
-            
-            # Analizar archivo
-            analyzer = AudioAnalyzer(file_path)
-            analysis_results = analyzer.analyze()
-            
-            # Detectar fake
-            classification, reason = FakeDetector.detect(analysis_results)
-            
-            # Añadir resultados
-            result = {
-                **analysis_results,
-                'classification': classification,
-                'reason': reason
-            }
-            
+    if watch:
+        # Sin ruta explícita, mantener un reporte CSV de nombre fijo
+        if not output and not json and not jsonl and not parquet:
+            output = DEFAULT_WATCH_REPORT
+        try:
+            watch_library(scanner, reporter, cache, interval, output, json, jsonl, parquet, **run_options)
+        except KeyboardInterrupt:
+            reporter.console.print("\n⏹️  Vigilancia detenida")
+        finally:
+            if cache is not None:
+                cache.close()
+            if features is not None:
+                features.close()
+        reporter.print_summary()
+        return
+    
+    # El escaneo corre en segundo plano y alimenta el análisis a medida
+    # que descubre archivos (el total se va actualizando); con --dedup se
+    # espera al escaneo completo para agrupar las copias
+    files = scanner.stream()
+    
+    # Reportes incrementales
+    reporter.open_streams(csv_path=output, json_path=json, jsonl_path=jsonl, parquet_path=parquet)
+    
+    # Al reanudar, los resultados del journal pasan a los reportes y al
+    # resumen, y sus archivos no se vuelven a analizar
+    resumed = 0
+    if resume_path:
+        journaled = set()
+        for result in read_journal(resume_path):
             reporter.add_result(result)
+            journaled.add(result['file_path'])
+        resumed = len(journaled)
+        reporter.console.print(f"⏩ Reanudando: {resumed:,} archivos ya analizados en {resume_path}")
+        files = (file_path for file_path in files if str(file_path) not in journaled)
+    if journal_path:
+        reporter.open_journal(journal_path)
+    
+    if dedup:
+        reporter.console.print("🔁 Buscando copias idénticas...")
+    results = tag_results(analyze_paths(files, cache=cache, **run_options), shard)
+    reporter.console.print("🔍 Analizando archivos...\n")
+    
+    # Analizar archivos (barra de progreso solo en modo interactivo)
+    try:
+        if mode == OUTPUT_INTERACTIVE:
+            from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
             
-            # Imprimir resultado individual
-            reporter.print_result(result)
-            
-            # Avanzar progreso
-            progress.advance(task)
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                BarColumn(),
+                TaskProgressColumn(),
+                console=reporter.console
+            ) as progress:
+                
+                task = progress.add_task("[cyan]Procesando...", total=None, completed=resumed)
+                
+                for result in results:
+                    wall, cpu = time.perf_counter(), time.process_time()
+                    
+                    # Actualizar progreso (el total crece mientras dura el escaneo)
+                    progress.update(task, total=scanner.found,
+                                    description=f"[cyan]Analizado: {result['file_name']}")
+                    
+                    # Imprimir resultado individual
+                    reporter.print_result(result)
+                    record_output_time(result, wall, cpu)
+                    
+                    reporter.add_result(result)
+                    
+                    # Avanzar progreso
+                    progress.advance(task)
+        else:
+            # Sin rich por archivo: las líneas se agrupan y el progreso se limita
+            for done, result in enumerate(results, start=resumed + 1):
+                wall, cpu = time.perf_counter(), time.process_time()
+                reporter.print_result(result)
+                reporter.print_progress(done, scanner.found, scanner.finished)
+                record_output_time(result, wall, cpu)
+                reporter.add_result(result)
+    except BaseException:
+        # Cerrar los reportes para que lo ya escrito sea legible
+        reporter.flush()
+        reporter.close_streams()
+        raise
+    finally:
+        # Confirmar las entradas nuevas aunque el escaneo se interrumpa
+        if cache is not None:
+            cache.close()
+        if features is not None:
+            features.close()
+    
+    if scanner.found == 0 and not resumed:
+        reporter.console.print(f"\n[yellow]No se encontraron archivos de audio en: {path}[/yellow]")
+        return
+    
+    if cache is not None:
+        reporter.print_cache_info(cache.hits, cache.misses)
     
     # Imprimir resumen
     reporter.print_summary()
     
-    # Exportar reportes
-    if output:
-        reporter.export_csv(output)
-    
-    if json:
-        reporter.export_json(json)
+    # Cerrar los reportes
+    reporter.close_streams()
     
-    # Si no se especificó output, preguntar si quiere guardar
-    if not output and not json:
+    if not output and not json and not jsonl and not parquet:
         reporter.console.print()
 
 
 if __name__ == '__main__':
+    # Necesario para el pool de procesos en el ejecutable de PyInstaller
+    multiprocessing.freeze_support()
     main()
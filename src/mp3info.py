@@ -0,0 +1,130 @@
+"""
+Módulo para leer la cabecera Xing/Info y el tag LAME de archivos MP3
+"""
+
+import struct
+from pathlib import Path
+from typing import Dict, Optional
+
+
+# Bytes leídos tras el tag ID3v2 para buscar la primera trama MPEG
+SEARCH_WINDOW = 8192
+
+# Método VBR del tag LAME (nibble bajo del byte 9)
+VBR_METHODS = {
+    1: 'cbr',
+    2: 'abr',
+    3: 'vbr-rh',
+    4: 'vbr-mtrh',
+    5: 'vbr-mt',
+    8: 'cbr-2pass',
+    9: 'abr-2pass',
+}
+
+
+def _skip_id3v2(data: bytes) -> int:
+    """Devuelve el offset posterior al tag ID3v2 (0 si no hay)"""
+    if len(data) < 10 or data[:3] != b'ID3':
+        return 0
+    size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def _find_frame(data: bytes) -> Optional[int]:
+    """
+    Busca la primera cabecera de trama MPEG Layer III válida
+
+    Returns:
+        int: Offset de la cabecera, o None si no se encuentra
+    """
+    position = data.find(b'\xff')
+    while 0 <= position <= len(data) - 4:
+        b1, b2 = data[position + 1], data[position + 2]
+        is_sync = (b1 & 0xE0) == 0xE0
+        version_ok = (b1 >> 3) & 0x03 != 0x01
+        layer_3 = (b1 >> 1) & 0x03 == 0x01
+        bitrate_ok = (b2 >> 4) not in (0x00, 0x0F)
+        sample_rate_ok = (b2 >> 2) & 0x03 != 0x03
+        if is_sync and version_ok and layer_3 and bitrate_ok and sample_rate_ok:
+            return position
+        position = data.find(b'\xff', position + 1)
+    return None
+
+
+def parse_lame_info(data: bytes) -> Optional[Dict]:
+    """
+    Extrae el tag LAME de los primeros bytes de un MP3
+
+    Args:
+        data: Bytes desde el inicio del archivo (tras el tag ID3v2)
+
+    Returns:
+        dict: encoder, lowpass (Hz), vbr_method, preset y encoder_bitrate
+            (kbps), o None si no hay cabecera Xing/Info con tag LAME
+    """
+    frame = _find_frame(data)
+    if frame is None:
+        return None
+
+    header = data[frame:frame + 4]
+    mpeg1 = (header[1] >> 3) & 0x03 == 0x03
+    mono = (header[3] >> 6) == 0x03
+    if mpeg1:
+        side_info = 17 if mono else 32
+    else:
+        side_info = 9 if mono else 17
+
+    xing = frame + 4 + side_info
+    if data[xing:xing + 4] not in (b'Xing', b'Info') or len(data) < xing + 8:
+        return None
+
+    # Saltar los campos opcionales de la cabecera Xing según sus flags
+    flags = struct.unpack('>I', data[xing + 4:xing + 8])[0]
+    lame = xing + 8
+    lame += 4 if flags & 0x01 else 0     # Número de tramas
+    lame += 4 if flags & 0x02 else 0     # Número de bytes
+    lame += 100 if flags & 0x04 else 0   # Tabla TOC
+    lame += 4 if flags & 0x08 else 0     # Indicador de calidad
+
+    tag = data[lame:lame + 36]
+    if len(tag) < 36:
+        return None
+
+    encoder = tag[:9]
+    if not all(32 <= byte < 127 for byte in encoder):
+        return None
+
+    lowpass = tag[10] * 100
+    preset = ((tag[26] << 8) | tag[27]) & 0x07FF
+
+    return {
+        'encoder': encoder.decode('ascii').strip(),
+        'lowpass': lowpass or None,
+        'vbr_method': VBR_METHODS.get(tag[9] & 0x0F),
+        'preset': preset or None,
+        'encoder_bitrate': tag[20] or None,
+    }
+
+
+def read_lame_info(file_path: Path, data: Optional[bytes] = None) -> Optional[Dict]:
+    """
+    Lee el tag LAME de un archivo MP3 sin decodificar audio
+
+    Args:
+        file_path: Ruta al archivo MP3
+        data: Contenido del archivo ya leído (opcional; evita abrirlo)
+
+    Returns:
+        dict: Información del tag LAME, o None si no existe o hay error
+    """
+    if data is not None:
+        start = _skip_id3v2(data[:10])
+        return parse_lame_info(data[start:start + SEARCH_WINDOW])
+    try:
+        with open(file_path, 'rb') as f:
+            head = f.read(10)
+            f.seek(_skip_id3v2(head))
+            return parse_lame_info(f.read(SEARCH_WINDOW))
+    except OSError:
+        return None
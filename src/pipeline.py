@@ -0,0 +1,414 @@
+"""
+Módulo de ejecución del análisis (secuencial o en paralelo por procesos)
+"""
+
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from src.cache import AnalysisCache
+from src.featurestore import FeatureStore
+from src.detector import FakeDetector
+from src.prefetch import Prefetcher, no_release
+from src.config import CLASS_ERROR, MAX_PENDING_PER_JOB, PREFETCH_THREADS
+
+
+CRASH_MESSAGE = 'El proceso de análisis terminó abruptamente (posible archivo corrupto)'
+
+
+def analyze_file(file_path: Path, options: Optional[Dict] = None, data: Optional[bytes] = None) -> Dict:
+    """
+    Analiza un archivo y lo clasifica
+
+    Args:
+        file_path: Ruta al archivo de audio
+        options: Argumentos adicionales para AudioAnalyzer (p. ej. native_rate)
+        data: Contenido del archivo ya leído (opcional, ver src.prefetch)
+
+    Returns:
+        dict: Resultados del análisis con 'classification' y 'reason'
+    """
+    # Importación diferida: librosa, numpy y scipy solo se cargan al
+    # analizar (en el worker), no al arrancar la CLI
+    from src.analyzer import AudioAnalyzer
+
+    analyzer = AudioAnalyzer(file_path, data=data, **(options or {}))
+    return classify(analyzer.analyze())
+
+
+def classify(analysis_results: Dict) -> Dict:
+    """
+    Añade la clasificación del detector a un resultado de análisis
+
+    Args:
+        analysis_results: Resultados del análisis de AudioAnalyzer
+
+    Returns:
+        dict: Resultados con 'classification' y 'reason'
+    """
+    classification, reason = FakeDetector.detect(analysis_results)
+
+    return {
+        **analysis_results,
+        'classification': classification,
+        'reason': reason
+    }
+
+
+def error_result(file_path: Path, message: str = CRASH_MESSAGE) -> Dict:
+    """
+    Construye el resultado de un archivo cuyo análisis falló en el worker
+
+    Args:
+        file_path: Ruta al archivo que provocó el fallo
+        message: Descripción del error
+
+    Returns:
+        dict: Resultado clasificado como error
+    """
+    return {
+        'file_path': str(file_path),
+        'file_name': file_path.name,
+        'format': file_path.suffix.lower(),
+        'error': message,
+        'classification': CLASS_ERROR,
+        'reason': message
+    }
+
+
+def _lookup(cache: Optional[AnalysisCache], file_path: Path,
+            features: Optional[FeatureStore] = None) -> Optional[Dict]:
+    """
+    Busca un archivo en la caché y, si está, lo clasifica sin decodificar
+
+    Con almacén de espectros, un archivo que aún no está en él se
+    analiza aunque esté en la caché (la caché no guarda espectros).
+
+    Args:
+        cache: Caché de análisis (o None si está desactivada)
+        file_path: Ruta al archivo de audio
+        features: Almacén de espectros (opcional)
+
+    Returns:
+        dict: Resultado clasificado, o None si no hay entrada válida
+    """
+    if cache is None:
+        return None
+    if features is not None and not features.has(file_path):
+        cache.misses += 1
+        return None
+    analysis = cache.get(file_path)
+    if analysis is None:
+        return None
+    return classify(analysis)
+
+
+def _store(cache: Optional[AnalysisCache], file_path: Path, result: Dict,
+           features: Optional[FeatureStore] = None) -> Dict:
+    """
+    Guarda un resultado recién calculado en la caché (y su espectro en el
+    almacén de espectros) y lo devuelve sin el espectro
+    """
+    spectrum = result.pop('spectrum', None)
+    if cache is not None:
+        cache.put(file_path, result)
+    if features is not None:
+        features.put(file_path, result, spectrum)
+    return result
+
+
+def analyze_files(file_paths: List[Path], options: Optional[Dict] = None,
+                  contents: Optional[List[Optional[bytes]]] = None) -> List[Dict]:
+    """
+    Analiza y clasifica un grupo de archivos (tarea de un worker)
+
+    Con más de un archivo se usa el análisis por lotes de AudioAnalyzer.
+
+    Args:
+        file_paths: Rutas a los archivos de audio
+        options: Argumentos adicionales para AudioAnalyzer
+        contents: Contenido ya leído de cada archivo (None = leer del disco)
+
+    Returns:
+        list: Resultado de cada archivo, en el mismo orden
+    """
+    from src.analyzer import AudioAnalyzer
+
+    if len(file_paths) == 1:
+        return [analyze_file(file_paths[0], options, contents[0] if contents else None)]
+    return [classify(analysis)
+            for analysis in AudioAnalyzer.analyze_batch(file_paths, contents=contents, **(options or {}))]
+
+
+def _tasks(files: Iterable[Path], batch_size: int, cache: Optional[AnalysisCache],
+           features: Optional[FeatureStore] = None) -> Iterator[Tuple[List[Tuple[int, Path]], Optional[Dict]]]:
+    """
+    Agrupa los archivos en tareas de hasta batch_size archivos
+
+    Los aciertos de caché no forman parte de ninguna tarea: se generan
+    de inmediato, solos y con su resultado.
+
+    Args:
+        files: Iterable de rutas a analizar
+        batch_size: Archivos por tarea
+        cache: Caché de análisis (o None si está desactivada)
+        features: Almacén de espectros (opcional)
+
+    Yields:
+        tuple: (lista de (índice, ruta), resultado en caché o None)
+    """
+    chunk = []
+    for index, file_path in enumerate(files):
+        cached = _lookup(cache, file_path, features)
+        if cached is not None:
+            yield [(index, file_path)], cached
+            continue
+        chunk.append((index, file_path))
+        if len(chunk) >= batch_size:
+            yield chunk, None
+            chunk = []
+    if chunk:
+        yield chunk, None
+
+
+def _read_ahead(tasks: Iterator[Tuple[List[Tuple[int, Path]], Optional[Dict]]], prefetch: int,
+                io_threads: int) -> Iterator[Tuple[List[Tuple[int, Path]], Optional[Dict], Optional[List], Callable]]:
+    """
+    Añade a cada tarea el contenido de sus archivos, leído por adelantado
+    en hilos de E/S si prefetch > 0
+
+    El consumidor llama a release() cuando termina el análisis de la
+    tarea, para devolver sus bytes al presupuesto.
+
+    Args:
+        tasks: Tareas generadas por _tasks
+        prefetch: Presupuesto de bytes de la lectura anticipada (0 = desactivada)
+        io_threads: Hilos de E/S
+
+    Yields:
+        tuple: (lista de (índice, ruta), resultado en caché o None,
+            contenido de cada archivo o None, función release)
+    """
+    if not prefetch:
+        for items, cached in tasks:
+            yield items, cached, None, no_release
+        return
+
+    with Prefetcher(prefetch, io_threads) as prefetcher:
+        yield from prefetcher.read_ahead(tasks)
+
+
+def _collect(future, items: List[Tuple[int, Path]], cache: Optional[AnalysisCache],
+             broken: List[Tuple[int, Path]], features: Optional[FeatureStore] = None) -> Iterator[Tuple[int, Dict]]:
+    """
+    Genera los resultados de una tarea terminada
+
+    Si el pool se rompió, los archivos de la tarea se añaden a broken.
+
+    Yields:
+        tuple: (índice, resultado)
+    """
+    try:
+        results = future.result()
+    except BrokenProcessPool:
+        broken.extend(items)
+        return
+    except Exception as e:
+        results = [error_result(file_path, f"Error en el análisis: {e}") for _, file_path in items]
+
+    for (index, file_path), result in zip(items, results):
+        yield index, _store(cache, file_path, result, features)
+
+
+def _isolate(files: List[Tuple[int, Path]], options: Optional[Dict], cache: Optional[AnalysisCache],
+             features: Optional[FeatureStore] = None) -> Iterator[Tuple[int, Dict]]:
+    """
+    Reanaliza uno a uno, cada uno en un proceso propio, los archivos que
+    estaban en curso cuando se rompió el pool, para identificar al culpable
+
+    Args:
+        files: Lista de (índice, ruta) a reanalizar
+        options: Argumentos adicionales para AudioAnalyzer
+        cache: Caché de análisis (o None si está desactivada)
+        features: Almacén de espectros (opcional)
+
+    Yields:
+        tuple: (índice, resultado)
+    """
+    for index, file_path in files:
+        try:
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                result = _store(cache, file_path,
+                                executor.submit(analyze_file, file_path, options).result(), features)
+        except BrokenProcessPool:
+            result = error_result(file_path)
+        except Exception as e:
+            result = error_result(file_path, f"Error en el análisis: {e}")
+        yield index, result
+
+
+def _iter_sequential(files: Iterable[Path], batch_size: int, options: Optional[Dict],
+                     cache: Optional[AnalysisCache], prefetch: int = 0,
+                     io_threads: int = PREFETCH_THREADS,
+                     features: Optional[FeatureStore] = None) -> Iterator[Tuple[int, Dict]]:
+    """
+    Analiza archivos en el proceso actual, en orden de entrada
+
+    Args:
+        files: Iterable de rutas a analizar
+        batch_size: Archivos por tarea
+        options: Argumentos adicionales para AudioAnalyzer
+        cache: Caché de análisis (o None si está desactivada)
+        prefetch: Presupuesto de bytes de la lectura anticipada (0 = desactivada)
+        io_threads: Hilos de E/S de la lectura anticipada
+        features: Almacén de espectros (opcional)
+
+    Yields:
+        tuple: (índice en la secuencia de entrada, resultado)
+    """
+    for items, cached, contents, release in _read_ahead(_tasks(files, batch_size, cache, features),
+                                                        prefetch, io_threads):
+        if cached is not None:
+            yield items[0][0], cached
+            continue
+        try:
+            results = analyze_files([file_path for _, file_path in items], options, contents)
+        except Exception as e:
+            results = [error_result(file_path, f"Error en el análisis: {e}") for _, file_path in items]
+        finally:
+            del contents
+            release()
+        for (index, file_path), result in zip(items, results):
+            yield index, _store(cache, file_path, result, features)
+
+
+def _iter_parallel(files: Iterable[Path], jobs: int, batch_size: int, options: Optional[Dict],
+                   cache: Optional[AnalysisCache], prefetch: int = 0,
+                   io_threads: int = PREFETCH_THREADS,
+                   features: Optional[FeatureStore] = None) -> Iterator[Tuple[int, Dict]]:
+    """
+    Analiza archivos en un pool de procesos, en orden de finalización
+
+    Mantiene un número acotado de tareas en vuelo para no materializar la
+    lista de archivos. Si un worker muere (p. ej. por un archivo corrupto
+    que tumba el decodificador), los archivos afectados se aíslan y el
+    análisis continúa con un pool nuevo. Los aciertos de caché se generan
+    directamente sin pasar por el pool. Con prefetch, el contenido leído
+    por adelantado viaja a los workers junto con la tarea.
+
+    Args:
+        files: Iterable de rutas a analizar
+        jobs: Número de procesos worker
+        batch_size: Archivos por tarea
+        options: Argumentos adicionales para AudioAnalyzer
+        cache: Caché de análisis (o None si está desactivada)
+        prefetch: Presupuesto de bytes de la lectura anticipada (0 = desactivada)
+        io_threads: Hilos de E/S de la lectura anticipada
+        features: Almacén de espectros (opcional)
+
+    Yields:
+        tuple: (índice en la secuencia de entrada, resultado)
+    """
+    tasks = _read_ahead(_tasks(files, batch_size, cache, features), prefetch, io_threads)
+    max_pending = jobs * MAX_PENDING_PER_JOB
+    exhausted = False
+
+    while True:
+        pending = {}
+        broken = []
+
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            while True:
+                # Rellenar la cola de tareas
+                while not exhausted and len(pending) < max_pending:
+                    try:
+                        items, cached, contents, release = next(tasks)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    if cached is not None:
+                        yield items[0][0], cached
+                        continue
+                    try:
+                        future = executor.submit(
+                            analyze_files, [file_path for _, file_path in items], options, contents
+                        )
+                    except BrokenProcessPool:
+                        release()
+                        broken.extend(items)
+                        break
+                    # Los bytes leídos siguen reservados hasta que el worker termina
+                    future.add_done_callback(release)
+                    pending[future] = items
+
+                if broken or not pending:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    yield from _collect(future, pending.pop(future), cache, broken, features)
+
+                if broken:
+                    break
+
+            if broken:
+                # El pool está roto: recoger lo que aún esté en vuelo
+                for future, items in pending.items():
+                    yield from _collect(future, items, cache, broken, features)
+
+        if not broken:
+            return
+
+        yield from _isolate(sorted(broken, key=lambda item: item[0]), options, cache, features)
+
+
+def iter_results(files: Iterable[Path], jobs: int = 1, ordered: bool = False,
+                 batch_size: int = 1, options: Optional[Dict] = None,
+                 cache: Optional[AnalysisCache] = None, prefetch: int = 0,
+                 io_threads: int = PREFETCH_THREADS,
+                 features: Optional[FeatureStore] = None) -> Iterator[Dict]:
+    """
+    Analiza y clasifica archivos, generando los resultados a medida que terminan
+
+    Args:
+        files: Iterable de rutas a analizar
+        jobs: Número de procesos (1 = secuencial en el proceso actual)
+        ordered: Si True, los resultados se generan en el orden de entrada
+        batch_size: Archivos por tarea (>1 activa la FFT por lotes)
+        options: Argumentos adicionales para AudioAnalyzer
+        cache: Caché de análisis; los archivos sin cambios no se decodifican
+        prefetch: Bytes leídos por adelantado en hilos de E/S mientras se
+            analiza (0 = desactivado; útil en almacenamiento de red)
+        io_threads: Hilos de E/S de la lectura anticipada
+        features: Almacén de espectros donde guardar el espectro medio de
+            cada archivo analizado (para `tools reclassify`)
+
+    Yields:
+        dict: Resultado de cada archivo
+    """
+    if features is not None:
+        options = {**(options or {}), 'keep_spectrum': True}
+    if (options or {}).get('windows'):
+        # Con ventanas el análisis solo lee del disco sus tramos: leer los
+        # archivos completos por adelantado multiplicaría la E/S
+        prefetch = 0
+
+    if jobs <= 1:
+        for _, result in _iter_sequential(files, batch_size, options, cache, prefetch, io_threads, features):
+            yield result
+        return
+
+    if not ordered:
+        for _, result in _iter_parallel(files, jobs, batch_size, options, cache, prefetch, io_threads, features):
+            yield result
+        return
+
+    # Reordenar: retener los resultados que llegan antes de su turno
+    buffered = {}
+    next_index = 0
+    for index, result in _iter_parallel(files, jobs, batch_size, options, cache, prefetch, io_threads, features):
+        buffered[index] = result
+        while next_index in buffered:
+            yield buffered.pop(next_index)
+            next_index += 1
@@ -0,0 +1,148 @@
+"""
+Módulo de lectura anticipada de archivos (--prefetch)
+
+En almacenamiento de red la lectura en frío de cada archivo deja la CPU
+parada, y el análisis deja el disco parado. Un pool de hilos de E/S lee
+los próximos archivos a memoria mientras se analizan los anteriores.
+
+Los archivos se leen completos aunque el análisis solo decodifique los
+primeros ANALYSIS_DURATION segundos (el tamaño de ese tramo no se
+conoce sin analizar la cabecera): en una pista de 4 minutos se lee unas
+8 veces lo que se decodifica. PREFETCH_MAX_FILE acota esa lectura extra
+por archivo; con --windows no se lee por adelantado, porque el análisis
+solo lee del disco las ventanas.
+"""
+
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Deque, Iterable, Iterator, List, Optional, Tuple
+from src.config import PREFETCH_MAX_FILE, PREFETCH_THREADS
+
+
+def _read(file_path: Path) -> Optional[bytes]:
+    """Lee un archivo completo (None si falla: el análisis lo intentará de nuevo)"""
+    try:
+        return Path(file_path).read_bytes()
+    except OSError:
+        return None
+
+
+def no_release(*_):
+    """Liberación vacía (tareas sin contenido leído por adelantado)"""
+
+
+class Prefetcher:
+    """
+    Lee por adelantado el contenido de los archivos de las próximas tareas
+
+    La memoria está acotada por un presupuesto de bytes: los de una tarea
+    quedan reservados desde que se piden hasta que el consumidor llama a
+    la función release que acompaña a la tarea (cuando el análisis ha
+    terminado, también si se ejecuta en otro proceso). Si el presupuesto
+    está agotado por tareas ya entregadas, read_ahead espera a que se
+    libere; solo se supera, como mucho, en una tarea. Los aciertos de
+    caché y los archivos de más de max_file_size bytes no se leen.
+    """
+
+    def __init__(self, budget: int, threads: int = PREFETCH_THREADS,
+                 max_file_size: int = PREFETCH_MAX_FILE):
+        """
+        Inicializa la lectura anticipada
+
+        Args:
+            budget: Bytes máximos leídos por adelantado
+            threads: Hilos de E/S
+            max_file_size: Tamaño máximo de un archivo para leerlo por adelantado
+        """
+        self.budget = budget
+        self.max_file_size = min(max_file_size, budget)
+        self.reserved = 0
+        self._released = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='prefetch')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Detiene los hilos, descartando las lecturas que no hayan empezado"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, file_path: Path) -> Tuple[Optional[Future], int]:
+        """Encarga la lectura de un archivo y reserva su tamaño del presupuesto"""
+        try:
+            size = os.stat(file_path).st_size
+        except OSError:
+            return None, 0
+        if size > self.max_file_size:
+            return None, 0
+        with self._released:
+            self.reserved += size
+        return self._executor.submit(_read, file_path), size
+
+    def _releaser(self, size: int) -> Callable[..., None]:
+        """Función que devuelve size bytes al presupuesto (una sola vez)"""
+        if not size:
+            return no_release
+        released = []
+
+        def release(*_):
+            with self._released:
+                if not released:
+                    released.append(True)
+                    self.reserved -= size
+                    self._released.notify_all()
+
+        return release
+
+    def read_ahead(self, tasks: Iterable[Tuple[List[Tuple[int, Path]], Optional[dict]]]
+                   ) -> Iterator[Tuple[List[Tuple[int, Path]], Optional[dict],
+                                       Optional[List[Optional[bytes]]], Callable]]:
+        """
+        Añade a cada tarea el contenido de sus archivos, leído por adelantado
+
+        Las tareas se generan en el mismo orden. El consumidor debe llamar
+        a release() (admite argumentos, para usarla como callback de un
+        Future) cuando ya no necesite el contenido.
+
+        Args:
+            tasks: Tareas (lista de (índice, ruta), resultado en caché o None)
+
+        Yields:
+            tuple: (lista de (índice, ruta), resultado en caché o None,
+                contenido de cada archivo o None si no se leyó (None para
+                los aciertos de caché), función release)
+        """
+        tasks = iter(tasks)
+        pending: Deque = deque()
+        exhausted = False
+
+        while True:
+            # Pedir tareas mientras quede presupuesto; sin tareas leídas,
+            # esperar a que las entregadas lo liberen
+            while not exhausted:
+                with self._released:
+                    if self.reserved >= self.budget:
+                        if pending:
+                            break
+                        self._released.wait_for(lambda: self.reserved < self.budget)
+                try:
+                    items, cached = next(tasks)
+                except StopIteration:
+                    exhausted = True
+                    break
+                reads = [] if cached is not None else [self._submit(file_path) for _, file_path in items]
+                pending.append((items, cached, reads))
+
+            if not pending:
+                return
+
+            items, cached, reads = pending.popleft()
+            contents = [future.result() if future is not None else None
+                        for future, _ in reads] if reads else None
+            yield items, cached, contents, self._releaser(sum(size for _, size in reads))
@@ -0,0 +1,129 @@
+"""
+Módulo de instrumentación: tiempos por etapa del análisis
+"""
+
+import math
+import time
+from array import array
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional
+
+
+# Etapas medidas, en orden de ejecución ('output' se mide en main)
+TIMING_STAGES = ('metadata', 'prescreen', 'decode', 'resample', 'features', 'total', 'output')
+
+
+class StageTimer:
+    """Acumula tiempo de pared y de CPU por etapa para un archivo"""
+
+    def __init__(self):
+        self.stages: Dict[str, List[float]] = {}
+
+    def add(self, name: str, wall: float, cpu: float):
+        """
+        Suma tiempo a una etapa (una etapa puede repetirse, p. ej. decode
+        por cada ventana o nivel)
+
+        Args:
+            name: Nombre de la etapa
+            wall: Segundos de reloj
+            cpu: Segundos de CPU del proceso
+        """
+        totals = self.stages.setdefault(name, [0.0, 0.0])
+        totals[0] += wall
+        totals[1] += cpu
+
+    @contextmanager
+    def stage(self, name: str):
+        """Mide el bloque with como la etapa name"""
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - wall, time.process_time() - cpu)
+
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        """
+        Returns:
+            dict: {etapa: {'wall': segundos, 'cpu': segundos}}
+        """
+        return {name: {'wall': wall, 'cpu': cpu} for name, (wall, cpu) in self.stages.items()}
+
+
+def percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    """
+    Percentil por rango más cercano
+
+    Args:
+        sorted_values: Valores ordenados de menor a mayor
+        q: Percentil entre 0 y 100
+
+    Returns:
+        float: Valor del percentil, o None si no hay valores
+    """
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(q / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class TimingStats:
+    """
+    Agrega los tiempos por etapa y por formato de muchos archivos
+
+    Guarda los tiempos de pared en arrays de doubles (8 bytes por archivo
+    y etapa) para poder calcular percentiles exactos al final, y suma los
+    de pared y de CPU: una etapa con mucha menos CPU que pared espera E/S.
+    """
+
+    def __init__(self):
+        self._values: Dict[tuple, array] = {}
+        self._cpu: Dict[tuple, float] = {}
+
+    def add(self, file_format: str, timings: Dict[str, Dict[str, float]]):
+        """
+        Añade los tiempos de un archivo
+
+        Args:
+            file_format: Extensión del archivo ('.mp3', ...)
+            timings: Tiempos por etapa (StageTimer.as_dict())
+        """
+        for stage, values in timings.items():
+            for key in ((stage, None), (stage, file_format)):
+                self._values.setdefault(key, array('d')).append(values['wall'])
+                self._cpu[key] = self._cpu.get(key, 0.0) + values['cpu']
+
+    def __bool__(self) -> bool:
+        return bool(self._values)
+
+    def formats(self) -> List[str]:
+        """Formatos con tiempos registrados"""
+        return sorted({file_format for _, file_format in self._values if file_format})
+
+    def summary(self, stage: str, file_format: str = None) -> Optional[Dict[str, float]]:
+        """
+        Estadísticas de una etapa (todos los formatos si file_format es None)
+
+        Returns:
+            dict: count, p50, p95 y max del tiempo de pared y sus totales
+            wall y cpu, en segundos, o None si no hay datos
+        """
+        values = self._values.get((stage, file_format))
+        if not values:
+            return None
+        ordered = sorted(values)
+        return {
+            'count': len(ordered),
+            'p50': percentile(ordered, 50),
+            'p95': percentile(ordered, 95),
+            'max': ordered[-1],
+            'wall': math.fsum(ordered),
+            'cpu': self._cpu[(stage, file_format)],
+        }
+
+    def stages(self) -> Iterable[str]:
+        """Etapas con tiempos registrados, en el orden de TIMING_STAGES"""
+        present = {stage for stage, _ in self._values}
+        known = [stage for stage in TIMING_STAGES if stage in present]
+        return known + sorted(present - set(known))
@@ -2,33 +2,140 @@
 Módulo para generar reportes de análisis
 """
 
-import csv
-import json
+import re
+import sys
+import time
+from collections import Counter
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict
-from rich.console import Console
-from rich.table import Table
-from rich.progress import Progress, SpinnerColumn, TextColumn
+from typing import List, Dict, Optional, Tuple
 from src.config import (
     DEFAULT_OUTPUT_DIR, EMOJI_MAP, COLOR_MAP,
-    CLASS_LEGITIMATE, CLASS_FAKE, CLASS_SUSPICIOUS, CLASS_ERROR
+    CLASS_LEGITIMATE, CLASS_FAKE, CLASS_SUSPICIOUS, CLASS_ERROR,
+    OUTPUT_INTERACTIVE, OUTPUT_BATCH, OUTPUT_QUIET,
+    BATCH_FLUSH_INTERVAL, BATCH_PROGRESS_INTERVAL, ESTIMATED_SECONDS_PER_FILE
 )
+from src.results import ResultStore
+from src.profiling import TimingStats
+
+# Etiquetas de estilo de rich ([cyan], [/bold cyan]...), para el texto plano
+MARKUP = re.compile(r'\[/?[a-z][a-z ]*\]')
 
 
 class Reporter:
     """Genera reportes de los resultados del análisis"""
     
-    def __init__(self, verbose: bool = False):
+    def __init__(self, verbose: bool = False, keep_results: bool = True,
+                 mode: str = OUTPUT_INTERACTIVE, timings: bool = False):
         """
         Inicializa el reporter
         
         Args:
             verbose: Si True, muestra información detallada
+            keep_results: Si False, los resultados no se retienen en
+                memoria: solo se escriben en los reportes abiertos con
+                open_streams() y se cuentan para el resumen. Si True, se
+                guardan por columnas en un ResultStore
+            mode: OUTPUT_INTERACTIVE (rich), OUTPUT_BATCH (texto plano
+                agrupado) u OUTPUT_QUIET (sin salida por archivo)
+            timings: Si True, los reportes incluyen los tiempos por etapa
+                y el resumen muestra sus percentiles y totales de pared y CPU
         """
-        self.console = Console(force_terminal=True, legacy_windows=False)
+        self._console = None
+        self.mode = mode
         self.verbose = verbose
-        self.results = []
+        
+        # Modo batch: líneas pendientes y momento del último volcado
+        self._lines = []
+        self._last_flush = time.monotonic()
+        self._last_progress = 0.0
+        self.keep_results = keep_results
+        self.results = ResultStore()
+        self._positions = {}
+        self._streams = []
+        
+        # Contadores para el resumen (no requieren recorrer los resultados)
+        self.counts = Counter()
+        self.tiers = Counter()
+        self.duplicates = Counter()
+        self.timings = timings
+        self.timing_stats = TimingStats()
+    
+    @property
+    def console(self):
+        """Consola de rich, creada (e importada) en el primer uso"""
+        if self._console is None:
+            from rich.console import Console
+            if self.mode == OUTPUT_INTERACTIVE:
+                self._console = Console(force_terminal=True, legacy_windows=False)
+            else:
+                # Sin códigos ANSI ni resaltado automático (salida a logs)
+                self._console = Console(no_color=True, highlight=False, legacy_windows=False)
+        return self._console
+    
+    def _say(self, text: str = ""):
+        """
+        Imprime una línea con marcado de rich; fuera del modo interactivo,
+        mientras no se haya creado la consola, la escribe como texto plano
+        sin importar rich (--dry-run en scripts)
+        
+        Args:
+            text: Línea con etiquetas de estilo de rich
+        """
+        if self.mode == OUTPUT_INTERACTIVE or self._console is not None:
+            self.console.print(text)
+        else:
+            sys.stdout.write(MARKUP.sub("", text) + "\n")
+    
+    def open_streams(self, csv_path: str = None, json_path: str = None, jsonl_path: str = None,
+                     parquet_path: str = None):
+        """
+        Abre reportes que se escriben a medida que llegan los resultados
+        
+        Args:
+            csv_path: Reporte CSV (opcional)
+            json_path: Reporte JSON (opcional)
+            jsonl_path: Reporte JSON Lines, un resultado por línea (opcional)
+            parquet_path: Reporte Parquet, escrito al cerrar (opcional)
+        """
+        from src.writers import (
+            CSVReportWriter, JSONReportWriter, JSONLinesReportWriter, ParquetReportWriter
+        )
+        
+        for writer_class, output_path in ((CSVReportWriter, csv_path),
+                                          (JSONReportWriter, json_path),
+                                          (JSONLinesReportWriter, jsonl_path),
+                                          (ParquetReportWriter, parquet_path)):
+            if output_path:
+                self._streams.append(writer_class(output_path, timings=self.timings))
+    
+    def open_journal(self, journal_path: str):
+        """
+        Registra en un journal (--journal/--resume) los resultados que se
+        añadan a partir de ahora
+        
+        Args:
+            journal_path: Ruta del journal (se continúa si existe)
+        """
+        from src.journal import Journal
+        
+        self._streams.append(Journal(journal_path))
+    
+    def close_streams(self):
+        """Cierra los reportes incrementales e informa de los guardados"""
+        for writer in self._streams:
+            writer.close()
+            if writer.rows:
+                self.console.print(f"\n💾 Reporte guardado: [cyan]{writer.output_path}[/cyan]")
+        self._streams = []
+    
+    def _count(self, result: Dict, delta: int):
+        """Actualiza los contadores del resumen con un resultado"""
+        self.counts[result.get('classification')] += delta
+        if result.get('analysis_tier'):
+            self.tiers[result['analysis_tier']] += delta
+        if result.get('duplicate_of'):
+            self.duplicates[result['duplicate_of']] += delta
     
     def add_result(self, result: Dict):
         """
@@ -37,26 +144,132 @@ class Reporter:
         Args:
             result: Diccionario con resultados del análisis y detección
         """
-        self.results.append(result)
+        self._count(result, 1)
+        if self.timings and result.get('timings'):
+            self.timing_stats.add(result.get('format'), result['timings'])
+        for writer in self._streams:
+            writer.write(result)
+        
+        if self.keep_results:
+            self._positions[result.get('file_path')] = len(self.results)
+            self.results.append(self._retained(result))
+    
+    def _retained(self, result: Dict) -> Dict:
+        """Resultado tal como se retiene (sin tiempos si no se van a exportar)"""
+        if not self.timings and 'timings' in result:
+            return {k: v for k, v in result.items() if k != 'timings'}
+        return result
+    
+    def upsert_result(self, result: Dict):
+        """
+        Añade un resultado o reemplaza el existente del mismo archivo
+        
+        Args:
+            result: Diccionario con resultados del análisis y detección
+        """
+        position = self._positions.get(result.get('file_path'))
+        if position is None:
+            self.add_result(result)
+        else:
+            self._count(self.results[position], -1)
+            self._count(result, 1)
+            self.results[position] = self._retained(result)
+    
+    def remove_result(self, file_path: str) -> bool:
+        """
+        Quita del reporte el resultado de un archivo
+        
+        Args:
+            file_path: Ruta del archivo (clave 'file_path' del resultado)
+            
+        Returns:
+            bool: True si había un resultado para ese archivo
+        """
+        position = self._positions.pop(file_path, None)
+        if position is None:
+            return False
+        self._count(self.results[position], -1)
+        
+        # Mover el último a la posición liberada (O(1))
+        last = self.results.pop()
+        if position < len(self.results):
+            self.results[position] = last
+            self._positions[last.get('file_path')] = position
+        return True
     
     def print_header(self):
         """Imprime el encabezado del programa"""
         try:
-            self.console.print("\n🎵 [bold cyan]Fake Music Hunter v2.0[/bold cyan]")
+            self._say("\n🎵 [bold cyan]Fake Music Hunter v2.0[/bold cyan]")
         except UnicodeEncodeError:
-            self.console.print("\n[bold cyan]Fake Music Hunter v2.0[/bold cyan]")
-        self.console.print("═" * 50)
+            self._say("\n[bold cyan]Fake Music Hunter v2.0[/bold cyan]")
+        self._say("═" * 50)
     
-    def print_scan_info(self, path: str, total_files: int):
+    def print_scan_info(self, path: str, total_files: Optional[int] = None,
+                        shard: Optional[Tuple[int, int]] = None):
         """
         Imprime información del escaneo
         
         Args:
             path: Ruta escaneada
-            total_files: Número total de archivos encontrados
+            total_files: Número total de archivos encontrados (None si el
+                escaneo sigue en curso)
+            shard: (i, N) si solo se analiza una parte de la biblioteca
+        """
+        self._say(f"\n📁 Escaneando: [cyan]{path}[/cyan]")
+        if shard is not None:
+            self._say(f"   Shard: [yellow]{shard[0]}/{shard[1]}[/yellow]")
+        if total_files is not None:
+            self._say(f"   Archivos encontrados: [yellow]{total_files:,}[/yellow]")
+        self._say()
+    
+    def print_cache_info(self, hits: int, misses: int):
         """
-        self.console.print(f"\n📁 Escaneando: [cyan]{path}[/cyan]")
-        self.console.print(f"   Archivos encontrados: [yellow]{total_files:,}[/yellow]\n")
+        Imprime estadísticas de uso de la caché de análisis
+        
+        Args:
+            hits: Archivos servidos desde la caché
+            misses: Archivos analizados de nuevo
+        """
+        self._say(f"\n🗄️  Caché: [green]{hits:,}[/green] sin cambios, [yellow]{misses:,}[/yellow] analizados")
+    
+    def print_dry_run(self, stats: Dict[str, Dict[str, int]], jobs: int = 1):
+        """
+        Imprime el resultado de --dry-run: archivos, tamaño y estimación
+        
+        Args:
+            stats: {formato: {'files', 'bytes', 'cached'}} (main.library_stats)
+            jobs: Procesos de análisis previstos
+        """
+        total_files = sum(entry['files'] for entry in stats.values())
+        if total_files == 0:
+            self._say("[yellow]No se encontraron archivos de audio[/yellow]")
+            return
+        
+        total_bytes = 0
+        total_cached = 0
+        seconds = 0.0
+        for file_format, entry in sorted(stats.items()):
+            if not entry['files']:
+                continue
+            pending = entry['files'] - entry['cached']
+            seconds += pending * ESTIMATED_SECONDS_PER_FILE.get(file_format, max(ESTIMATED_SECONDS_PER_FILE.values()))
+            total_bytes += entry['bytes']
+            total_cached += entry['cached']
+            
+            cached = f", {entry['cached']:,} en caché" if entry['cached'] else ""
+            self._say(f"   {file_format}: [cyan]{entry['files']:,}[/cyan] archivos, "
+                      f"{entry['bytes'] / 1024 ** 3:.2f} GB{cached}")
+        
+        cached = f" ({total_cached:,} en caché)" if total_cached else ""
+        self._say(f"   Total: [cyan]{total_files:,}[/cyan] archivos, "
+                  f"{total_bytes / 1024 ** 3:.2f} GB{cached}")
+        
+        # Estimación lineal: los aciertos de caché no cuestan análisis
+        minutes, secs = divmod(round(seconds / max(jobs, 1)), 60)
+        hours, minutes = divmod(minutes, 60)
+        self._say(f"\n⏱️  Tiempo estimado de análisis (-J {jobs}): "
+                  f"[yellow]{hours:d}h {minutes:02d}m {secs:02d}s[/yellow]")
     
     def print_result(self, result: Dict):
         """
@@ -65,10 +278,23 @@ class Reporter:
         Args:
             result: Diccionario con resultados del análisis
         """
+        if self.mode == OUTPUT_QUIET:
+            return
+        
         classification = result.get('classification', CLASS_ERROR)
         reason = result.get('reason', 'Sin razón')
         file_name = result.get('file_name', 'Desconocido')
         
+        if self.mode == OUTPUT_BATCH:
+            if classification != CLASS_LEGITIMATE or self.verbose:
+                self._lines.append(
+                    f"{EMOJI_MAP.get(classification, '[?]')} {classification.upper()}: "
+                    f"{result.get('file_path', file_name)} - {reason}"
+                )
+                if time.monotonic() - self._last_flush >= BATCH_FLUSH_INTERVAL:
+                    self.flush()
+            return
+        
         emoji = EMOJI_MAP.get(classification, '❓')
         color = COLOR_MAP.get(classification, 'white')
         
@@ -85,6 +311,7 @@ class Reporter:
             cutoff_freq = result.get('cutoff_frequency')
             dynamic_range = result.get('dynamic_range')
             spectral_presence = result.get('spectral_presence')
+            analysis_tier = result.get('analysis_tier')
             
             if bitrate:
                 self.console.print(f"   • Bitrate: {bitrate/1000:.0f} kbps")
@@ -94,21 +321,57 @@ class Reporter:
                 self.console.print(f"   • Presencia espectral (18-22kHz): {spectral_presence:.1f}%")
             if dynamic_range:
                 self.console.print(f"   • Rango dinámico: {dynamic_range:.1f} dB")
+            if analysis_tier:
+                self.console.print(f"   • Decidido en el nivel {analysis_tier}")
+            if result.get('duplicate_of'):
+                self.console.print(f"   • Copia idéntica de {result['duplicate_of']}")
         
         # Razón
         self.console.print(f"   • {reason}")
     
+    def print_progress(self, done: int, total: int, finished: bool = True):
+        """
+        Imprime una línea de progreso en modo batch, como mucho una vez
+        cada BATCH_PROGRESS_INTERVAL segundos
+        
+        Args:
+            done: Archivos analizados
+            total: Archivos encontrados hasta el momento
+            finished: Si False, el escaneo sigue en curso y el total puede crecer
+        """
+        if self.mode != OUTPUT_BATCH:
+            return
+        
+        now = time.monotonic()
+        if now - self._last_progress < BATCH_PROGRESS_INTERVAL:
+            return
+        self._last_progress = now
+        
+        suffix = "" if finished else "+"
+        self._lines.append(f"Analizados {done:,}/{total:,}{suffix}")
+        self.flush()
+    
+    def flush(self):
+        """Escribe de una vez las líneas pendientes del modo batch"""
+        if self._lines:
+            self.console.file.write("\n".join(self._lines) + "\n")
+            self.console.file.flush()
+            self._lines = []
+        self._last_flush = time.monotonic()
+    
     def print_summary(self):
         """Imprime un resumen estadístico de los resultados"""
-        if not self.results:
+        self.flush()
+        
+        total = sum(self.counts.values())
+        if total == 0:
             self.console.print("\n[yellow]No hay resultados para mostrar[/yellow]")
             return
         
-        total = len(self.results)
-        legitimate = sum(1 for r in self.results if r.get('classification') == CLASS_LEGITIMATE)
-        fake = sum(1 for r in self.results if r.get('classification') == CLASS_FAKE)
-        suspicious = sum(1 for r in self.results if r.get('classification') == CLASS_SUSPICIOUS)
-        errors = sum(1 for r in self.results if r.get('classification') == CLASS_ERROR)
+        legitimate = self.counts[CLASS_LEGITIMATE]
+        fake = self.counts[CLASS_FAKE]
+        suspicious = self.counts[CLASS_SUSPICIOUS]
+        errors = self.counts[CLASS_ERROR]
         
         self.console.print("\n" + "═" * 50)
         self.console.print("\n[bold]RESUMEN:[/bold]")
@@ -129,6 +392,71 @@ class Reporter:
         if errors > 0:
             pct = (errors / total) * 100
             self.console.print(f"   [ERR] Errores: [dim red]{errors:,}[/dim red] ({pct:.1f}%)")
+        
+        # Análisis escalonado: en qué nivel se decidió cada archivo
+        tiers = +self.tiers
+        if tiers:
+            levels = ", ".join(f"nivel {tier}: {count:,}" for tier, count in sorted(tiers.items()))
+            self.console.print(f"   Decididos por nivel: {levels}")
+        
+        self.print_duplicates()
+        
+        self.print_timings()
+    
+    def print_duplicates(self):
+        """Imprime cuántas copias idénticas se omitieron (y sus grupos en modo verbose)"""
+        groups = +self.duplicates
+        if not groups:
+            return
+        
+        copies = sum(groups.values())
+        self.console.print(f"   Copias idénticas: [cyan]{copies:,}[/cyan] en {len(groups):,} grupos "
+                           f"(analizadas una sola vez)")
+        
+        if self.verbose:
+            for original, count in sorted(groups.items()):
+                self.console.print(f"      {original} [dim](+{count:,} copias)[/dim]")
+    
+    def print_timings(self):
+        """
+        Imprime p50/p95/máximo de pared de cada etapa, en total y por
+        formato, junto a los totales de pared y de CPU
+        """
+        if not self.timing_stats:
+            return
+        
+        from rich.table import Table
+        
+        table = Table(title="Tiempos por etapa (ms)", title_justify="left")
+        table.add_column("Etapa")
+        table.add_column("Formato")
+        table.add_column("Archivos", justify="right")
+        table.add_column("p50", justify="right")
+        table.add_column("p95", justify="right")
+        table.add_column("Máx", justify="right")
+        table.add_column("Total pared", justify="right")
+        table.add_column("Total CPU", justify="right")
+        table.add_column("CPU %", justify="right")
+        
+        for stage in self.timing_stats.stages():
+            for file_format in [None] + self.timing_stats.formats():
+                stats = self.timing_stats.summary(stage, file_format)
+                if stats is None:
+                    continue
+                table.add_row(
+                    stage if file_format is None else "",
+                    file_format or "todos",
+                    f"{stats['count']:,}",
+                    f"{stats['p50'] * 1000:.1f}",
+                    f"{stats['p95'] * 1000:.1f}",
+                    f"{stats['max'] * 1000:.1f}",
+                    f"{stats['wall'] * 1000:,.1f}",
+                    f"{stats['cpu'] * 1000:,.1f}",
+                    f"{stats['cpu'] / stats['wall']:.0%}" if stats['wall'] else "-"
+                )
+        
+        self.console.print()
+        self.console.print(table)
     
     def export_csv(self, output_path: str = None):
         """
@@ -137,9 +465,11 @@ class Reporter:
         Args:
             output_path: Ruta del archivo CSV de salida
         """
-        if not self.results:
+        if not self.results and output_path is None:
             return
         
+        from src.writers import CSVReportWriter, write_report
+        
         if output_path is None:
             output_dir = Path(DEFAULT_OUTPUT_DIR)
             output_dir.mkdir(exist_ok=True)
@@ -149,22 +479,7 @@ class Reporter:
             output_path = Path(output_path)
             output_path.parent.mkdir(parents=True, exist_ok=True)
         
-        # Campos a exportar
-        fieldnames = [
-            'file_name', 'file_path', 'classification', 'reason',
-            'format', 'bitrate', 'sample_rate', 'cutoff_frequency',
-            'dynamic_range', 'file_size'
-        ]
-        
-        with open(output_path, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames, extrasaction='ignore')
-            writer.writeheader()
-            
-            for result in self.results:
-                # Convertir bitrate a kbps para legibilidad
-                if result.get('bitrate'):
-                    result['bitrate'] = f"{result['bitrate']/1000:.0f} kbps"
-                writer.writerow(result)
+        write_report(CSVReportWriter, output_path, self.results, timings=self.timings, empty=True)
         
         self.console.print(f"\n💾 Reporte guardado: [cyan]{output_path}[/cyan]")
     
@@ -175,9 +490,11 @@ class Reporter:
         Args:
             output_path: Ruta del archivo JSON de salida
         """
-        if not self.results:
+        if not self.results and output_path is None:
             return
         
+        from src.writers import JSONReportWriter, write_report
+        
         if output_path is None:
             output_dir = Path(DEFAULT_OUTPUT_DIR)
             output_dir.mkdir(exist_ok=True)
@@ -187,7 +504,36 @@ class Reporter:
             output_path = Path(output_path)
             output_path.parent.mkdir(parents=True, exist_ok=True)
         
-        with open(output_path, 'w', encoding='utf-8') as jsonfile:
-            json.dump(self.results, jsonfile, indent=2, ensure_ascii=False)
+        write_report(JSONReportWriter, output_path, self.results, timings=self.timings, empty=True)
         
         self.console.print(f"\n💾 Reporte JSON guardado: [cyan]{output_path}[/cyan]")
+    
+    def export_jsonl(self, output_path: str):
+        """
+        Exporta los resultados a JSON Lines
+        
+        Args:
+            output_path: Ruta del archivo JSON Lines de salida
+        """
+        from src.writers import JSONLinesReportWriter, write_report
+        
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        write_report(JSONLinesReportWriter, output_path, self.results, timings=self.timings, empty=True)
+        
+        self.console.print(f"\n💾 Reporte JSON Lines guardado: [cyan]{output_path}[/cyan]")
+    
+    def export_parquet(self, output_path: str):
+        """
+        Exporta los resultados a Parquet (requiere pyarrow)
+        
+        Args:
+            output_path: Ruta del archivo Parquet de salida
+        """
+        from src.writers import ParquetReportWriter, write_report
+        
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        write_report(ParquetReportWriter, output_path, self.results, timings=self.timings, empty=True)
+        
+        self.console.print(f"\n💾 Reporte Parquet guardado: [cyan]{output_path}[/cyan]")
@@ -0,0 +1,343 @@
+"""
+Módulo de almacenamiento columnar de resultados y exportación a Parquet
+"""
+
+import importlib.util
+import math
+from array import array
+from pathlib import PurePath
+from typing import Dict, Iterator, List, Optional, Sequence
+from src.config import CLASS_LEGITIMATE, CLASS_FAKE, CLASS_SUSPICIOUS, CLASS_ERROR
+
+
+# Códigos fijos de clasificación (el resto de categorías se numeran según aparecen)
+CLASS_CODES = {CLASS_LEGITIMATE: 0, CLASS_FAKE: 1, CLASS_SUSPICIOUS: 2, CLASS_ERROR: 3}
+
+# Columnas con pocos valores distintos: un código por fila y la lista de valores
+CATEGORY_COLUMNS = (
+    'format', 'analysis_tier', 'cutoff_source', 'lame_encoder', 'lame_vbr_method',
+    'has_content_above_20k', 'has_hires_content', 'classification', 'shard'
+)
+
+# Columnas numéricas (float64); las de INT_COLUMNS se devuelven como int
+NUMERIC_COLUMNS = (
+    'bitrate', 'sample_rate', 'channels', 'length', 'file_size', 'lame_lowpass',
+    'analysis_sample_rate', 'cutoff_frequency', 'high_freq_energy', 'spectral_presence',
+    'hires_presence', 'dynamic_range'
+)
+INT_COLUMNS = ('bitrate', 'sample_rate', 'channels', 'file_size', 'lame_lowpass', 'analysis_sample_rate')
+
+# Columnas de texto libre
+TEXT_COLUMNS = ('file_path', 'error', 'duplicate_of')
+
+# Tipo de los valores de las columnas categóricas que no son texto (Parquet)
+CATEGORY_TYPES = {'analysis_tier': 'int64', 'has_content_above_20k': 'bool_', 'has_hires_content': 'bool_'}
+
+# Orden de los campos al reconstruir un resultado (el del analizador)
+FIELD_ORDER = (
+    'file_path', 'format', 'bitrate', 'sample_rate', 'channels', 'length', 'file_size',
+    'lame_encoder', 'lame_lowpass', 'lame_vbr_method', 'cutoff_source', 'analysis_tier',
+    'error', 'analysis_sample_rate', 'cutoff_frequency', 'high_freq_energy', 'spectral_presence',
+    'has_content_above_20k', 'has_hires_content', 'hires_presence', 'dynamic_range',
+    'duplicate_of', 'classification', 'reason', 'shard'
+)
+
+
+def check_parquet():
+    """
+    Comprueba que está instalado pyarrow (ParquetReportWriter escribe
+    por grupos de filas con pyarrow.parquet)
+
+    Raises:
+        ImportError: Si no está instalado pyarrow
+    """
+    if importlib.util.find_spec('pyarrow') is None:
+        raise ImportError("La exportación a Parquet requiere pyarrow (pip install pyarrow)")
+
+
+def parquet_schema(extra_numeric: Sequence[str] = ()):
+    """
+    Esquema Arrow de ResultStore.to_dataframe(), fijo para que todos los
+    grupos de filas de un archivo Parquet coincidan aunque a un grupo le
+    falte algún valor
+
+    Args:
+        extra_numeric: Columnas numéricas adicionales del almacén
+
+    Returns:
+        pyarrow.Schema: Categóricas y razón como diccionario, enteras
+            como int64, resto de numéricas como float64 y textos como string
+    """
+    import pyarrow as pa
+
+    fields = [('file_path', pa.string()), ('file_name', pa.string())]
+    for field in FIELD_ORDER[1:] + tuple(extra_numeric):
+        if field in CATEGORY_COLUMNS:
+            field_type = pa.dictionary(pa.int32(), getattr(pa, CATEGORY_TYPES.get(field, 'string'))())
+        elif field == 'reason':
+            field_type = pa.dictionary(pa.int32(), pa.string())
+        elif field in INT_COLUMNS:
+            field_type = pa.int64()
+        elif field in TEXT_COLUMNS:
+            field_type = pa.string()
+        else:
+            field_type = pa.float64()
+        fields.append((field, field_type))
+    return pa.schema(fields)
+
+
+class ResultStore:
+    """
+    Resultados guardados por columnas en lugar de un diccionario por archivo
+
+    Las columnas categóricas (clasificación, formato...) ocupan un código
+    de 2 bytes por fila, las numéricas 8 bytes, y una máscara por fila
+    recuerda qué campos tenía cada resultado para reconstruirlo igual.
+    La razón se guarda como un código de 4 bytes: el de la plantilla del
+    detector que la reproduce con los valores de la fila (el texto se
+    formatea al leerla) o, si ninguna lo hace, el de su texto en una
+    tabla de textos distintos.
+    file_name se deriva de file_path, y los campos fuera del esquema (p.
+    ej. 'timings') se guardan aparte solo en las filas que los tienen.
+
+    Admite las operaciones de lista que usa Reporter: append, acceso y
+    reemplazo por posición y pop() del último.
+    """
+
+    def __init__(self, extra_numeric: Sequence[str] = ()):
+        """
+        Inicializa un almacén vacío
+
+        Args:
+            extra_numeric: Columnas numéricas adicionales (p. ej. tiempos
+                por etapa); en total caben 64 campos en la máscara
+        """
+        self.numeric_columns = NUMERIC_COLUMNS + tuple(extra_numeric)
+        self._fields = FIELD_ORDER + tuple(extra_numeric)
+        self._bits = {field: 1 << i for i, field in enumerate(self._fields)}
+
+        self._codes = {column: array('h') for column in CATEGORY_COLUMNS}
+        self._categories: Dict[str, List] = {column: [] for column in CATEGORY_COLUMNS}
+        self._lookup: Dict[str, Dict] = {column: {} for column in CATEGORY_COLUMNS}
+        for classification in CLASS_CODES:
+            self._category_code('classification', classification)
+
+        self._numbers = {column: array('d') for column in self.numeric_columns}
+        self._text: Dict[str, List[Optional[str]]] = {column: [] for column in TEXT_COLUMNS}
+        self._reasons = array('i')
+        self._reason_texts: List[str] = []
+        self._reason_lookup: Dict[str, int] = {}
+        self._present = array('Q')
+        self._extras: Dict[int, Dict] = {}
+
+    def __len__(self) -> int:
+        return len(self._present)
+
+    def __iter__(self) -> Iterator[Dict]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def _category_code(self, column: str, value) -> int:
+        """Código de un valor categórico (-1 = None), registrándolo si es nuevo"""
+        if value is None:
+            return -1
+        lookup = self._lookup[column]
+        code = lookup.get(value)
+        if code is None:
+            code = lookup[value] = len(self._categories[column])
+            self._categories[column].append(value)
+        return code
+
+    def _reason_code(self, result: Dict) -> int:
+        """
+        Código de la razón de un resultado: -1 = sin razón, menor que
+        len(REASON_TEMPLATES) = plantilla, el resto = texto de la tabla
+        """
+        from src.detector import REASON_TEMPLATES, reason_code
+
+        reason = result.get('reason')
+        if reason is None:
+            return -1
+        code = reason_code(reason, result)
+        if code is not None:
+            return code
+        text_code = self._reason_lookup.get(reason)
+        if text_code is None:
+            text_code = self._reason_lookup[reason] = len(self._reason_texts)
+            self._reason_texts.append(reason)
+        return len(REASON_TEMPLATES) + text_code
+
+    def _reason(self, index: int) -> Optional[str]:
+        """Texto de la razón de una fila (formateado a partir de sus columnas)"""
+        from src.detector import REASON_TEMPLATES, format_reason
+
+        code = self._reasons[index]
+        if code < 0:
+            return None
+        if code >= len(REASON_TEMPLATES):
+            return self._reason_texts[code - len(REASON_TEMPLATES)]
+
+        def number(column: str, default=None):
+            value = self._numbers[column][index]
+            return default if math.isnan(value) else value
+
+        file_format = self._codes['format'][index]
+        bitrate = number('bitrate', 0)
+        return format_reason(code, {
+            'error': self._text['error'][index],
+            'format': (self._categories['format'][file_format] if file_format >= 0 else '').lower(),
+            'cutoff': number('cutoff_frequency'),
+            'kbps': bitrate / 1000 if bitrate else 0,
+            'presence': number('spectral_presence', 0),
+            'sample_rate': number('analysis_sample_rate', 0) / 1000,
+        })
+
+    def _encode(self, result: Dict):
+        """Descompone un resultado en (máscara, códigos, números, textos, razón, extras)"""
+        present = 0
+        extras = {}
+        for key in result:
+            bit = self._bits.get(key)
+            if bit is not None:
+                present |= bit
+            elif key != 'file_name' or result[key] != PurePath(result.get('file_path', '')).name:
+                extras[key] = result[key]
+
+        codes = {column: self._category_code(column, result.get(column)) for column in CATEGORY_COLUMNS}
+        numbers = {}
+        for column in self.numeric_columns:
+            value = result.get(column)
+            numbers[column] = math.nan if value is None else float(value)
+        text = {column: result.get(column) for column in TEXT_COLUMNS}
+        return present, codes, numbers, text, self._reason_code(result), extras
+
+    def append(self, result: Dict):
+        """
+        Añade un resultado
+
+        Args:
+            result: Diccionario con resultados del análisis y detección
+        """
+        present, codes, numbers, text, reason, extras = self._encode(result)
+        for column, code in codes.items():
+            self._codes[column].append(code)
+        for column, value in numbers.items():
+            self._numbers[column].append(value)
+        for column, value in text.items():
+            self._text[column].append(value)
+        self._reasons.append(reason)
+        if extras:
+            self._extras[len(self._present)] = extras
+        self._present.append(present)
+
+    def __setitem__(self, index: int, result: Dict):
+        present, codes, numbers, text, reason, extras = self._encode(result)
+        for column, code in codes.items():
+            self._codes[column][index] = code
+        for column, value in numbers.items():
+            self._numbers[column][index] = value
+        for column, value in text.items():
+            self._text[column][index] = value
+        self._reasons[index] = reason
+        self._extras.pop(index, None)
+        if extras:
+            self._extras[index] = extras
+        self._present[index] = present
+
+    def __getitem__(self, index: int) -> Dict:
+        """Reconstruye el resultado de una fila"""
+        if index < 0:
+            index += len(self)
+        present = self._present[index]
+        result = {}
+        for field in self._fields:
+            if not present & self._bits[field]:
+                continue
+            if field in self._codes:
+                code = self._codes[field][index]
+                result[field] = self._categories[field][code] if code >= 0 else None
+            elif field in self._numbers:
+                value = self._numbers[field][index]
+                if math.isnan(value):
+                    value = None
+                elif field in INT_COLUMNS:
+                    value = int(value)
+                result[field] = value
+            elif field == 'reason':
+                result[field] = self._reason(index)
+            else:
+                result[field] = self._text[field][index]
+            if field == 'file_path':
+                result['file_name'] = PurePath(result['file_path'] or '').name
+        result.update(self._extras.get(index, {}))
+        return result
+
+    def pop(self) -> Dict:
+        """Quita y devuelve el último resultado"""
+        result = self[-1]
+        for column in self._codes.values():
+            column.pop()
+        for column in self._numbers.values():
+            column.pop()
+        for column in self._text.values():
+            column.pop()
+        self._reasons.pop()
+        self._extras.pop(len(self._present) - 1, None)
+        self._present.pop()
+        return result
+
+    def class_counts(self) -> Dict[str, int]:
+        """
+        Cuenta los resultados por clasificación (vectorizado)
+
+        Returns:
+            dict: {clasificación: número de archivos}
+        """
+        import numpy as np
+
+        codes = np.frombuffer(self._codes['classification'], dtype=np.int16)
+        counts = np.bincount(codes[codes >= 0], minlength=len(self._categories['classification']))
+        return {value: int(count) for value, count in zip(self._categories['classification'], counts)}
+
+    def to_dataframe(self):
+        """
+        Convierte el almacén en un DataFrame de pandas sin pasar por filas
+
+        Las columnas categóricas y la razón se convierten en
+        pandas.Categorical (Parquet las guarda como diccionario) y las enteras en Int64 con
+        nulos. Los campos fuera del esquema no se incluyen.
+
+        Returns:
+            pandas.DataFrame: Una fila por resultado
+        """
+        import numpy as np
+        import pandas as pd
+
+        columns = {'file_path': self._text['file_path'],
+                   'file_name': [PurePath(path or '').name for path in self._text['file_path']]}
+        for field in self._fields:
+            if field in self._codes:
+                columns[field] = pd.Categorical.from_codes(
+                    np.frombuffer(self._codes[field], dtype=np.int16), categories=self._categories[field]
+                )
+            elif field in self._numbers:
+                values = pd.Series(np.frombuffer(self._numbers[field], dtype=np.float64), copy=True)
+                columns[field] = values.astype('Int64') if field in INT_COLUMNS else values
+            elif field == 'reason':
+                columns[field] = pd.Categorical([self._reason(index) for index in range(len(self))])
+            elif field != 'file_path':
+                columns[field] = self._text[field]
+        return pd.DataFrame(columns)
+
+    def to_parquet(self, output_path: str):
+        """
+        Escribe el almacén como archivo Parquet
+
+        Args:
+            output_path: Ruta del archivo de salida
+
+        Raises:
+            ImportError: Si no está instalado pyarrow
+        """
+        check_parquet()
+        self.to_dataframe().to_parquet(output_path, index=False)
@@ -3,15 +3,24 @@ Módulo para escanear directorios en busca de archivos de audio
 """
 
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from pathlib import Path
-from typing import List, Generator
-from src.config import SUPPORTED_FORMATS
+from queue import Queue
+from typing import List, Generator, Optional, Tuple
+from src.config import SUPPORTED_FORMATS, DEFAULT_SCAN_WORKERS
+from src.sharding import shard_of
+
+
+# Marca de fin de escaneo en la cola de stream()
+_SCAN_DONE = object()
 
 
 class AudioScanner:
     """Escanea directorios buscando archivos de audio"""
     
-    def __init__(self, root_path: str, recursive: bool = True, formats: List[str] = None):
+    def __init__(self, root_path: str, recursive: bool = True, formats: List[str] = None,
+                 workers: int = DEFAULT_SCAN_WORKERS, shard: Optional[Tuple[int, int]] = None):
         """
         Inicializa el escáner
         
@@ -19,9 +28,19 @@ class AudioScanner:
             root_path: Ruta raíz para comenzar el escaneo
             recursive: Si True, escanea subdirectorios
             formats: Lista de extensiones a buscar (ej: ['.mp3', '.flac'])
+            workers: Hilos que recorren directorios en paralelo (útil en
+                unidades de red, donde domina la latencia de cada listado)
+            shard: (i, N) para quedarse solo con los archivos del shard i
+                de N (ver sharding.shard_of); None = todos
         """
         self.root_path = Path(root_path)
         self.recursive = recursive
+        self.workers = workers
+        self.shard = shard
+        self.found = 0
+        self.finished = False
+        self._visited = set()
+        self._visited_lock = threading.Lock()
         self.formats = formats or SUPPORTED_FORMATS
         
         # Asegurar que las extensiones comiencen con punto
@@ -30,11 +49,85 @@ class AudioScanner:
         
         # Convertir a minúsculas para comparación case-insensitive
         self.formats = [fmt.lower() for fmt in self.formats]
+        self._suffixes = frozenset(self.formats)
+    
+    def scan_dir(self, directory: str) -> Tuple[List[Path], List[str]]:
+        """
+        Lista un directorio con os.scandir
+        
+        La extensión se comprueba antes de consultar el tipo de entrada, y
+        el tipo sale de la propia entrada del directorio (sin stat extra
+        en la mayoría de sistemas de archivos). Los subdirectorios incluyen
+        los enlaces simbólicos a directorios; scan() evita los ciclos.
+        
+        Args:
+            directory: Directorio a listar
+            
+        Returns:
+            tuple: (archivos de audio, subdirectorios)
+        """
+        files = []
+        subdirs = []
+        
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if (os.path.splitext(entry.name)[1].lower() in self._suffixes
+                                and self.in_shard(entry.path) and entry.is_file()):
+                            files.append(Path(entry.path))
+                        elif self.recursive and entry.is_dir():
+                            subdirs.append(entry.path)
+                    except OSError:
+                        continue
+        except OSError as e:
+            print(f"Error leyendo el directorio {directory}: {e}")
+        
+        return files, subdirs
+    
+    def _scan_new_dir(self, directory: str) -> Tuple[List[Path], List[str]]:
+        """
+        Lista un directorio si no se ha listado ya en este escaneo
+        
+        Los directorios se identifican por (dispositivo, inodo): un enlace
+        simbólico a un antecesor no crea un ciclo y dos enlaces a la misma
+        carpeta no duplican sus archivos.
+        """
+        try:
+            stat = os.stat(directory)
+        except OSError:
+            return self.scan_dir(directory)
+        key = (stat.st_dev, stat.st_ino)
+        with self._visited_lock:
+            if key in self._visited:
+                return [], []
+            self._visited.add(key)
+        return self.scan_dir(directory)
+    
+    def in_shard(self, path: str) -> bool:
+        """
+        Indica si un archivo pertenece al shard de este escáner
+        
+        Args:
+            path: Ruta del archivo (dentro de la raíz)
+            
+        Returns:
+            bool: True si no hay reparto o el archivo es de este shard
+        """
+        if self.shard is None:
+            return True
+        relative = Path(os.path.relpath(path, self.root_path)).as_posix()
+        return shard_of(relative, self.shard[1]) == self.shard[0]
     
     def scan(self) -> Generator[Path, None, None]:
         """
         Escanea el directorio y genera rutas de archivos de audio
         
+        Los archivos se generan a medida que se descubren. Con más de un
+        worker, varios directorios se listan a la vez y el orden depende
+        de cuál termine antes. Los enlaces simbólicos a directorios se
+        siguen, y cada directorio se lista una sola vez.
+        
         Yields:
             Path: Ruta de cada archivo de audio encontrado
         """
@@ -44,14 +137,63 @@ class AudioScanner:
         if not self.root_path.is_dir():
             raise NotADirectoryError(f"La ruta no es un directorio: {self.root_path}")
         
-        # Usar rglob si es recursivo, glob si no
-        pattern = '**/*' if self.recursive else '*'
+        root = str(self.root_path)
+        self._visited = set()
+        
+        if self.workers <= 1:
+            pending = [root]
+            while pending:
+                files, subdirs = self._scan_new_dir(pending.pop())
+                yield from files
+                pending.extend(reversed(subdirs))
+            return
+        
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            pending = {executor.submit(self._scan_new_dir, root)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    files, subdirs = future.result()
+                    for subdir in subdirs:
+                        pending.add(executor.submit(self._scan_new_dir, subdir))
+                    yield from files
+    
+    def stream(self) -> Generator[Path, None, None]:
+        """
+        Escanea en un hilo de fondo y genera las rutas según llegan
+        
+        El descubrimiento no espera al consumidor: self.found cuenta los
+        archivos encontrados hasta el momento y self.finished indica si el
+        recorrido terminó, de modo que el total se conoce antes de que el
+        análisis alcance al escaneo.
+        
+        Yields:
+            Path: Ruta de cada archivo de audio encontrado
+        """
+        queue = Queue()
+        self.found = 0
+        self.finished = False
+        
+        def walk():
+            try:
+                for file_path in self.scan():
+                    self.found += 1
+                    queue.put(file_path)
+            except Exception as e:
+                queue.put(e)
+            finally:
+                self.finished = True
+                queue.put(_SCAN_DONE)
+        
+        threading.Thread(target=walk, name='audio-scanner', daemon=True).start()
         
-        for file_path in self.root_path.glob(pattern):
-            if file_path.is_file():
-                # Verificar extensión (case-insensitive)
-                if file_path.suffix.lower() in self.formats:
-                    yield file_path
+        while True:
+            item = queue.get()
+            if item is _SCAN_DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
     
     def count_files(self) -> int:
         """
@@ -0,0 +1,175 @@
+"""
+Módulo de reparto de una biblioteca entre varias máquinas (--shard) y
+fusión de sus reportes
+"""
+
+import csv
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+# Columnas numéricas del reporte CSV (el resto se lee como texto)
+CSV_INT_FIELDS = ('sample_rate', 'file_size', 'analysis_tier')
+CSV_FLOAT_FIELDS = ('cutoff_frequency', 'dynamic_range')
+
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """
+    Interpreta una especificación 'i/N' (i de 1 a N)
+
+    Args:
+        spec: Texto como '3/8'
+
+    Returns:
+        tuple: (i, N)
+
+    Raises:
+        ValueError: Si el formato o los valores no son válidos
+    """
+    try:
+        index, count = (int(part) for part in spec.split('/'))
+    except ValueError:
+        raise ValueError(f"Formato de shard inválido (se espera i/N): {spec}") from None
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Shard fuera de rango (1 <= i <= N): {spec}")
+    return index, count
+
+
+def shard_of(relative_path: str, count: int) -> int:
+    """
+    Shard (de 1 a count) al que pertenece un archivo
+
+    Depende solo de la ruta relativa a la raíz del escaneo, con '/' como
+    separador, así que es el mismo en todas las máquinas aunque la
+    biblioteca esté montada en rutas o sistemas operativos distintos.
+
+    Args:
+        relative_path: Ruta relativa a la raíz, en formato posix
+        count: Número total de shards
+
+    Returns:
+        int: Índice del shard
+    """
+    digest = hashlib.blake2b(relative_path.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % count + 1
+
+
+def tag_results(results: Iterable[Dict], shard: Optional[Tuple[int, int]]) -> Iterator[Dict]:
+    """
+    Añade a cada resultado el campo 'shard' ('i/N'), necesario para fusionar
+
+    Args:
+        results: Resultados del análisis
+        shard: (i, N), o None si la ejecución no está repartida
+
+    Yields:
+        dict: Cada resultado
+    """
+    label = f"{shard[0]}/{shard[1]}" if shard else None
+    for result in results:
+        if label:
+            result['shard'] = label
+        yield result
+
+
+def _from_csv_row(row: Dict[str, str]) -> Dict:
+    """Reconstruye un resultado a partir de una fila del reporte CSV"""
+    result = {}
+    for key, value in row.items():
+        if key is None or key.endswith('_ms'):
+            # Columnas sobrantes o de tiempos (se descartan al fusionar)
+            continue
+        if value == '':
+            result[key] = None
+        elif key == 'bitrate':
+            result[key] = int(value.split()[0]) * 1000
+        elif key in CSV_INT_FIELDS:
+            result[key] = int(value)
+        elif key in CSV_FLOAT_FIELDS:
+            result[key] = float(value)
+        else:
+            result[key] = value
+    return result
+
+
+def read_report(report_path: str) -> Iterator[Dict]:
+    """
+    Lee un reporte CSV, JSON o JSON Lines (según la extensión)
+
+    Los JSON se cargan completos; para reportes muy grandes conviene
+    JSON Lines, que se lee línea a línea.
+
+    Args:
+        report_path: Ruta del reporte
+
+    Yields:
+        dict: Cada resultado del reporte
+    """
+    report_path = Path(report_path)
+    suffix = report_path.suffix.lower()
+
+    if suffix == '.csv':
+        with open(report_path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                yield _from_csv_row(row)
+    elif suffix == '.json':
+        with open(report_path, encoding='utf-8') as f:
+            yield from json.load(f)
+    else:
+        with open(report_path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def report_shard(report_path: str) -> Optional[str]:
+    """
+    Shard ('i/N') de un reporte, leído de su primer resultado
+
+    Returns:
+        str: Etiqueta del shard, o None si el reporte está vacío o no
+            procede de una ejecución con --shard
+    """
+    for result in read_report(report_path):
+        return result.get('shard')
+    return None
+
+
+def check_shards(labels: Dict[str, Optional[str]]) -> List[str]:
+    """
+    Comprueba que un conjunto de reportes cubre todos los shards una vez
+
+    Args:
+        labels: {ruta del reporte: etiqueta 'i/N' o None}
+
+    Returns:
+        list: Problemas encontrados (vacía si la cobertura es exacta)
+    """
+    problems = []
+    owners: Dict[int, List[str]] = {}
+    counts = set()
+
+    for report_path, label in labels.items():
+        if label is None:
+            problems.append(f"{report_path}: sin campo 'shard' (¿ejecución sin --shard o reporte vacío?)")
+            continue
+        index, count = parse_shard(label)
+        counts.add(count)
+        owners.setdefault(index, []).append(report_path)
+
+    if len(counts) > 1:
+        problems.append(f"Los reportes usan números de shards distintos: {sorted(counts)}")
+        return problems
+    if not counts:
+        return problems
+
+    count = counts.pop()
+    for index, reports in sorted(owners.items()):
+        if len(reports) > 1:
+            problems.append(f"Shard {index}/{count} solapado en: {', '.join(reports)}")
+    missing = [f"{index}/{count}" for index in range(1, count + 1) if index not in owners]
+    if missing:
+        problems.append(f"Faltan shards: {', '.join(missing)}")
+    return problems
@@ -0,0 +1,449 @@
+"""
+Módulo de cálculo espectral por bloques con memoria acotada
+"""
+
+import numpy as np
+import scipy.fft
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from src.config import (
+    FFT_SIZE, HOP_LENGTH, RMS_FRAME_LENGTH, STFT_BLOCK_FRAMES,
+    MIN_FREQUENCY, MAX_FREQUENCY, ENERGY_THRESHOLD,
+    HIRES_SAMPLE_RATE, HIRES_BAND_MIN
+)
+
+# Parámetros de conversión a dB (los de librosa.amplitude_to_db)
+AMIN = 1e-5
+TOP_DB = 80.0
+
+# Bandas de las métricas de altas frecuencias (Hz)
+HIGH_BAND = (18000, 22000)
+ULTRA_HIGH_BAND = (20000, 22000)
+
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    """Marca un array compartido (en caché) como de solo lectura"""
+    array.flags.writeable = False
+    return array
+
+
+@lru_cache(maxsize=None)
+def hann_window(n_fft: int) -> np.ndarray:
+    """
+    Ventana de Hann periódica (la misma que usa librosa.stft por defecto)
+
+    Se calcula una vez por tamaño y se comparte (solo lectura).
+
+    Args:
+        n_fft: Tamaño de la ventana
+
+    Returns:
+        np.ndarray: Ventana en float32
+    """
+    n = np.arange(n_fft)
+    return _read_only((0.5 - 0.5 * np.cos(2.0 * np.pi * n / n_fft)).astype(np.float32))
+
+
+class SpectralGrid(NamedTuple):
+    """
+    Frecuencias de los bins y rangos de bins de cada banda para un par
+    (sr, n_fft)
+
+    Las frecuencias crecen con el bin, así que cada banda [mín, máx] es
+    un rango contiguo de bins: se indexa con slices (vistas) en lugar de
+    máscaras booleanas.
+    """
+    frequencies: np.ndarray
+    high_band: slice
+    ultra_high_band: slice
+    cutoff_range: slice
+    hires_band: Optional[slice]
+
+
+def _band(frequencies: np.ndarray, low: float, high: float, inclusive: bool = True) -> slice:
+    """Bins con low <= f <= high (o f < high si inclusive es False)"""
+    start = int(np.searchsorted(frequencies, low, side='left'))
+    stop = int(np.searchsorted(frequencies, high, side='right' if inclusive else 'left'))
+    return slice(start, max(start, stop))
+
+
+@lru_cache(maxsize=None)
+def spectral_grid(sr: int, n_fft: int = FFT_SIZE) -> SpectralGrid:
+    """
+    Devuelve la rejilla de frecuencias de (sr, n_fft), calculada una sola
+    vez por proceso y reutilizada entre archivos
+
+    Args:
+        sr: Frecuencia de muestreo del análisis
+        n_fft: Tamaño de la ventana FFT
+
+    Returns:
+        SpectralGrid: Frecuencias y rangos de bins de cada banda
+    """
+    frequencies = _read_only(np.fft.rfftfreq(n_fft, d=1.0 / sr))
+    hires_band = _band(frequencies, HIRES_BAND_MIN, sr / 2, inclusive=False) if sr > HIRES_SAMPLE_RATE else None
+    return SpectralGrid(
+        frequencies=frequencies,
+        high_band=_band(frequencies, *HIGH_BAND),
+        ultra_high_band=_band(frequencies, *ULTRA_HIGH_BAND),
+        cutoff_range=_band(frequencies, MIN_FREQUENCY, MAX_FREQUENCY),
+        hires_band=hires_band
+    )
+
+
+class SpectralAccumulator:
+    """
+    Acumula el espectro de magnitud medio y el RMS por frames de una señal
+
+    Equivale a promediar np.abs(librosa.stft(y)) en el tiempo y a
+    librosa.feature.rms(y), ambos con center=True, pero procesando los
+    frames en bloques de tamaño fijo: nunca se materializa el
+    espectrograma completo. Los frames STFT y RMS comparten centro (mismo
+    hop), así que el RMS se obtiene del tramo central de cada frame STFT.
+
+    La señal puede llegar troceada en varias llamadas a update().
+
+    Con center=False no se rellena con ceros: solo se usan los frames
+    que caben enteros en cada segmento. Sirve para tramos recortados de
+    una señal más larga que ya incluyen n_fft // 2 muestras reales de
+    contexto a cada lado (ventanas de muestreo): un relleno con ceros
+    crearía un escalón en cada empalme, con energía de banda ancha por
+    encima del corte real.
+    """
+
+    def __init__(self, n_fft: int = FFT_SIZE, hop_length: int = HOP_LENGTH,
+                 rms_frame_length: int = RMS_FRAME_LENGTH,
+                 block_frames: int = STFT_BLOCK_FRAMES, center: bool = True):
+        """
+        Inicializa el acumulador
+
+        Args:
+            n_fft: Tamaño de la ventana FFT
+            hop_length: Salto entre frames
+            rms_frame_length: Longitud de frame para el RMS
+            block_frames: Frames procesados por bloque (acota la memoria)
+            center: Rellenar cada segmento con n_fft // 2 ceros a cada
+                lado (center=True de librosa)
+        """
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.rms_frame_length = rms_frame_length
+        self.block_frames = block_frames
+        self.window = hann_window(n_fft)
+        self.center = center
+
+        self._rms_start = n_fft // 2 - rms_frame_length // 2
+        self._spectrum_sum = np.zeros(n_fft // 2 + 1, dtype=np.float64)
+        self._rms: List[np.ndarray] = []
+        self._n_frames = 0
+        self._pending = self._padding()
+        self._segment_samples = 0
+
+    def _padding(self) -> np.ndarray:
+        """Relleno de cada extremo de un segmento (center=True) o vacío"""
+        return np.zeros(self.n_fft // 2 if self.center else 0, dtype=np.float32)
+
+    def _process(self, buffer: np.ndarray) -> Tuple[int, np.ndarray, List[np.ndarray]]:
+        """
+        Procesa todos los frames completos de un buffer
+
+        Args:
+            buffer: Muestras a partir del inicio del siguiente frame
+
+        Returns:
+            tuple: (frames procesados, suma de magnitudes, bloques de RMS)
+        """
+        if len(buffer) < self.n_fft:
+            return 0, np.zeros_like(self._spectrum_sum), []
+
+        n_frames = 1 + (len(buffer) - self.n_fft) // self.hop_length
+        frames = np.lib.stride_tricks.sliding_window_view(buffer, self.n_fft)[::self.hop_length]
+        rms_end = self._rms_start + self.rms_frame_length
+
+        spectrum_sum = np.zeros_like(self._spectrum_sum)
+        rms_blocks = []
+        for start in range(0, n_frames, self.block_frames):
+            block = frames[start:start + self.block_frames]
+            spectrum_sum += np.abs(scipy.fft.rfft(block * self.window, axis=1)).sum(axis=0)
+
+            center = block[:, self._rms_start:rms_end]
+            rms_blocks.append(np.sqrt(np.einsum('ij,ij->i', center, center) / self.rms_frame_length))
+
+        return n_frames, spectrum_sum, rms_blocks
+
+    def update(self, samples: np.ndarray):
+        """
+        Añade muestras y procesa los frames que queden completos
+
+        Args:
+            samples: Muestras mono (se recomiendan trozos de pocos segundos)
+        """
+        samples = np.asarray(samples, dtype=np.float32)
+        buffer = np.concatenate([self._pending, samples])
+        n_frames, spectrum_sum, rms_blocks = self._process(buffer)
+
+        self._n_frames += n_frames
+        self._spectrum_sum += spectrum_sum
+        self._rms.extend(rms_blocks)
+        self._pending = buffer[n_frames * self.hop_length:].copy()
+        self._segment_samples += len(samples)
+
+    def _tail(self) -> Tuple[int, np.ndarray, List[np.ndarray]]:
+        """Procesa los frames finales del segmento actual (relleno de center=True)"""
+        if self._segment_samples == 0 and self._n_frames > 0:
+            # Segmento vacío tras end_segment(): no aporta frames
+            return 0, np.zeros_like(self._spectrum_sum), []
+        tail = np.concatenate([self._pending, self._padding()])
+        return self._process(tail)
+
+    def end_segment(self):
+        """
+        Cierra el segmento actual: las muestras siguientes se enmarcan como
+        una señal independiente (sin frames que crucen la discontinuidad)
+        """
+        n_frames, spectrum_sum, rms_blocks = self._tail()
+
+        self._n_frames += n_frames
+        self._spectrum_sum += spectrum_sum
+        self._rms.extend(rms_blocks)
+        self._pending = self._padding()
+        self._segment_samples = 0
+
+    def result(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Devuelve el espectro medio y el RMS por frame de lo acumulado
+
+        No modifica el estado: se puede seguir llamando a update() después.
+
+        Returns:
+            tuple: (magnitud media por bin, RMS por frame)
+        """
+        n_frames, spectrum_sum, rms_blocks = self._tail()
+
+        total_frames = self._n_frames + n_frames
+        avg_spectrum = (self._spectrum_sum + spectrum_sum) / max(total_frames, 1)
+        rms_parts = self._rms + rms_blocks
+        rms = np.concatenate(rms_parts) if rms_parts else np.zeros(0, dtype=np.float32)
+
+        return avg_spectrum, rms
+
+
+def accumulate(audio_data: np.ndarray, n_fft: int = FFT_SIZE, hop_length: int = HOP_LENGTH,
+               segment_lengths: Optional[List[int]] = None,
+               center: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calcula espectro medio y RMS de una señal completa en bloques
+
+    Args:
+        audio_data: Señal mono
+        n_fft: Tamaño de la ventana FFT
+        hop_length: Salto entre frames
+        segment_lengths: Longitudes de los tramos independientes que
+            forman audio_data (p. ej. ventanas de muestreo); None = uno solo
+        center: Rellenar cada tramo con ceros (False si los tramos ya
+            traen su contexto, ver SpectralAccumulator)
+
+    Returns:
+        tuple: (magnitud media por bin, RMS por frame)
+    """
+    accumulator = SpectralAccumulator(n_fft=n_fft, hop_length=hop_length, center=center)
+    chunk = accumulator.block_frames * hop_length
+
+    position = 0
+    for i, length in enumerate(segment_lengths or [len(audio_data)]):
+        if i > 0:
+            accumulator.end_segment()
+        segment = audio_data[position:position + length]
+        for start in range(0, len(segment), chunk):
+            accumulator.update(segment[start:start + chunk])
+        position += length
+
+    return accumulator.result()
+
+
+def amplitude_to_db(amplitude: np.ndarray, ref: Optional[float] = None) -> np.ndarray:
+    """
+    Convierte amplitudes a dB como librosa.amplitude_to_db (amin=1e-5, top_db=80)
+
+    Args:
+        amplitude: Amplitudes no negativas
+        ref: Referencia (0 dB); None usa el máximo de la entrada
+
+    Returns:
+        np.ndarray: Valores en dB, recortados a TOP_DB por debajo del máximo
+    """
+    if ref is None:
+        ref = np.max(amplitude)
+    db = 20.0 * np.log10(np.maximum(AMIN, amplitude)) - 20.0 * np.log10(max(AMIN, ref))
+    return np.maximum(db, db.max() - TOP_DB)
+
+
+def spectral_features(spectrum_db: np.ndarray, sr: int, n_fft: int = FFT_SIZE) -> Dict:
+    """
+    Calcula las métricas espectrales a partir del espectro medio en dB
+
+    Todas las búsquedas son operaciones vectorizadas sobre los rangos de
+    bins precalculados en spectral_grid().
+
+    Args:
+        spectrum_db: Espectro medio en dB relativo al máximo
+        sr: Frecuencia de muestreo del análisis
+        n_fft: Tamaño de la ventana FFT
+
+    Returns:
+        dict: cutoff_frequency, high_freq_energy, spectral_presence,
+            has_content_above_20k, has_hires_content, hires_presence
+    """
+    grid = spectral_grid(sr, n_fft)
+
+    # Energía promedio y presencia en altas frecuencias (18-22 kHz)
+    high_freq_db = spectrum_db[grid.high_band]
+    if len(high_freq_db) > 0:
+        high_freq_energy = float(np.mean(high_freq_db))
+        spectral_presence = float(np.count_nonzero(high_freq_db > -70) / len(high_freq_db) * 100)
+    else:
+        high_freq_energy = -100.0
+        spectral_presence = 0.0
+
+    # ¿Hay contenido significativo por encima de 20 kHz?
+    ultra_high_freq_db = spectrum_db[grid.ultra_high_band]
+    has_content_above_20k = bool(np.any(ultra_high_freq_db > -65))
+
+    # Frecuencia de corte: bin más alto del rango que supera el umbral
+    # (y, si no hay ninguno, el umbral relajado)
+    cutoff_range = spectrum_db[grid.cutoff_range]
+    cutoff_freq = None
+    for threshold in (ENERGY_THRESHOLD, ENERGY_THRESHOLD - 20):
+        above = np.flatnonzero(cutoff_range > threshold)
+        if len(above) > 0:
+            cutoff_freq = float(grid.frequencies[grid.cutoff_range.start + above[-1]])
+            break
+
+    # Archivos hi-res a frecuencia nativa: ¿hay contenido entre
+    # HIRES_BAND_MIN y Nyquist? Un upsampling desde 44.1/48 kHz no lo tiene
+    has_hires_content = None
+    hires_presence = None
+    if grid.hires_band is not None:
+        hires_db = spectrum_db[grid.hires_band]
+        if len(hires_db) > 0:
+            hires_bins = hires_db > ENERGY_THRESHOLD - 20
+            has_hires_content = bool(np.any(hires_bins))
+            hires_presence = float(np.mean(hires_bins) * 100)
+
+    return {
+        'cutoff_frequency': cutoff_freq,
+        'high_freq_energy': high_freq_energy,
+        'spectral_presence': spectral_presence,
+        'has_content_above_20k': has_content_above_20k,
+        'has_hires_content': has_hires_content,
+        'hires_presence': hires_presence
+    }
+
+
+def dynamic_range(rms: np.ndarray) -> Optional[float]:
+    """
+    Calcula el rango dinámico en dB a partir del RMS por frame
+
+    Args:
+        rms: RMS por frame
+
+    Returns:
+        float: Rango dinámico en dB, o None si la señal es silencio
+    """
+    rms_nonzero = rms[rms > 0]
+    if len(rms_nonzero) == 0:
+        return None
+    rms_db = amplitude_to_db(rms_nonzero, ref=1.0)
+    return float(np.max(rms_db) - np.min(rms_db))
+
+
+def extract_features(audio_data: np.ndarray, sr: int, n_fft: int = FFT_SIZE,
+                     hop_length: int = HOP_LENGTH,
+                     segment_lengths: Optional[List[int]] = None,
+                     center: bool = True) -> Tuple[Dict, np.ndarray]:
+    """
+    Extrae todas las características espectrales en una sola pasada
+
+    Enmarca la señal una vez (SpectralAccumulator) y deriva de ese mismo
+    recorrido el espectro medio, las métricas de altas frecuencias y el
+    rango dinámico.
+
+    Args:
+        audio_data: Señal mono
+        sr: Frecuencia de muestreo
+        n_fft: Tamaño de la ventana FFT
+        hop_length: Salto entre frames
+        segment_lengths: Longitudes de los tramos independientes (ventanas)
+        center: Rellenar cada tramo con ceros (False si los tramos ya
+            traen n_fft // 2 muestras de contexto a cada lado)
+
+    Returns:
+        tuple: (características, espectro medio en dB)
+    """
+    avg_spectrum, rms = accumulate(audio_data, n_fft=n_fft, hop_length=hop_length,
+                                   segment_lengths=segment_lengths, center=center)
+    spectrum_db = amplitude_to_db(avg_spectrum)
+
+    features = spectral_features(spectrum_db, sr, n_fft=n_fft)
+    features['dynamic_range'] = dynamic_range(rms)
+
+    return features, spectrum_db
+
+
+def extract_features_batch(buffer: np.ndarray, lengths: List[int], sr: int,
+                           n_fft: int = FFT_SIZE, hop_length: int = HOP_LENGTH,
+                           block_frames: int = STFT_BLOCK_FRAMES) -> List[Tuple[Dict, np.ndarray]]:
+    """
+    Extrae las características de varias señales con una FFT por lotes
+
+    Cada fila de buffer contiene n_fft // 2 ceros (relleno de center=True),
+    la señal y ceros hasta el final de la fila. Los frames de todas las
+    filas se transforman juntos, bloque a bloque, y cada señal solo
+    acumula sus frames válidos, así que el resultado coincide con
+    extract_features() sobre cada señal por separado.
+
+    Args:
+        buffer: Matriz (n_señales, muestras) con las señales rellenadas
+        lengths: Número de muestras reales de cada señal
+        sr: Frecuencia de muestreo común
+        n_fft: Tamaño de la ventana FFT
+        hop_length: Salto entre frames
+        block_frames: Frames por bloque (la memoria escala con n_señales)
+
+    Returns:
+        list: (características, espectro medio en dB) de cada señal
+    """
+    window = hann_window(n_fft)
+    rms_start = n_fft // 2 - RMS_FRAME_LENGTH // 2
+    rms_end = rms_start + RMS_FRAME_LENGTH
+
+    n_signals = buffer.shape[0]
+    frame_counts = np.array([1 + length // hop_length for length in lengths])
+    frames = np.lib.stride_tricks.sliding_window_view(buffer, n_fft, axis=1)[:, ::hop_length]
+    total_frames = min(frames.shape[1], int(frame_counts.max()))
+
+    spectrum_sum = np.zeros((n_signals, n_fft // 2 + 1), dtype=np.float64)
+    rms = np.zeros((n_signals, total_frames), dtype=np.float32)
+
+    for start in range(0, total_frames, block_frames):
+        block = frames[:, start:min(start + block_frames, total_frames)]
+        magnitude = np.abs(scipy.fft.rfft(block * window, axis=-1))
+
+        # Descartar los frames posteriores al final de cada señal
+        frame_index = np.arange(start, start + block.shape[1])
+        valid = frame_index[np.newaxis, :] < frame_counts[:, np.newaxis]
+        spectrum_sum += np.einsum('ijk,ij->ik', magnitude, valid.astype(magnitude.dtype))
+
+        center = block[:, :, rms_start:rms_end]
+        rms[:, start:start + block.shape[1]] = np.sqrt(
+            np.einsum('ijk,ijk->ij', center, center) / RMS_FRAME_LENGTH
+        )
+
+    results = []
+    for i in range(n_signals):
+        spectrum_db = amplitude_to_db(spectrum_sum[i] / frame_counts[i])
+        features = spectral_features(spectrum_db, sr, n_fft=n_fft)
+        features['dynamic_range'] = dynamic_range(rms[i, :frame_counts[i]])
+        results.append((features, spectrum_db))
+
+    return results
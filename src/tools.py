@@ -0,0 +1,134 @@
+"""
+Comandos auxiliares de Fake Music Hunter (mantenimiento de caché,
+fusión de reportes de ejecuciones repartidas y reclasificación)
+"""
+
+import sys
+import time
+from collections import Counter
+import click
+from src.cache import AnalysisCache
+from src.featurestore import FeatureStore, reclassify
+from src.reporter import Reporter
+from src.results import check_parquet
+from src.sharding import check_shards, read_report, report_shard
+from src.config import DEFAULT_CACHE_PATH, OUTPUT_INTERACTIVE, OUTPUT_BATCH
+
+
+@click.group()
+def tools():
+    """🛠️ Herramientas auxiliares de Fake Music Hunter"""
+
+
+@tools.command('cache-evict')
+@click.option('--cache', 'cache_path', type=click.Path(exists=True, dir_okay=False),
+              default=DEFAULT_CACHE_PATH, help='Base de datos de caché de análisis')
+@click.option('--older-than', type=float, default=None,
+              help='Eliminar también entradas con más de N días')
+def cache_evict(cache_path: str, older_than: float):
+    """Elimina entradas obsoletas (otros parámetros de src/config.py, archivos borrados o modificados)"""
+    with AnalysisCache(cache_path) as cache:
+        removed = cache.evict(older_than_days=older_than)
+        click.echo(f"Entradas eliminadas: {removed:,} (quedan {len(cache):,})")
+
+
+@tools.command('cache-vacuum')
+@click.option('--cache', 'cache_path', type=click.Path(exists=True, dir_okay=False),
+              default=DEFAULT_CACHE_PATH, help='Base de datos de caché de análisis')
+def cache_vacuum(cache_path: str):
+    """Compacta el archivo de la caché tras eliminar entradas"""
+    with AnalysisCache(cache_path) as cache:
+        cache.vacuum()
+        click.echo(f"Caché compactada: {cache_path} ({len(cache):,} entradas)")
+
+
+@tools.command('merge')
+@click.argument('reports', nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+@click.option('--output', '-o', type=click.Path(), help='Reporte CSV fusionado')
+@click.option('--json', '-j', 'json_path', type=click.Path(), help='Reporte JSON fusionado')
+@click.option('--jsonl', 'jsonl_path', type=click.Path(), help='Reporte JSON Lines fusionado')
+@click.option('--parquet', 'parquet_path', type=click.Path(dir_okay=False),
+              help='Reporte Parquet fusionado (requiere pyarrow)')
+@click.option('--force', is_flag=True, help='Fusionar aunque falten shards o haya solapes')
+@click.pass_context
+def merge(ctx, reports: tuple, output: str, json_path: str, jsonl_path: str, parquet_path: str,
+          force: bool):
+    """Fusiona los reportes de una ejecución con --shard y muestra el resumen conjunto"""
+    if parquet_path:
+        try:
+            check_parquet()
+        except ImportError as e:
+            raise click.UsageError(str(e))
+
+    problems = check_shards({report: report_shard(report) for report in reports})
+    for problem in problems:
+        click.echo(f"⚠️  {problem}", err=True)
+    if problems and not force:
+        click.echo("No se fusiona (usa --force para fusionar igualmente)", err=True)
+        ctx.exit(1)
+
+    mode = OUTPUT_INTERACTIVE if sys.stdout.isatty() else OUTPUT_BATCH
+    reporter = Reporter(keep_results=False, mode=mode)
+    reporter.open_streams(csv_path=output, json_path=json_path, jsonl_path=jsonl_path,
+                          parquet_path=parquet_path)
+    try:
+        for report in reports:
+            for result in read_report(report):
+                reporter.add_result(result)
+    finally:
+        reporter.close_streams()
+
+    reporter.console.print(f"\n🔗 Reportes fusionados: {len(reports):,}")
+    reporter.print_summary()
+
+
+@tools.command('reclassify')
+@click.option('--features', 'features_path', required=True, type=click.Path(exists=True, file_okay=False),
+              help='Almacén de espectros creado con --features')
+@click.option('--output', '-o', type=click.Path(), help='Reporte CSV reclasificado')
+@click.option('--json', '-j', 'json_path', type=click.Path(), help='Reporte JSON reclasificado')
+@click.option('--jsonl', 'jsonl_path', type=click.Path(), help='Reporte JSON Lines reclasificado')
+@click.option('--parquet', 'parquet_path', type=click.Path(dir_okay=False),
+              help='Reporte Parquet reclasificado (requiere pyarrow)')
+@click.option('--verbose', '-v', is_flag=True, help='Listar los archivos que cambian de veredicto')
+def reclassify_command(features_path: str, output: str, json_path: str, jsonl_path: str,
+                       parquet_path: str, verbose: bool):
+    """Reclasifica con los umbrales actuales de src/config.py a partir de los espectros guardados, sin decodificar"""
+    if parquet_path:
+        try:
+            check_parquet()
+        except ImportError as e:
+            raise click.UsageError(str(e))
+    try:
+        store = FeatureStore(features_path)
+    except ValueError as e:
+        raise click.UsageError(str(e))
+
+    mode = OUTPUT_INTERACTIVE if sys.stdout.isatty() else OUTPUT_BATCH
+    reporter = Reporter(verbose=verbose, keep_results=False, mode=mode)
+    reporter.open_streams(csv_path=output, json_path=json_path, jsonl_path=jsonl_path,
+                          parquet_path=parquet_path)
+    changes = Counter()
+    start = time.perf_counter()
+    try:
+        with store:
+            reasons = any((output, json_path, jsonl_path, parquet_path))
+            for previous, result in reclassify(store, reasons=reasons):
+                reporter.add_result(result)
+                if previous != result['classification']:
+                    changes[(previous, result['classification'])] += 1
+                    if verbose:
+                        reporter.print_result(result)
+    finally:
+        reporter.close_streams()
+
+    total = sum(reporter.counts.values())
+    reporter.console.print(f"\n🔁 Reclasificados: {total:,} archivos en {time.perf_counter() - start:.1f} s, "
+                           f"{sum(changes.values()):,} cambian de veredicto")
+    for (previous, current), count in changes.most_common():
+        reporter.console.print(f"   {previous} → {current}: {count:,}")
+    reporter.print_summary()
+
+
+if __name__ == '__main__':
+    tools()
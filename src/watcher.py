@@ -0,0 +1,182 @@
+"""
+Módulo para vigilar una biblioteca y detectar archivos nuevos, modificados o eliminados
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+from src.scanner import AudioScanner
+from src.config import WATCH_SWEEP_EVERY
+
+
+class LibraryWatcher:
+    """
+    Detecta cambios en una biblioteca de audio por sondeo (sin servicios
+    del sistema)
+
+    Cada sondeo solo consulta el mtime de los directorios conocidos: crear,
+    borrar o renombrar un archivo cambia el mtime de su directorio, y solo
+    esos directorios se vuelven a listar. Las modificaciones in situ (que
+    no tocan el directorio) se detectan con una revisión completa de
+    (tamaño, mtime) de los archivos cada sweep_every sondeos. Como en
+    AudioScanner.scan(), un directorio al que se llega por varios enlaces
+    simbólicos se vigila solo por la primera ruta.
+    """
+
+    def __init__(self, scanner: AudioScanner, sweep_every: int = WATCH_SWEEP_EVERY):
+        """
+        Inicializa el vigilante
+
+        Args:
+            scanner: Escáner con la ruta raíz, recursividad y formatos
+            sweep_every: Sondeos entre revisiones completas de archivos
+                (0 = nunca)
+        """
+        self.scanner = scanner
+        self.sweep_every = sweep_every
+        self.polls = 0
+        self._dirs: Dict[str, int] = {}
+        self._dir_files: Dict[str, Set[str]] = {}
+        self._subdirs: Dict[str, Set[str]] = {}
+        self._files: Dict[str, Tuple[int, int]] = {}
+        # (dispositivo, inodo) de cada directorio vigilado, y su ruta
+        self._dir_ids: Dict[str, Tuple[int, int]] = {}
+        self._dir_paths: Dict[Tuple[int, int], str] = {}
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    @staticmethod
+    def _stat(path: str) -> Optional[Tuple[int, int]]:
+        """Devuelve (tamaño, mtime_ns) de una ruta, o None si no existe"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def poll(self) -> Tuple[List[Path], List[Path]]:
+        """
+        Busca cambios desde el sondeo anterior
+
+        El primer sondeo recorre la biblioteca completa y devuelve todos
+        los archivos como nuevos.
+
+        Returns:
+            tuple: (archivos nuevos o modificados, archivos eliminados)
+        """
+        changed = []
+        removed = []
+
+        if self.polls == 0:
+            self._add_tree(str(self.scanner.root_path), changed)
+        else:
+            for directory in list(self._dirs):
+                if directory not in self._dirs:
+                    # Eliminado durante este mismo sondeo
+                    continue
+                stat = self._stat(directory)
+                if stat is None:
+                    self._remove_tree(directory, removed)
+                elif stat[1] != self._dirs[directory]:
+                    self._rescan_dir(directory, stat[1], changed, removed)
+
+            if self.sweep_every and self.polls % self.sweep_every == 0:
+                self._sweep(changed, removed)
+
+        self.polls += 1
+        return changed, removed
+
+    def _add_tree(self, directory: str, changed: List[Path]):
+        """Registra un directorio nuevo y todo su contenido"""
+        pending = [directory]
+        while pending:
+            current = pending.pop()
+            try:
+                stat = os.stat(current)
+            except OSError:
+                continue
+            dir_id = (stat.st_dev, stat.st_ino)
+            if self._dir_paths.get(dir_id, current) != current:
+                # Ya vigilado por otra ruta (enlace simbólico o ciclo)
+                continue
+            self._dir_ids[current] = dir_id
+            self._dir_paths[dir_id] = current
+            # El mtime se toma antes de listar: lo que cambie mientras
+            # tanto se detecta en el siguiente sondeo
+            self._dirs[current] = stat.st_mtime_ns
+            files, subdirs = self.scanner.scan_dir(current)
+
+            self._dir_files[current] = set()
+            for file_path in files:
+                if self._track(current, file_path):
+                    changed.append(file_path)
+
+            self._subdirs[current] = set(subdirs)
+            pending.extend(subdirs)
+
+    def _track(self, directory: str, file_path: Path) -> bool:
+        """
+        Actualiza la instantánea de un archivo
+
+        Returns:
+            bool: True si el archivo es nuevo o cambió
+        """
+        # Clave derivada del directorio, para poder volver a él con dirname
+        path = os.path.join(directory, file_path.name)
+        stat = self._stat(path)
+        if stat is None:
+            return False
+        self._dir_files[directory].add(path)
+        if self._files.get(path) == stat:
+            return False
+        self._files[path] = stat
+        return True
+
+    def _rescan_dir(self, directory: str, mtime_ns: int, changed: List[Path], removed: List[Path]):
+        """Vuelve a listar un directorio cuyo mtime cambió"""
+        self._dirs[directory] = mtime_ns
+        files, subdirs = self.scanner.scan_dir(directory)
+
+        previous = self._dir_files[directory]
+        self._dir_files[directory] = set()
+        for file_path in files:
+            if self._track(directory, file_path):
+                changed.append(file_path)
+
+        for path in previous - self._dir_files[directory]:
+            del self._files[path]
+            removed.append(Path(path))
+
+        current_subdirs = set(subdirs)
+        for subdir in self._subdirs[directory] - current_subdirs:
+            self._remove_tree(subdir, removed)
+        for subdir in current_subdirs - self._subdirs[directory]:
+            self._add_tree(subdir, changed)
+        self._subdirs[directory] = current_subdirs
+
+    def _remove_tree(self, directory: str, removed: List[Path]):
+        """Olvida un directorio eliminado y todo su contenido"""
+        pending = [directory]
+        while pending:
+            current = pending.pop()
+            if current not in self._dirs:
+                continue
+            del self._dirs[current]
+            del self._dir_paths[self._dir_ids.pop(current)]
+            for path in self._dir_files.pop(current):
+                del self._files[path]
+                removed.append(Path(path))
+            pending.extend(self._subdirs.pop(current))
+
+    def _sweep(self, changed: List[Path], removed: List[Path]):
+        """Comprueba (tamaño, mtime) de todos los archivos conocidos"""
+        for path, snapshot in list(self._files.items()):
+            stat = self._stat(path)
+            if stat is None:
+                del self._files[path]
+                self._dir_files[os.path.dirname(path)].discard(path)
+                removed.append(Path(path))
+            elif stat != snapshot:
+                self._files[path] = stat
+                changed.append(Path(path))
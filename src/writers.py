@@ -0,0 +1,264 @@
+"""
+Módulo de escritores incrementales de reportes (CSV, JSON, JSON Lines y Parquet)
+"""
+
+import csv
+import json
+import os
+import textwrap
+from pathlib import Path
+from typing import Dict, Iterable
+from src.config import PARQUET_ROW_GROUP, REPORT_FLUSH_EVERY
+from src.profiling import TIMING_STAGES
+from src.results import ResultStore, check_parquet, parquet_schema
+
+
+# Campos del reporte CSV
+CSV_FIELDS = [
+    'file_name', 'file_path', 'classification', 'reason',
+    'format', 'bitrate', 'sample_rate', 'cutoff_frequency',
+    'dynamic_range', 'file_size', 'analysis_tier', 'duplicate_of', 'shard'
+]
+
+
+class ReportWriter:
+    """
+    Escribe resultados en un archivo a medida que llegan
+
+    El archivo se crea con el primer resultado o al llamar a open() (sin
+    ninguno de los dos, una ejecución sin resultados no deja archivo) y se vuelca a disco cada
+    REPORT_FLUSH_EVERY filas, de modo que una interrupción solo pierde
+    las últimas. La memoria usada no depende del número de resultados.
+    """
+
+    newline = None
+    mode = 'w'
+
+    def __init__(self, output_path: str, timings: bool = False):
+        """
+        Inicializa el escritor
+
+        Args:
+            output_path: Ruta del archivo de salida
+            timings: Si True, incluye los tiempos por etapa ('timings')
+        """
+        self.output_path = Path(output_path)
+        self.timings = timings
+        self.rows = 0
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write(self, result: Dict):
+        """
+        Añade un resultado al archivo
+
+        Args:
+            result: Diccionario con resultados del análisis y detección
+        """
+        self.open()
+        if not self.timings and 'timings' in result:
+            result = {k: v for k, v in result.items() if k != 'timings'}
+        self._write(result)
+        self.rows += 1
+        if self.rows % REPORT_FLUSH_EVERY == 0:
+            self._file.flush()
+
+    def open(self):
+        """Crea el archivo y escribe la cabecera (si no se ha creado ya)"""
+        if self._file is None:
+            self.output_path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.output_path, self.mode, newline=self.newline, encoding='utf-8')
+            self._begin()
+
+    def close(self):
+        """Cierra el archivo (si se llegó a crear)"""
+        if self._file is not None:
+            self._end()
+            self._file.close()
+            self._file = None
+
+    def _begin(self):
+        """Escribe la cabecera del formato"""
+
+    def _write(self, result: Dict):
+        raise NotImplementedError
+
+    def _end(self):
+        """Escribe el cierre del formato"""
+
+
+class CSVReportWriter(ReportWriter):
+    """Reporte CSV con las columnas de CSV_FIELDS"""
+
+    newline = ''
+
+    def _begin(self):
+        fieldnames = list(CSV_FIELDS)
+        if self.timings:
+            # Dos columnas (pared y CPU, en ms) por etapa
+            fieldnames += [f"{stage}_{kind}_ms" for stage in TIMING_STAGES for kind in ('wall', 'cpu')]
+        self._writer = csv.DictWriter(self._file, fieldnames=fieldnames, extrasaction='ignore')
+        self._writer.writeheader()
+
+    def _write(self, result: Dict):
+        # Convertir bitrate a kbps para legibilidad (sin modificar el resultado)
+        if result.get('bitrate'):
+            result = {**result, 'bitrate': f"{result['bitrate']/1000:.0f} kbps"}
+        if result.get('timings'):
+            result = {**result}
+            for stage, values in result['timings'].items():
+                result[f"{stage}_wall_ms"] = round(values['wall'] * 1000, 3)
+                result[f"{stage}_cpu_ms"] = round(values['cpu'] * 1000, 3)
+        self._writer.writerow(result)
+
+
+class JSONReportWriter(ReportWriter):
+    """
+    Reporte JSON (lista de objetos) escrito elemento a elemento, con el
+    mismo formato que json.dump(resultados, indent=2)
+    """
+
+    def _begin(self):
+        self._file.write('[')
+
+    def _write(self, result: Dict):
+        item = textwrap.indent(json.dumps(result, indent=2, ensure_ascii=False), '  ')
+        self._file.write(('\n' if self.rows == 0 else ',\n') + item)
+
+    def _end(self):
+        self._file.write('\n]')
+
+
+class JSONLinesReportWriter(ReportWriter):
+    """Reporte JSON Lines: un objeto por línea (legible aunque se interrumpa)"""
+
+    def _write(self, result: Dict):
+        self._file.write(json.dumps(result, ensure_ascii=False) + '\n')
+
+
+class ParquetReportWriter(ReportWriter):
+    """
+    Reporte Parquet (requiere pyarrow), pensado para cargar millones de
+    filas en pandas o en un dashboard
+
+    Los resultados se acumulan en un ResultStore columnar (una fracción
+    de la memoria de los diccionarios) y cada row_group filas se escriben
+    como un grupo de filas con pyarrow.parquet.ParquetWriter, así que la
+    memoria no depende del número de resultados. El pie del archivo se
+    escribe al cerrar: hasta entonces no es legible. Con timings, los
+    tiempos por etapa van en columnas '<etapa>_wall_ms' y
+    '<etapa>_cpu_ms' como en el CSV.
+    """
+
+    def __init__(self, output_path: str, timings: bool = False, row_group: int = PARQUET_ROW_GROUP):
+        """
+        Inicializa el escritor
+
+        Args:
+            output_path: Ruta del archivo de salida
+            timings: Si True, incluye los tiempos por etapa
+            row_group: Filas por grupo de filas
+
+        Raises:
+            ImportError: Si no está instalado pyarrow
+        """
+        check_parquet()
+        super().__init__(output_path, timings=timings)
+        self.row_group = row_group
+        self._timing_columns = [f"{stage}_{kind}_ms" for stage in TIMING_STAGES
+                                for kind in ('wall', 'cpu')] if timings else []
+        self._schema = parquet_schema(self._timing_columns)
+        self._store = ResultStore(extra_numeric=self._timing_columns)
+        self._writer = None
+
+    def write(self, result: Dict):
+        """
+        Añade un resultado al reporte
+
+        Args:
+            result: Diccionario con resultados del análisis y detección
+        """
+        timings = result.get('timings')
+        result = {k: v for k, v in result.items() if k != 'timings'}
+        if self.timings and timings:
+            for stage, values in timings.items():
+                for kind in ('wall', 'cpu'):
+                    column = f"{stage}_{kind}_ms"
+                    if column in self._timing_columns:
+                        result[column] = round(values[kind] * 1000, 3)
+        self._store.append(result)
+        self.rows += 1
+        if len(self._store) >= self.row_group:
+            self._write_row_group()
+
+    def _write_row_group(self):
+        """Escribe las filas acumuladas como un grupo de filas y las libera"""
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(self._store.to_dataframe(), schema=self._schema, preserve_index=False)
+        self.open()
+        self._writer.write_table(table)
+        self._store = ResultStore(extra_numeric=self._timing_columns)
+
+    def open(self):
+        """Crea el archivo con el esquema del reporte (si no se ha creado ya)"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self._writer is None:
+            # El esquema de una tabla vacía lleva los metadatos de pandas (tipos al leer)
+            empty = ResultStore(extra_numeric=self._timing_columns).to_dataframe()
+            schema = pa.Table.from_pandas(empty, schema=self._schema, preserve_index=False).schema
+            self.output_path.parent.mkdir(parents=True, exist_ok=True)
+            self._writer = pq.ParquetWriter(self.output_path, schema)
+
+    def close(self):
+        """Escribe las filas pendientes y el pie del archivo (si se llegó a crear)"""
+        if self._store is not None and len(self._store):
+            self._write_row_group()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        self._store = None
+
+
+def write_report(writer_class: type, output_path: str, results: Iterable[Dict],
+                 timings: bool = False, empty: bool = False) -> int:
+    """
+    Reescribe un reporte completo de forma atómica
+
+    Escribe en un temporal junto a output_path y lo renombra sobre él al
+    terminar, para que nunca quede un reporte a medio escribir. Sin
+    resultados, el reporte anterior se conserva salvo con empty.
+
+    Args:
+        writer_class: Clase del escritor (CSVReportWriter, JSONReportWriter...)
+        output_path: Ruta del archivo de salida
+        results: Resultados a escribir
+        timings: Si True, incluye los tiempos por etapa
+        empty: Si True, sin resultados se escribe un reporte vacío (solo la
+            cabecera) en lugar de conservar el anterior
+
+    Returns:
+        int: Número de resultados escritos
+    """
+    output_path = Path(output_path)
+    tmp_path = output_path.with_name(f".{output_path.name}.tmp")
+    try:
+        with writer_class(tmp_path, timings=timings) as writer:
+            if empty:
+                writer.open()
+            for result in results:
+                writer.write(result)
+        if writer.rows or empty:
+            os.replace(tmp_path, output_path)
+    except BaseException:
+        if tmp_path.exists():
+            tmp_path.unlink()
+        raise
+    return writer.rows
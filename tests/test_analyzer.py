@@ -0,0 +1,63 @@
+"""
+Tests para el analizador de audio
+"""
+import pytest
+
+np = pytest.importorskip('numpy')
+sf = pytest.importorskip('soundfile')
+scipy_signal = pytest.importorskip('scipy.signal')
+
+from src.pipeline import analyze_file
+
+
+def write_noise(path, seconds, cutoff=None, sr=44100):
+    """Escribe ruido blanco, opcionalmente filtrado paso-bajo en cutoff Hz"""
+    rng = np.random.default_rng(0)
+    audio = rng.standard_normal(sr * seconds) * 0.1
+    if cutoff is not None:
+        sos = scipy_signal.butter(16, cutoff, fs=sr, output='sos')
+        audio = scipy_signal.sosfilt(sos, audio)
+    sf.write(str(path), audio.astype(np.float32), sr)
+    return path
+
+
+class TestTieredAnalysis:
+    """Tests para el análisis escalonado"""
+
+    def test_full_band_stops_at_first_tier(self, tmp_path):
+        """Test de parada temprana con un veredicto concluyente"""
+        file_path = write_noise(tmp_path / 'full.flac', 20)
+
+        result = analyze_file(file_path, {'tiered': True})
+
+        assert result['classification'] == 'legitimate'
+        assert result['analysis_tier'] == 1
+
+    def test_band_limited_escalates(self, tmp_path):
+        """Test de escalado hasta el final con un veredicto no concluyente"""
+        file_path = write_noise(tmp_path / 'lossy.flac', 20, cutoff=16000)
+
+        tiered = analyze_file(file_path, {'tiered': True})
+        full = analyze_file(file_path)
+
+        assert tiered['analysis_tier'] > 1
+        assert tiered['classification'] == full['classification'] != 'legitimate'
+        assert 'analysis_tier' not in full
+
+
+class TestWindowSampling:
+    """Tests para el muestreo por ventanas"""
+
+    @pytest.mark.parametrize('options', [{'windows': 6}, {'windows': 3, 'window_duration': 1}])
+    def test_band_limited_is_still_flagged(self, tmp_path, options):
+        """Los empalmes de las ventanas no deben añadir contenido por encima del corte"""
+        file_path = write_noise(tmp_path / 'lossy.flac', 40, cutoff=16000)
+
+        contiguous = analyze_file(file_path)
+        windowed = analyze_file(file_path, options)
+
+        assert contiguous['classification'] != 'legitimate'
+        assert windowed['classification'] == contiguous['classification']
+        assert not windowed['has_content_above_20k']
+        assert windowed['spectral_presence'] < 15
+        assert windowed['cutoff_frequency'] == pytest.approx(contiguous['cutoff_frequency'], abs=150)
@@ -0,0 +1,78 @@
+"""
+Tests para la API de Python
+"""
+import pytest
+
+np = pytest.importorskip('numpy')
+sf = pytest.importorskip('soundfile')
+
+from src.api import analysis_options, analyze_paths, open_cache
+from src.cache import AnalysisCache
+from src.spectral import spectral_grid
+
+
+@pytest.fixture
+def library(tmp_path):
+    rng = np.random.default_rng(0)
+    noise = (rng.standard_normal(44100) * 0.1).astype(np.float32)
+    for name in ('a.wav', 'b.wav'):
+        sf.write(str(tmp_path / name), noise, 44100)
+    (tmp_path / 'copia.wav').write_bytes((tmp_path / 'a.wav').read_bytes())
+    return tmp_path
+
+
+class TestAnalyzePaths:
+    """Tests para analyze_paths y las opciones del análisis"""
+
+    def test_accepts_strings_and_dedup(self, library):
+        paths = [str(library / name) for name in ('a.wav', 'b.wav', 'copia.wav')]
+
+        results = {r['file_name']: r for r in analyze_paths(paths, dedup=True, ordered=True)}
+
+        assert set(results) == {'a.wav', 'b.wav', 'copia.wav'}
+        assert results['copia.wav']['duplicate_of'] == paths[0]
+        assert results['copia.wav']['classification'] == results['a.wav']['classification']
+
+    def test_unknown_option_fails_on_call(self):
+        with pytest.raises(TypeError):
+            analyze_paths([], native_rte=True)
+
+    def test_cache_shared_with_defaults(self, library, tmp_path):
+        """Las opciones se normalizan: la misma caché sirve con y sin valores por defecto"""
+        with open_cache(str(tmp_path / 'cache.db')) as cache:
+            list(analyze_paths([library / 'a.wav'], cache=cache))
+        with open_cache(str(tmp_path / 'cache.db'), prescreen=True, windows=0) as cache:
+            list(analyze_paths([library / 'a.wav'], cache=cache))
+            assert cache.hits == 1
+
+        assert analysis_options(tiered=True)['tiered'] is True
+
+    def test_option_sets_coexist_and_survive_evict(self, library, tmp_path):
+        """Cada conjunto de opciones tiene sus entradas y el mantenimiento las conserva"""
+        db_path = str(tmp_path / 'cache.db')
+        for tiered in (False, True):
+            with open_cache(db_path, tiered=tiered) as cache:
+                list(analyze_paths([library / 'a.wav'], cache=cache, tiered=tiered))
+
+        with AnalysisCache(db_path) as cache:
+            assert cache.evict() == 0
+            assert len(cache) == 2
+        with open_cache(db_path) as cache:
+            list(analyze_paths([library / 'a.wav'], cache=cache))
+            assert cache.hits == 1
+
+
+class TestSpectralGrid:
+    """Tests para la rejilla de frecuencias compartida"""
+
+    @pytest.mark.parametrize('sr', [22050, 44100, 96000])
+    def test_bands_match_masks(self, sr):
+        grid = spectral_grid(sr, 4096)
+        frequencies = grid.frequencies
+
+        mask = (frequencies >= 18000) & (frequencies <= 22000)
+        assert np.array_equal(np.flatnonzero(mask), np.arange(len(frequencies))[grid.high_band])
+        mask = (frequencies >= 16000) & (frequencies <= 22050)
+        assert np.array_equal(np.flatnonzero(mask), np.arange(len(frequencies))[grid.cutoff_range])
+        assert spectral_grid(sr, 4096) is grid
+        assert not frequencies.flags.writeable
@@ -0,0 +1,116 @@
+"""
+Tests para el módulo de caché de análisis
+"""
+import os
+import pytest
+from src.cache import AnalysisCache, analysis_params_hash, options_key
+
+
+class TestAnalysisCache:
+    """Tests para la clase AnalysisCache"""
+    
+    @pytest.fixture
+    def audio_file(self, tmp_path):
+        """Archivo de audio ficticio (la caché solo usa tamaño y mtime)"""
+        file_path = tmp_path / 'track.flac'
+        file_path.write_bytes(b'fLaC' + b'\x00' * 64)
+        return file_path
+    
+    def test_put_and_get(self, tmp_path, audio_file):
+        """Test de acierto de caché para un archivo sin cambios"""
+        analysis = {
+            'file_path': str(audio_file),
+            'file_name': audio_file.name,
+            'format': '.flac',
+            'cutoff_frequency': 21000.0,
+            'classification': 'legitimate',
+            'reason': 'ok'
+        }
+        with AnalysisCache(tmp_path / 'cache.db') as cache:
+            cache.put(audio_file, analysis)
+            cached = cache.get(audio_file)
+        
+        assert cached['cutoff_frequency'] == 21000.0
+        assert 'classification' not in cached
+    
+    def test_modified_file_is_miss(self, tmp_path, audio_file):
+        """Test de invalidación cuando cambia el archivo"""
+        with AnalysisCache(tmp_path / 'cache.db') as cache:
+            cache.put(audio_file, {'format': '.flac'})
+            stat = audio_file.stat()
+            os.utime(audio_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+            assert cache.get(audio_file) is None
+            assert cache.misses == 1
+    
+    def test_errors_not_cached(self, tmp_path, audio_file):
+        """Test de que los resultados con error no se guardan"""
+        with AnalysisCache(tmp_path / 'cache.db') as cache:
+            cache.put(audio_file, {'format': '.flac', 'error': 'fallo'})
+            assert len(cache) == 0
+    
+    def test_options_are_part_of_the_key(self, tmp_path, audio_file):
+        """Test de que cada conjunto de opciones tiene su propia entrada"""
+        assert options_key({'tiered': True, 'windows': 0}) == options_key({'windows': 0, 'tiered': True})
+        with AnalysisCache(tmp_path / 'cache.db', options={'tiered': False}) as cache:
+            cache.put(audio_file, {'format': '.flac', 'cutoff_frequency': 21000.0})
+        with AnalysisCache(tmp_path / 'cache.db', options={'tiered': True}) as cache:
+            assert cache.get(audio_file) is None
+            cache.put(audio_file, {'format': '.flac', 'cutoff_frequency': 19000.0})
+            assert len(cache) == 2
+        with AnalysisCache(tmp_path / 'cache.db', options={'tiered': False}) as cache:
+            assert cache.get(audio_file)['cutoff_frequency'] == 21000.0
+    
+    def test_params_hash_depends_on_verdict_constants(self, monkeypatch):
+        """Test de que las constantes que cambian el veredicto forman parte de la clave"""
+        from src import config
+        
+        for name, value in (('LAME_LOWPASS_MARGIN', 500), ('HIRES_SAMPLE_RATE', 96000),
+                            ('HIRES_BAND_MIN', 22000), ('RMS_FRAME_LENGTH', 1024),
+                            ('ANALYSIS_VERSION', config.ANALYSIS_VERSION + 1)):
+            before = analysis_params_hash()
+            monkeypatch.setattr(config, name, value)
+            assert analysis_params_hash() != before
+    
+    def test_evict_missing_files(self, tmp_path, audio_file):
+        """Test de eliminación de entradas de archivos borrados"""
+        with AnalysisCache(tmp_path / 'cache.db') as cache:
+            cache.put(audio_file, {'format': '.flac'})
+            audio_file.unlink()
+            assert cache.evict() == 1
+            assert len(cache) == 0
+    
+    def test_evict_keeps_entries_of_any_options(self, tmp_path, audio_file, monkeypatch):
+        """Test de que evict sin opciones solo elimina entradas de otros parámetros"""
+        from src import config
+        
+        with AnalysisCache(tmp_path / 'cache.db', options={'tiered': True}) as cache:
+            cache.put(audio_file, {'format': '.flac'})
+        with AnalysisCache(tmp_path / 'cache.db') as cache:
+            assert cache.evict() == 0
+            assert len(cache) == 1
+        
+        monkeypatch.setattr(config, 'ENERGY_THRESHOLD', -50)
+        with AnalysisCache(tmp_path / 'cache.db') as cache:
+            assert cache.evict() == 1
+    
+    def test_entries_written_by_main_survive_evict(self, tmp_path):
+        """Test de que tools cache-evict conserva lo que escribe la CLI"""
+        np = pytest.importorskip('numpy')
+        sf = pytest.importorskip('soundfile')
+        pytest.importorskip('librosa')
+        from click.testing import CliRunner
+        from src.main import main
+        from src.tools import tools
+        
+        library = tmp_path / 'music'
+        library.mkdir()
+        noise = (np.random.default_rng(0).standard_normal(44100) * 0.1).astype(np.float32)
+        for name in ('a.wav', 'b.wav'):
+            sf.write(str(library / name), noise, 44100)
+        db_path = str(tmp_path / 'cache.db')
+        
+        result = CliRunner().invoke(main, ['-p', str(library), '--batch', '-q', '--tiered', '--cache', db_path])
+        assert result.exit_code == 0, result.output
+        result = CliRunner().invoke(tools, ['cache-evict', '--cache', db_path])
+        
+        assert 'Entradas eliminadas: 0 (quedan 2)' in result.output
@@ -0,0 +1,97 @@
+"""
+Tests para el decodificador de WAV y FLAC
+"""
+import threading
+import librosa
+import numpy as np
+import pytest
+import soundfile as sf
+from src.decoder import PCMDecoder, get_decoder, load, parse_wav_header
+
+
+@pytest.fixture
+def stereo():
+    rng = np.random.default_rng(0)
+    return (rng.standard_normal((22050, 2)) * 0.3).clip(-1, 1).astype(np.float32)
+
+
+class TestDecoder:
+    """Tests de equivalencia con librosa.load y de reutilización de buffers"""
+
+    @pytest.mark.parametrize('name,subtype', [
+        ('pcm16.wav', 'PCM_16'),
+        ('pcm24.wav', 'PCM_24'),
+        ('float.wav', 'FLOAT'),
+        ('pcm16.flac', 'PCM_16'),
+    ])
+    def test_matches_librosa(self, tmp_path, stereo, name, subtype):
+        path = tmp_path / name
+        sf.write(str(path), stereo, 22050, subtype=subtype)
+
+        for offset, duration in ((0.0, None), (0.2, 0.5), (0.9, 5.0)):
+            expected, expected_sr = librosa.load(str(path), sr=None, mono=True,
+                                                 offset=offset, duration=duration)
+            samples, sr = load(path, offset, duration)
+
+            assert sr == expected_sr
+            np.testing.assert_array_equal(samples, expected)
+
+    @pytest.mark.parametrize('name,subtype', [('pcm16.wav', 'PCM_16'), ('pcm24.wav', 'PCM_24'),
+                                              ('pcm16.flac', 'PCM_16')])
+    def test_decodes_from_memory(self, tmp_path, stereo, name, subtype):
+        path = tmp_path / name
+        sf.write(str(path), stereo, 22050, subtype=subtype)
+
+        expected, _ = librosa.load(str(path), sr=None, mono=True, offset=0.2, duration=0.5)
+        samples, sr = load(path, 0.2, 0.5, data=path.read_bytes())
+
+        assert sr == 22050
+        np.testing.assert_array_equal(samples, expected)
+
+    def test_reuses_buffer(self, tmp_path, stereo):
+        path = tmp_path / 'a.wav'
+        sf.write(str(path), stereo, 22050, subtype='PCM_16')
+        decoder = PCMDecoder(block_frames=4096)
+
+        first, _ = decoder.decode(path, duration=0.5)
+        second, _ = decoder.decode(path, offset=0.5, duration=0.5)
+
+        assert np.shares_memory(first, second)
+
+    def test_parse_wav_header(self, tmp_path, stereo):
+        path = tmp_path / 'a.wav'
+        sf.write(str(path), stereo, 22050, subtype='PCM_16')
+
+        header = parse_wav_header(path.read_bytes()[:4096])
+
+        assert header['channels'] == 2
+        assert header['sample_rate'] == 22050
+        assert header['bits'] == 16
+        assert header['data_size'] == stereo.size * 2
+        assert parse_wav_header(b'fLaC' + bytes(40)) is None
+
+    def test_threads_do_not_share_buffers(self, tmp_path, stereo):
+        paths = []
+        for i in range(4):
+            path = tmp_path / f'{i}.wav'
+            sf.write(str(path), stereo * (i + 1) / 4, 22050, subtype='FLOAT')
+            paths.append(path)
+        barrier = threading.Barrier(len(paths))
+        decoded = {}
+
+        def decode(path):
+            samples, _ = load(path)
+            # Todos los hilos decodifican antes de que se lea ningún resultado
+            barrier.wait()
+            decoded[path] = (samples.copy(), get_decoder())
+
+        threads = [threading.Thread(target=decode, args=(path,)) for path in paths]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for path in paths:
+            expected, _ = librosa.load(str(path), sr=None, mono=True)
+            np.testing.assert_array_equal(decoded[path][0], expected)
+        assert len({id(decoder) for _, decoder in decoded.values()}) == len(paths)
@@ -0,0 +1,51 @@
+"""
+Tests para la detección de archivos duplicados
+"""
+import os
+from src.dedup import find_duplicates, fan_out
+
+
+def write(path, data: bytes):
+    path.write_bytes(data)
+    return path
+
+
+class TestFindDuplicates:
+    """Tests para find_duplicates y fan_out"""
+
+    def test_groups_identical_files(self, tmp_path):
+        data = os.urandom(5000)
+        original = write(tmp_path / 'a.flac', data)
+        copy = write(tmp_path / 'b.flac', data)
+        other = write(tmp_path / 'c.flac', os.urandom(5000))
+
+        unique, duplicates = find_duplicates([original, copy, other])
+
+        assert unique == [original, other]
+        assert duplicates == {str(original): [copy]}
+
+    def test_same_samples_different_middle(self, tmp_path):
+        """Coinciden los bloques muestreados pero no el contenido: el hash completo los separa"""
+        data = bytearray(os.urandom(4096))
+        original = write(tmp_path / 'a.wav', bytes(data))
+        data[3000] ^= 0xFF
+        changed = write(tmp_path / 'b.wav', bytes(data))
+
+        unique, duplicates = find_duplicates([original, changed], blocks=2, block_size=1024)
+
+        assert unique == [original, changed]
+        assert duplicates == {}
+
+    def test_fan_out_copies_result(self, tmp_path):
+        copy = tmp_path / 'copia' / 'b.FLAC'
+        result = {'file_path': '/x/a.flac', 'file_name': 'a.flac', 'format': '.flac',
+                  'classification': 'fake', 'timings': {'total': {'wall': 1.0, 'cpu': 1.0}}}
+
+        results = list(fan_out([result], {'/x/a.flac': [copy]}))
+
+        assert results[0] is result
+        assert results[1]['file_path'] == str(copy)
+        assert results[1]['format'] == '.flac'
+        assert results[1]['classification'] == 'fake'
+        assert results[1]['duplicate_of'] == '/x/a.flac'
+        assert 'timings' not in results[1]
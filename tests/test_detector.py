@@ -42,3 +42,40 @@ class TestFakeDetector:
         }
         classification, _ = FakeDetector.detect_mp3(analysis)
         assert classification == 'error'
+    
+    def test_detect_hires_upsampling(self):
+        """Test de detección de upsampling en archivos hi-res"""
+        analysis = {
+            'format': '.flac',
+            'cutoff_frequency': 22000,
+            'spectral_presence': 100.0,
+            'has_content_above_20k': True,
+            'has_hires_content': False,
+            'analysis_sample_rate': 96000
+        }
+        classification, _ = FakeDetector.detect(analysis)
+        assert classification == 'suspicious'
+        
+        analysis['has_hires_content'] = True
+        classification, _ = FakeDetector.detect(analysis)
+        assert classification == 'legitimate'
+    
+    def test_detect_batch_matches_detect(self):
+        """Test de equivalencia de detect_batch con detect en los umbrales"""
+        pytest.importorskip('numpy')
+        from src.detector import BATCH_COLUMNS
+        
+        rows = [{'format': '.mp3', 'bitrate': bitrate, 'cutoff_frequency': cutoff}
+                for bitrate in (None, 128000, 192000, 256000, 320000)
+                for cutoff in (None, 0.0, 13999.5, 14000, 16000, 17500, 18000, 19500, 20000)]
+        rows += [{'format': file_format, 'cutoff_frequency': cutoff, 'spectral_presence': presence,
+                  'high_freq_energy': -60.5, 'has_content_above_20k': False,
+                  'has_hires_content': False, 'analysis_sample_rate': 96000}
+                 for file_format in ('.flac', '.WAV')
+                 for cutoff in (None, 0.0, 16499.0, 16500)
+                 for presence in (0.0, 5.0, 15.5, 30.0, 30.1)]
+        rows += [{'format': '.ogg'}, {'format': '.flac', 'error': 'No se pudo cargar el archivo de audio'}]
+        
+        batch = FakeDetector.detect_batch({name: [row.get(name) for row in rows] for name in BATCH_COLUMNS})
+        
+        assert [batch.verdict(i) for i in range(len(batch))] == [FakeDetector.detect(row) for row in rows]
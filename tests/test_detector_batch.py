@@ -0,0 +1,47 @@
+"""
+Tests de propiedades de FakeDetector.detect_batch frente a detect
+"""
+import numpy as np
+from hypothesis import given, settings, strategies as st
+from src.detector import BATCH_COLUMNS, FakeDetector
+
+
+def around(*values):
+    """Valores en los umbrales y justo a cada lado"""
+    return st.sampled_from([v + delta for v in values for delta in (-0.5, 0, 0.5)])
+
+
+results = st.fixed_dictionaries({}, optional={
+    'format': st.sampled_from(['.mp3', '.MP3', '.flac', '.wav', '.ogg', '']),
+    'bitrate': st.one_of(st.none(), st.sampled_from([0, 128000, 192000, 256000, 320000]),
+                         st.integers(0, 500000)),
+    'cutoff_frequency': st.one_of(st.none(), st.just(0.0), st.floats(0, 25000),
+                                  around(14000, 16000, 16500, 17500, 18000, 19500, 20000)),
+    'spectral_presence': st.one_of(st.floats(0, 100), around(0, 5, 15, 30)),
+    'high_freq_energy': st.one_of(st.floats(-120, 0), around(-60)),
+    'has_content_above_20k': st.one_of(st.none(), st.booleans()),
+    'has_hires_content': st.one_of(st.none(), st.booleans()),
+    'analysis_sample_rate': st.one_of(st.none(), st.sampled_from([44100, 48000, 88200, 96000, 192000])),
+    'error': st.text(min_size=1, max_size=20),
+})
+
+
+class TestDetectBatch:
+    """detect_batch debe dar la misma clasificación y razón que detect"""
+
+    @settings(max_examples=300, deadline=None)
+    @given(st.lists(results, max_size=40))
+    def test_matches_detect(self, rows):
+        batch = FakeDetector.detect_batch({name: [row.get(name) for row in rows] for name in BATCH_COLUMNS})
+
+        assert len(batch) == len(rows)
+        assert [batch.verdict(i) for i in range(len(rows))] == [FakeDetector.detect(row) for row in rows]
+
+    @settings(max_examples=100, deadline=None)
+    @given(st.lists(results, max_size=40))
+    def test_accepts_arrays(self, rows):
+        columns = {name: [row.get(name) for row in rows] for name in BATCH_COLUMNS}
+        batch = FakeDetector.detect_batch({name: np.array(values, dtype=object)
+                                           for name, values in columns.items()})
+
+        assert [batch.verdict(i) for i in range(len(rows))] == [FakeDetector.detect(row) for row in rows]
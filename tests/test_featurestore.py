@@ -0,0 +1,97 @@
+"""
+Tests para el almacén de espectros (--features) y la reclasificación
+"""
+import pytest
+
+np = pytest.importorskip('numpy')
+sf = pytest.importorskip('soundfile')
+
+from src.api import analyze_paths
+from src.featurestore import FeatureStore, reclassify
+
+
+@pytest.fixture
+def library(tmp_path):
+    rng = np.random.default_rng(0)
+    sr = 44100
+    full = rng.standard_normal(sr * 2)
+    spectrum = np.fft.rfft(full)
+    spectrum[np.fft.rfftfreq(len(full), 1 / sr) > 16000] = 0
+    limited = np.fft.irfft(spectrum, len(full))
+    sf.write(str(tmp_path / 'full.wav'), (full * 0.1).astype(np.float32), sr)
+    sf.write(str(tmp_path / 'limited.wav'), (limited * 0.1).astype(np.float32), sr)
+    return tmp_path
+
+
+class TestFeatureStore:
+    """Tests para la escritura y lectura del almacén"""
+
+    def test_roundtrip(self, tmp_path):
+        audio = tmp_path / 'a.flac'
+        audio.write_bytes(b'audio')
+        spectrum = np.linspace(-80, 0, 2049)
+
+        with FeatureStore(tmp_path / 'store') as store:
+            store.put(audio, {'file_path': str(audio), 'file_name': 'a.flac', 'format': '.flac',
+                              'dynamic_range': 9.5, 'classification': 'legitimate', 'timings': {}},
+                      spectrum)
+            store.put(tmp_path / 'b.flac', {'error': 'No se pudo cargar'})
+            assert store.has(audio)
+            assert len(store) == 1
+
+        with FeatureStore(tmp_path / 'store') as store:
+            (analysis, stored, previous), = store.entries()
+        assert previous == 'legitimate'
+        assert analysis['format'] == '.flac' and 'timings' not in analysis
+        assert np.allclose(stored, spectrum, atol=0.05)
+
+        audio.write_bytes(b'audio modificado')
+        with FeatureStore(tmp_path / 'store') as store:
+            assert not store.has(audio)
+
+    def test_discards_partial_row(self, tmp_path):
+        audio = tmp_path / 'a.flac'
+        audio.write_bytes(b'audio')
+        with FeatureStore(tmp_path / 'store') as store:
+            store.put(audio, {'format': '.flac'}, np.zeros(2049))
+        with open(tmp_path / 'store' / 'spectra.f16', 'ab') as f:
+            f.write(b'\x00' * 100)
+
+        with FeatureStore(tmp_path / 'store') as store:
+            assert store._rows == 1
+            store.put(audio, {'format': '.flac'}, np.ones(2049))
+            (_, stored, _), = store.entries()
+        assert (tmp_path / 'store' / 'spectra.f16').stat().st_size == 2 * 2049 * 2
+        assert np.all(stored == 1)
+
+    def test_rejects_other_fft_size(self, tmp_path):
+        FeatureStore(tmp_path / 'store').close()
+        with pytest.raises(ValueError):
+            FeatureStore(tmp_path / 'store', n_fft=2048)
+
+
+class TestReclassify:
+    """Tests para la reclasificación desde los espectros guardados"""
+
+    def test_matches_analysis(self, library, tmp_path):
+        with FeatureStore(tmp_path / 'store') as store:
+            original = {r['file_path']: r for r in analyze_paths(sorted(library.glob('*.wav')),
+                                                                 features=store)}
+            reclassified = {r['file_path']: r for _, r in reclassify(store)}
+
+        assert set(reclassified) == set(original)
+        for path, result in original.items():
+            assert reclassified[path]['classification'] == result['classification']
+            assert reclassified[path]['cutoff_frequency'] == pytest.approx(result['cutoff_frequency'], abs=20)
+
+    def test_uses_current_thresholds(self, library, tmp_path, monkeypatch):
+        with FeatureStore(tmp_path / 'store') as store:
+            list(analyze_paths([library / 'limited.wav'], features=store))
+            # Con un umbral de energía mínimo el corte sube al final del rango analizado
+            from src import spectral
+            monkeypatch.setattr(spectral, 'ENERGY_THRESHOLD', -200)
+            (previous, result), = reclassify(store)
+
+        assert previous == 'fake'
+        assert result['cutoff_frequency'] > 16500
+        assert result['classification'] != 'fake'
@@ -0,0 +1,48 @@
+"""
+Tests para el journal de resultados (--journal/--resume)
+"""
+from src.journal import Journal, read_journal
+
+
+def make_result(name):
+    return {'file_path': f'/m/{name}', 'file_name': name, 'classification': 'legitimate',
+            'timings': {'decode': 0.01}}
+
+
+class TestJournal:
+    """Tests para la escritura, recuperación y lectura del journal"""
+
+    def test_appends_across_runs(self, tmp_path):
+        path = tmp_path / 'scan.journal'
+        with Journal(path) as journal:
+            journal.write(make_result('a.flac'))
+        with Journal(path) as journal:
+            journal.write(make_result('b.flac'))
+
+        results = list(read_journal(path))
+        assert [result['file_name'] for result in results] == ['a.flac', 'b.flac']
+        assert results[0]['timings'] == {'decode': 0.01}
+
+    def test_recovers_from_partial_line(self, tmp_path):
+        path = tmp_path / 'scan.journal'
+        with Journal(path) as journal:
+            journal.write(make_result('a.flac'))
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write('{"file_path": "/m/b.fl')
+
+        assert [result['file_name'] for result in read_journal(path)] == ['a.flac']
+        with Journal(path) as journal:
+            journal.write(make_result('c.flac'))
+        assert [result['file_name'] for result in read_journal(path)] == ['a.flac', 'c.flac']
+
+    def test_syncs_periodically(self, tmp_path):
+        path = tmp_path / 'scan.journal'
+        journal = Journal(path, sync_interval=0)
+        journal.write(make_result('a.flac'))
+
+        # Ya está en disco sin cerrar el journal
+        assert [result['file_name'] for result in read_journal(path)] == ['a.flac']
+        journal.close()
+
+    def test_missing_journal_is_empty(self, tmp_path):
+        assert list(read_journal(tmp_path / 'missing.journal')) == []
@@ -0,0 +1,70 @@
+"""
+Tests para la lectura del tag Xing/LAME de MP3
+"""
+import pytest
+from src.mp3info import parse_lame_info, read_lame_info
+
+
+def build_lame_frame(lowpass_byte=160, encoder=b'LAME3.100', vbr_byte=0x01):
+    """
+    Construye una trama MPEG1 Layer III estéreo con cabecera Info y tag LAME
+    (flags: tramas, bytes, TOC y calidad)
+    """
+    frame = bytearray(417)
+    frame[0:4] = b'\xff\xfb\x90\x00'
+    frame[36:40] = b'Info'
+    frame[40:44] = (0x0F).to_bytes(4, 'big')
+    tag = 36 + 8 + 4 + 4 + 100 + 4
+    frame[tag:tag + 9] = encoder
+    frame[tag + 9] = vbr_byte
+    frame[tag + 10] = lowpass_byte
+    frame[tag + 20] = 128
+    return bytes(frame)
+
+
+class TestLameInfo:
+    """Tests para parse_lame_info y read_lame_info"""
+
+    def test_parse_lame_tag(self):
+        """Test de lectura de los campos del tag LAME"""
+        info = parse_lame_info(build_lame_frame())
+
+        assert info['encoder'] == 'LAME3.100'
+        assert info['lowpass'] == 16000
+        assert info['vbr_method'] == 'cbr'
+        assert info['encoder_bitrate'] == 128
+
+    def test_no_xing_header(self):
+        """Test de MP3 sin cabecera Xing/Info"""
+        frame = bytearray(build_lame_frame())
+        frame[36:40] = b'\x00' * 4
+
+        assert parse_lame_info(bytes(frame)) is None
+
+    @pytest.mark.parametrize('size', [40, 42, 44, 100, 180])
+    def test_truncated_header(self, tmp_path, size):
+        """Test de MP3 cortado dentro de la cabecera Xing o del tag LAME"""
+        frame = build_lame_frame()[:size]
+        file_path = tmp_path / 'short.mp3'
+        file_path.write_bytes(frame)
+
+        assert parse_lame_info(frame) is None
+        assert read_lame_info(file_path) is None
+
+    def test_not_mp3(self):
+        """Test de datos que no contienen tramas MPEG"""
+        assert parse_lame_info(b'fLaC' + b'\x00' * 512) is None
+
+    def test_read_skips_id3v2(self, tmp_path):
+        """Test de lectura desde archivo con tag ID3v2 delante"""
+        id3 = b'ID3\x04\x00\x00\x00\x00\x01\x00' + b'\x00' * 128
+        file_path = tmp_path / 'track.mp3'
+        file_path.write_bytes(id3 + build_lame_frame(lowpass_byte=195))
+
+        info = read_lame_info(file_path)
+
+        assert info['lowpass'] == 19500
+
+    def test_missing_file(self, tmp_path):
+        """Test de archivo inexistente"""
+        assert read_lame_info(tmp_path / 'missing.mp3') is None
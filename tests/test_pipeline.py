@@ -0,0 +1,120 @@
+"""
+Tests para el módulo de ejecución del análisis
+"""
+import os
+import sys
+import pytest
+
+pytest.importorskip('librosa')
+
+from pathlib import Path
+from src import pipeline
+
+
+def fake_analyze_file(file_path, options=None, data=None):
+    """Análisis ficticio: los archivos 'crash' tumban el proceso worker"""
+    if 'crash' in file_path.name:
+        os._exit(1)
+    return pipeline.classify({
+        'file_path': str(file_path),
+        'file_name': file_path.name,
+        'format': '.flac',
+        'cutoff_frequency': 22000.0,
+        'spectral_presence': 100.0,
+        'has_content_above_20k': True
+    })
+
+
+def fake_analyze_files(file_paths, options=None, contents=None):
+    return [fake_analyze_file(file_path, options) for file_path in file_paths]
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='Requiere procesos por fork')
+class TestParallelPipeline:
+    """Tests para la ejecución en paralelo"""
+    
+    @pytest.fixture(autouse=True)
+    def fake_analysis(self, monkeypatch):
+        monkeypatch.setattr(pipeline, 'analyze_file', fake_analyze_file)
+        monkeypatch.setattr(pipeline, 'analyze_files', fake_analyze_files)
+    
+    def test_ordered_results(self):
+        """Test de orden determinista con --ordered"""
+        files = [Path(f'track_{i:02d}.flac') for i in range(20)]
+        results = list(pipeline.iter_results(files, jobs=3, ordered=True, batch_size=2))
+        assert [r['file_name'] for r in results] == [f.name for f in files]
+    
+    def test_worker_crash_is_isolated(self):
+        """Test de que un worker caído solo afecta al archivo culpable"""
+        files = [Path(f'track_{i:02d}.flac') for i in range(10)]
+        files.insert(4, Path('crash.flac'))
+        results = list(pipeline.iter_results(files, jobs=2, ordered=True))
+        
+        assert len(results) == len(files)
+        errors = [r['file_name'] for r in results if r['classification'] == 'error']
+        assert errors == ['crash.flac']
+    
+    def test_unordered_results_are_complete(self):
+        """Test de que sin --ordered llegan todos los archivos, una vez cada uno"""
+        files = [Path(f'track_{i:02d}.flac') for i in range(25)]
+        results = list(pipeline.iter_results(files, jobs=3, batch_size=2))
+        
+        assert sorted(r['file_name'] for r in results) == [f.name for f in files]
+    
+    def test_crash_inside_batch_is_isolated(self):
+        """Test de que los demás archivos del lote caído se reanalizan por separado"""
+        files = [Path(f'track_{i:02d}.flac') for i in range(9)]
+        files.insert(2, Path('crash_a.flac'))
+        files.insert(7, Path('crash_b.flac'))
+        results = list(pipeline.iter_results(files, jobs=2, ordered=True, batch_size=3))
+        
+        assert [r['file_name'] for r in results] == [f.name for f in files]
+        errors = [r['file_name'] for r in results if r['classification'] == 'error']
+        assert errors == ['crash_a.flac', 'crash_b.flac']
+        assert all(r['cutoff_frequency'] == 22000.0 for r in results if r['classification'] != 'error')
+    
+    def test_prefetch_releases_budget(self, tmp_path, caplog):
+        """Test de que cada tarea devuelve sus bytes al terminar el worker"""
+        files = []
+        for i in range(12):
+            file_path = tmp_path / f'track_{i:02d}.flac'
+            file_path.write_bytes(bytes(1000))
+            files.append(file_path)
+        files.insert(5, tmp_path / 'crash.flac')
+        files[5].write_bytes(bytes(1000))
+        # Mayor que el presupuesto: no se lee por adelantado
+        files[8].write_bytes(bytes(5000))
+        
+        results = list(pipeline.iter_results(files, jobs=2, ordered=True, prefetch=2500))
+        
+        assert [r['file_name'] for r in results] == [f.name for f in files]
+        assert not [record for record in caplog.records if record.levelname == 'ERROR']
+
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='Requiere procesos por fork')
+def test_parallel_matches_sequential(tmp_path):
+    """Test de que el análisis en el pool da los mismos resultados que en el proceso actual"""
+    np = pytest.importorskip('numpy')
+    sf = pytest.importorskip('soundfile')
+    rng = np.random.default_rng(0)
+    files = []
+    for i in range(4):
+        file_path = tmp_path / f'{i}.wav'
+        noise = rng.standard_normal(44100 * 2)
+        if i % 2:
+            spectrum = np.fft.rfft(noise)
+            spectrum[np.fft.rfftfreq(len(noise), 1 / 44100) > 16000] = 0
+            noise = np.fft.irfft(spectrum, len(noise))
+        sf.write(str(file_path), (noise * 0.1).astype(np.float32), 44100)
+        files.append(file_path)
+    
+    sequential = list(pipeline.iter_results(files))
+    parallel = list(pipeline.iter_results(files, jobs=2, ordered=True))
+    
+    for expected, result in zip(sequential, parallel):
+        assert result['file_path'] == expected['file_path']
+        assert result['classification'] == expected['classification']
+        assert result['cutoff_frequency'] == expected['cutoff_frequency']
+    assert 'legitimate' in {r['classification'] for r in parallel}
+    assert len({r['classification'] for r in parallel}) > 1
@@ -0,0 +1,90 @@
+"""
+Tests para la lectura anticipada de archivos
+"""
+import queue
+import threading
+import time
+from src.prefetch import Prefetcher
+
+
+def make_tasks(paths, cached_index=None):
+    for index, file_path in enumerate(paths):
+        cached = {'file_path': str(file_path)} if index == cached_index else None
+        yield [(index, file_path)], cached
+
+
+class TestPrefetcher:
+    """Tests para Prefetcher.read_ahead"""
+
+    def test_reads_in_order(self, tmp_path):
+        paths = []
+        for i in range(8):
+            path = tmp_path / f'{i}.flac'
+            path.write_bytes(bytes([i]) * 100)
+            paths.append(path)
+
+        with Prefetcher(budget=1000, threads=3) as prefetcher:
+            tasks = []
+            for task in prefetcher.read_ahead(make_tasks(paths, cached_index=2)):
+                tasks.append(task)
+                task[3]()
+
+        assert [items[0][1] for items, _, _, _ in tasks] == paths
+        assert tasks[2][1] is not None and tasks[2][2] is None
+        assert tasks[5][2] == [bytes([5]) * 100]
+
+    def test_respects_budget(self, tmp_path):
+        paths = []
+        for i in range(10):
+            path = tmp_path / f'{i}.flac'
+            path.write_bytes(bytes(100))
+            paths.append(path)
+
+        peak = 0
+        with Prefetcher(budget=300, threads=2) as prefetcher:
+            for _, _, _, release in prefetcher.read_ahead(make_tasks(paths)):
+                peak = max(peak, prefetcher.reserved)
+                release()
+            assert prefetcher.reserved == 0
+
+        # Se puede superar como mucho en una tarea
+        assert 300 <= peak <= 400
+
+    def test_holds_budget_until_release(self, tmp_path):
+        paths = []
+        for i in range(10):
+            path = tmp_path / f'{i}.flac'
+            path.write_bytes(bytes(100))
+            paths.append(path)
+
+        # Como en modo paralelo: otro hilo libera cada tarea cuando "termina"
+        finished = queue.Queue()
+
+        def worker():
+            for release in iter(finished.get, None):
+                time.sleep(0.01)
+                release()
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        peak = 0
+        with Prefetcher(budget=300, threads=2) as prefetcher:
+            for _, _, _, release in prefetcher.read_ahead(make_tasks(paths)):
+                peak = max(peak, prefetcher.reserved)
+                finished.put(release)
+            finished.put(None)
+            thread.join()
+            assert prefetcher.reserved == 0
+
+        assert 300 <= peak <= 400
+
+    def test_skips_large_and_missing_files(self, tmp_path):
+        large = tmp_path / 'large.wav'
+        large.write_bytes(bytes(500))
+        missing = tmp_path / 'missing.wav'
+
+        with Prefetcher(budget=1000, max_file_size=200) as prefetcher:
+            tasks = list(prefetcher.read_ahead(make_tasks([large, missing])))
+
+        assert [contents for _, _, contents, _ in tasks] == [[None], [None]]
+        assert prefetcher.reserved == 0
@@ -0,0 +1,86 @@
+"""
+Tests para la instrumentación por etapas
+"""
+import csv
+import io
+import pytest
+from src.profiling import StageTimer, TimingStats, percentile
+from src.reporter import Reporter
+from src.writers import CSVReportWriter, JSONLinesReportWriter
+
+
+class TestStageTimer:
+    """Tests para StageTimer y TimingStats"""
+
+    def test_stage_accumulates(self):
+        """Test de que una etapa repetida suma sus tiempos"""
+        timer = StageTimer()
+        timer.add('decode', 0.5, 0.25)
+        with timer.stage('decode'):
+            pass
+
+        timings = timer.as_dict()
+        assert timings['decode']['wall'] >= 0.5
+        assert timings['decode']['cpu'] >= 0.25
+
+    def test_percentile_nearest_rank(self):
+        values = list(range(1, 101))
+
+        assert percentile(values, 50) == 50
+        assert percentile(values, 95) == 95
+        assert percentile(values, 100) == 100
+        assert percentile([], 50) is None
+
+    def test_stats_by_format(self):
+        stats = TimingStats()
+        for wall in (0.1, 0.2, 0.3):
+            stats.add('.mp3', {'decode': {'wall': wall, 'cpu': wall}})
+        stats.add('.flac', {'decode': {'wall': 1.0, 'cpu': 1.0}})
+
+        assert stats.summary('decode')['count'] == 4
+        assert stats.summary('decode', '.mp3')['max'] == 0.3
+        assert stats.formats() == ['.flac', '.mp3']
+
+    def test_stats_total_cpu(self):
+        stats = TimingStats()
+        stats.add('.mp3', {'decode': {'wall': 0.5, 'cpu': 0.4}, 'metadata': {'wall': 0.2, 'cpu': 0.01}})
+        stats.add('.flac', {'decode': {'wall': 1.0, 'cpu': 0.9}})
+
+        assert stats.summary('decode')['wall'] == pytest.approx(1.5)
+        assert stats.summary('decode')['cpu'] == pytest.approx(1.3)
+        assert stats.summary('decode', '.flac')['cpu'] == pytest.approx(0.9)
+        assert stats.summary('metadata')['cpu'] == pytest.approx(0.01)
+
+    def test_print_timings_shows_cpu(self):
+        reporter = Reporter(mode='batch', timings=True)
+        reporter.console.file = io.StringIO()
+        reporter.console.width = 200
+        reporter.add_result({'file_path': '/a.mp3', 'format': '.mp3', 'classification': 'fake',
+                             'timings': {'decode': {'wall': 0.2, 'cpu': 0.05}}})
+        reporter.print_timings()
+
+        output = reporter.console.file.getvalue()
+        assert 'Total CPU' in output
+        assert '200.0' in output and '50.0' in output and '25%' in output
+
+
+class TestTimingsExport:
+    """Tests para la exportación opcional de tiempos"""
+
+    RESULT = {'file_path': '/a.mp3', 'classification': 'fake',
+              'timings': {'decode': {'wall': 0.012, 'cpu': 0.01}}}
+
+    def test_csv_timing_columns(self, tmp_path):
+        with CSVReportWriter(tmp_path / 'report.csv', timings=True) as writer:
+            writer.write(self.RESULT)
+
+        with open(tmp_path / 'report.csv', newline='', encoding='utf-8') as f:
+            row = next(csv.DictReader(f))
+        assert row['decode_wall_ms'] == '12.0'
+        assert row['resample_wall_ms'] == ''
+
+    def test_timings_omitted_by_default(self, tmp_path):
+        with JSONLinesReportWriter(tmp_path / 'report.jsonl') as writer:
+            writer.write(self.RESULT)
+
+        assert 'timings' not in (tmp_path / 'report.jsonl').read_text(encoding='utf-8')
@@ -0,0 +1,109 @@
+"""
+Tests para los modos de salida del Reporter
+"""
+import io
+import subprocess
+import sys
+from pathlib import Path
+from src.reporter import Reporter
+
+
+FAKE = {'file_path': '/music/a.mp3', 'file_name': 'a.mp3',
+        'classification': 'fake', 'reason': 'corte bajo'}
+LEGITIMATE = {'file_path': '/music/b.flac', 'file_name': 'b.flac',
+              'classification': 'legitimate', 'reason': 'ok'}
+
+
+def make_reporter(mode, verbose=False):
+    reporter = Reporter(verbose=verbose, mode=mode)
+    reporter.console.file = io.StringIO()
+    return reporter
+
+
+class TestOutputModes:
+    """Tests para los modos interactive, batch y quiet"""
+
+    def test_batch_buffers_plain_lines(self):
+        """Test de agrupación de líneas en texto plano"""
+        reporter = make_reporter('batch')
+        reporter._last_flush = float('inf')  # Sin volcados por tiempo
+
+        reporter.print_result(FAKE)
+        reporter.print_result(LEGITIMATE)
+        assert reporter.console.file.getvalue() == ''
+
+        reporter.flush()
+        output = reporter.console.file.getvalue()
+        assert output == '[X] FAKE: /music/a.mp3 - corte bajo\n'
+        assert '\x1b' not in output
+
+    def test_batch_verbose_includes_legitimate(self):
+        reporter = make_reporter('batch', verbose=True)
+
+        reporter.print_result(LEGITIMATE)
+        reporter.flush()
+
+        assert 'LEGITIMATE: /music/b.flac' in reporter.console.file.getvalue()
+
+    def test_batch_progress_is_rate_limited(self):
+        reporter = make_reporter('batch')
+
+        for done in range(1, 101):
+            reporter.print_progress(done, 100)
+
+        assert reporter.console.file.getvalue().count('Analizados') == 1
+
+    def test_quiet_prints_nothing_per_file(self):
+        reporter = make_reporter('quiet')
+
+        reporter.print_result(FAKE)
+        reporter.print_progress(1, 1)
+        reporter.flush()
+
+        assert reporter.console.file.getvalue() == ''
+
+
+class TestDryRun:
+    """Tests para --dry-run (recuento sin análisis)"""
+
+    def test_estimate_skips_cached(self):
+        reporter = make_reporter('batch')
+        stats = {'.flac': {'files': 100, 'bytes': 3 * 1024 ** 3, 'cached': 40},
+                 '.wav': {'files': 0, 'bytes': 0, 'cached': 0}}
+
+        reporter.print_dry_run(stats, jobs=2)
+
+        output = reporter.console.file.getvalue()
+        assert '.flac: 100 archivos, 3.00 GB, 40 en caché' in output
+        assert '.wav' not in output
+        # 60 archivos pendientes x 0.14 s / 2 procesos = 4 s
+        assert '0h 00m 04s' in output
+
+    def test_cli_does_not_import_dsp_stack(self, tmp_path):
+        """El recuento no debe cargar librosa, numpy, scipy ni rich"""
+        (tmp_path / 'a.mp3').write_bytes(b'\x00' * 10)
+        code = ("import sys; from click.testing import CliRunner; from src.main import main; "
+                f"r = CliRunner().invoke(main, ['-p', {str(tmp_path)!r}, '--dry-run', '--no-cache']); "
+                "assert r.exit_code == 0, r.output; "
+                "print(sorted(m for m in ('librosa', 'numpy', 'scipy', 'soundfile', 'rich', 'pandas') "
+                "if m in sys.modules))")
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                                cwd=Path(__file__).parent.parent, check=True).stdout
+
+        assert output.strip() == '[]'
+
+    def test_help_does_not_import_rich(self):
+        """--help no debe cargar rich"""
+        code = ("import sys; from click.testing import CliRunner; from src.main import main; "
+                "r = CliRunner().invoke(main, ['--help']); assert r.exit_code == 0, r.output; "
+                "assert 'rich' not in sys.modules")
+        subprocess.run([sys.executable, '-c', code], cwd=Path(__file__).parent.parent, check=True)
+
+    def test_dry_run_plain_output(self, capsys):
+        """Test de recuento en texto plano sin crear la consola de rich"""
+        reporter = Reporter(mode='batch')
+        reporter.print_dry_run({'.flac': {'files': 3, 'bytes': 0, 'cached': 0}})
+
+        output = capsys.readouterr().out
+        assert '.flac: 3 archivos, 0.00 GB' in output
+        assert '[cyan]' not in output and reporter._console is None
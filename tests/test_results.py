@@ -0,0 +1,105 @@
+"""
+Tests para el almacén columnar de resultados y la exportación a Parquet
+"""
+import pytest
+from src.detector import FakeDetector
+from src.results import ResultStore
+from src.writers import ParquetReportWriter
+
+
+def make_result(name, classification='fake', **fields):
+    return {'file_path': f'/m/{name}', 'file_name': name, 'format': '.mp3', 'bitrate': 320000,
+            'cutoff_frequency': 16000.5, 'has_content_above_20k': False, 'dynamic_range': None,
+            'classification': classification, 'reason': 'Corte en 16000 Hz', **fields}
+
+
+class TestResultStore:
+    """Tests para ResultStore"""
+
+    def test_roundtrip(self):
+        store = ResultStore()
+        results = [make_result('a.mp3', lame_encoder='LAME3.100', analysis_tier=2),
+                   make_result('b.mp3', timings={'total': {'wall': 0.1, 'cpu': 0.1}}),
+                   {'file_path': '/m/c.flac', 'file_name': 'c.flac', 'format': '.flac',
+                    'error': 'No se pudo cargar', 'classification': 'error', 'reason': 'No se pudo cargar'}]
+        for result in results:
+            store.append(result)
+
+        assert list(store) == results
+        assert isinstance(store[0]['bitrate'], int)
+        assert 'lame_encoder' not in store[1]
+
+    def test_replace_and_pop(self):
+        store = ResultStore()
+        store.append(make_result('a.mp3'))
+        store.append(make_result('b.mp3'))
+
+        store[0] = make_result('c.mp3', classification='legitimate')
+        assert store.class_counts() == {'legitimate': 1, 'fake': 1, 'suspicious': 0, 'error': 0}
+        assert store.pop()['file_name'] == 'b.mp3'
+        assert [result['file_name'] for result in store] == ['c.mp3']
+
+    def test_reasons_are_coded(self):
+        store = ResultStore()
+        results = []
+        for cutoff in (15000.4, 19000.0, 20500.0):
+            result = make_result(f'{cutoff}.mp3', cutoff_frequency=cutoff)
+            result['classification'], result['reason'] = FakeDetector.detect(result)
+            results.append(result)
+        flac = {'file_path': '/m/c.flac', 'format': '.FLAC', 'cutoff_frequency': 21000.0,
+                'spectral_presence': 12.345, 'analysis_sample_rate': 96000, 'has_hires_content': False}
+        flac['classification'], flac['reason'] = FakeDetector.detect(flac)
+        results.append({**flac, 'file_name': 'c.flac'})
+        results.append(make_result('d.mp3', reason='Error en el análisis: disco lleno'))
+        results.append(make_result('e.mp3', reason='Error en el análisis: disco lleno'))
+        for result in results:
+            store.append(result)
+
+        assert list(store) == results
+        # Las razones del detector no se guardan como texto
+        assert store._reason_texts == ['Error en el análisis: disco lleno']
+        assert list(store.to_dataframe()['reason']) == [result['reason'] for result in results]
+
+    def test_to_dataframe(self):
+        store = ResultStore()
+        store.append(make_result('a.mp3'))
+        store.append(make_result('b.mp3', classification='suspicious', bitrate=None))
+
+        df = store.to_dataframe()
+
+        assert list(df['file_name']) == ['a.mp3', 'b.mp3']
+        assert df['classification'].dtype == 'category'
+        assert str(df['bitrate'].dtype) == 'Int64' and df['bitrate'].isna().tolist() == [False, True]
+
+    def test_parquet_writer(self, tmp_path):
+        import pandas as pd
+
+        with ParquetReportWriter(tmp_path / 'report.parquet', timings=True) as writer:
+            writer.write(make_result('a.mp3', timings={'total': {'wall': 0.25, 'cpu': 0.2}}))
+
+        df = pd.read_parquet(tmp_path / 'report.parquet')
+        assert df.loc[0, 'file_path'] == '/m/a.mp3'
+        assert df.loc[0, 'total_wall_ms'] == 250.0
+
+    def test_parquet_writer_row_groups(self, tmp_path):
+        import pandas as pd
+        import pyarrow.parquet as pq
+
+        results = [make_result('a.mp3'), make_result('b.mp3', lame_encoder='LAME3.100', analysis_tier=2),
+                   {'file_path': '/m/c.flac', 'format': '.flac', 'error': 'No se pudo cargar',
+                    'classification': 'error', 'reason': 'No se pudo cargar'},
+                   make_result('d.mp3', classification='legitimate', has_content_above_20k=True),
+                   make_result('e.mp3', duplicate_of='/m/a.mp3')]
+        with ParquetReportWriter(tmp_path / 'report.parquet', row_group=2) as writer:
+            for result in results:
+                writer.write(result)
+            # Solo quedan en memoria las filas del grupo en curso
+            assert len(writer._store) == 1
+
+        assert pq.ParquetFile(tmp_path / 'report.parquet').num_row_groups == 3
+        df = pd.read_parquet(tmp_path / 'report.parquet')
+        assert list(df['file_name']) == ['a.mp3', 'b.mp3', 'c.flac', 'd.mp3', 'e.mp3']
+        assert list(df['classification']) == ['fake', 'fake', 'error', 'legitimate', 'fake']
+        assert df.loc[2, 'error'] == 'No se pudo cargar' and df.loc[4, 'duplicate_of'] == '/m/a.mp3'
+        assert df['reason'].dtype == 'category'
+        assert str(df['bitrate'].dtype) == 'Int64' and pd.isna(df.loc[2, 'bitrate'])
@@ -0,0 +1,90 @@
+"""
+Tests para el escáner de directorios
+"""
+import os
+import pytest
+from src.scanner import AudioScanner
+
+
+@pytest.fixture
+def library(tmp_path):
+    """Árbol de directorios con archivos de audio y de otros tipos"""
+    (tmp_path / 'a' / 'b').mkdir(parents=True)
+    (tmp_path / 'c').mkdir()
+    for name in ['one.mp3', 'cover.jpg', 'a/two.FLAC', 'a/b/three.wav',
+                 'a/b/notes.txt', 'c/four.mp3']:
+        (tmp_path / name).write_bytes(b'\x00')
+    # Directorio con extensión de audio: no es un archivo
+    (tmp_path / 'c' / 'album.mp3').mkdir()
+    return tmp_path
+
+
+def names(paths):
+    return sorted(path.name for path in paths)
+
+
+class TestAudioScanner:
+    """Tests para la clase AudioScanner"""
+
+    @pytest.mark.parametrize('workers', [1, 4])
+    def test_recursive_scan(self, library, workers):
+        """Test de escaneo recursivo, secuencial y en paralelo"""
+        scanner = AudioScanner(str(library), workers=workers)
+
+        assert names(scanner.scan()) == ['four.mp3', 'one.mp3', 'three.wav', 'two.FLAC']
+
+    def test_non_recursive_scan(self, library):
+        """Test de escaneo solo del directorio raíz"""
+        scanner = AudioScanner(str(library), recursive=False)
+
+        assert names(scanner.scan()) == ['one.mp3']
+
+    def test_format_filter(self, library):
+        """Test de filtro por formato sin punto inicial"""
+        scanner = AudioScanner(str(library), formats=['flac'])
+
+        assert names(scanner.scan()) == ['two.FLAC']
+
+    @pytest.mark.skipif(not hasattr(os, 'symlink'), reason='Requiere enlaces simbólicos')
+    def test_symlink_loop_not_followed(self, library):
+        """Test de que un enlace a un directorio antecesor no crea un ciclo"""
+        try:
+            (library / 'a' / 'b' / 'loop').symlink_to(library, target_is_directory=True)
+        except OSError:
+            pytest.skip('No se pueden crear enlaces simbólicos')
+
+        assert len(list(AudioScanner(str(library), workers=4).scan())) == 4
+
+    @pytest.mark.skipif(not hasattr(os, 'symlink'), reason='Requiere enlaces simbólicos')
+    @pytest.mark.parametrize('workers', [1, 4])
+    def test_follows_symlinked_directories(self, library, tmp_path_factory, workers):
+        """Test de que se siguen los enlaces a carpetas y cada una se lista una vez"""
+        outside = tmp_path_factory.mktemp('outside')
+        (outside / 'disc').mkdir()
+        (outside / 'disc' / 'five.flac').write_bytes(b'\x00')
+        try:
+            (library / 'linked').symlink_to(outside, target_is_directory=True)
+            (library / 'a' / 'again').symlink_to(outside, target_is_directory=True)
+        except OSError:
+            pytest.skip('No se pueden crear enlaces simbólicos')
+
+        files = list(AudioScanner(str(library), workers=workers).scan())
+
+        assert names(files) == ['five.flac', 'four.mp3', 'one.mp3', 'three.wav', 'two.FLAC']
+
+    def test_stream_counts_found(self, library):
+        """Test del escaneo en segundo plano"""
+        scanner = AudioScanner(str(library))
+
+        files = list(scanner.stream())
+
+        assert len(files) == 4
+        assert scanner.found == 4
+        assert scanner.finished
+
+    def test_stream_missing_path(self, tmp_path):
+        """Test de propagación de errores del escaneo en segundo plano"""
+        scanner = AudioScanner(str(tmp_path / 'missing'))
+
+        with pytest.raises(FileNotFoundError):
+            list(scanner.stream())
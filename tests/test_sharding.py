@@ -0,0 +1,58 @@
+"""
+Tests para el reparto por shards y la fusión de reportes
+"""
+import pytest
+from src.scanner import AudioScanner
+from src.sharding import check_shards, parse_shard, read_report, shard_of
+from src.writers import CSVReportWriter, JSONLinesReportWriter
+
+
+class TestShards:
+    """Tests para parse_shard, shard_of y el filtro del escáner"""
+
+    def test_parse_shard(self):
+        assert parse_shard('2/8') == (2, 8)
+        for spec in ('0/4', '5/4', '1', 'a/b', '1/0'):
+            with pytest.raises(ValueError):
+                parse_shard(spec)
+
+    def test_shard_is_stable(self):
+        assert shard_of('Album/01 - Intro.flac', 4) == shard_of('Album/01 - Intro.flac', 4)
+        assert {shard_of(f'{i}.mp3', 3) for i in range(100)} == {1, 2, 3}
+
+    def test_scanner_shards_are_disjoint_and_complete(self, tmp_path):
+        for i in range(30):
+            folder = tmp_path / f'album{i % 3}'
+            folder.mkdir(exist_ok=True)
+            (folder / f'{i}.flac').touch()
+
+        everything = set(AudioScanner(str(tmp_path), workers=1).scan())
+        parts = [set(AudioScanner(str(tmp_path), workers=1, shard=(i, 3)).scan()) for i in (1, 2, 3)]
+
+        assert set().union(*parts) == everything
+        assert sum(len(part) for part in parts) == len(everything)
+
+
+class TestMerge:
+    """Tests para la lectura y comprobación de reportes de shards"""
+
+    def test_check_shards(self):
+        assert check_shards({'a.csv': '1/2', 'b.csv': '2/2'}) == []
+
+        problems = check_shards({'a.csv': '1/3', 'b.csv': '1/3'})
+        assert any('solapado' in problem for problem in problems)
+        assert any('2/3, 3/3' in problem for problem in problems)
+        assert check_shards({'a.csv': '1/2', 'b.csv': '2/4'})
+
+    def test_csv_roundtrip(self, tmp_path):
+        result = {'file_path': '/m/a.mp3', 'file_name': 'a.mp3', 'classification': 'fake',
+                  'bitrate': 320000, 'sample_rate': 44100, 'cutoff_frequency': 16000.5,
+                  'dynamic_range': None, 'shard': '1/2'}
+        with CSVReportWriter(tmp_path / 'a.csv') as writer:
+            writer.write(result)
+        with JSONLinesReportWriter(tmp_path / 'a.jsonl') as writer:
+            writer.write(result)
+
+        from_csv = next(read_report(tmp_path / 'a.csv'))
+        assert {key: from_csv[key] for key in result} == result
+        assert next(read_report(tmp_path / 'a.jsonl')) == result
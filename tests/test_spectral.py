@@ -0,0 +1,105 @@
+"""
+Tests para el módulo de cálculo espectral por bloques
+"""
+import pytest
+
+np = pytest.importorskip('numpy')
+librosa = pytest.importorskip('librosa')
+
+from src.spectral import (SpectralAccumulator, accumulate, amplitude_to_db, extract_features,
+                          extract_features_batch)
+
+
+class TestSpectralAccumulator:
+    """Tests para la clase SpectralAccumulator"""
+    
+    @pytest.fixture
+    def signal(self):
+        """Ruido blanco de 5 segundos a 44.1 kHz"""
+        rng = np.random.default_rng(0)
+        return (rng.standard_normal(44100 * 5) * 0.1).astype(np.float32)
+    
+    def test_matches_librosa(self, signal):
+        """Test de equivalencia con librosa.stft y librosa.feature.rms"""
+        expected_spectrum = np.mean(np.abs(librosa.stft(signal, n_fft=4096, hop_length=512)), axis=1)
+        expected_rms = librosa.feature.rms(y=signal, hop_length=512)[0]
+        
+        avg_spectrum, rms = accumulate(signal, n_fft=4096, hop_length=512)
+        
+        assert avg_spectrum.shape == expected_spectrum.shape
+        assert np.allclose(avg_spectrum, expected_spectrum, rtol=1e-4, atol=1e-6)
+        assert np.allclose(rms, expected_rms, rtol=1e-5, atol=1e-7)
+    
+    def test_chunking_does_not_change_result(self, signal):
+        """Test de que el troceado de la entrada no altera el resultado"""
+        whole = SpectralAccumulator()
+        whole.update(signal)
+        
+        chunked = SpectralAccumulator()
+        for start in range(0, len(signal), 1000):
+            chunked.update(signal[start:start + 1000])
+        
+        assert np.allclose(whole.result()[0], chunked.result()[0])
+        assert np.allclose(whole.result()[1], chunked.result()[1])
+
+
+class TestFeatureKernel:
+    """Tests para el kernel de características en una pasada"""
+    
+    def test_amplitude_to_db_matches_librosa(self):
+        """Test de equivalencia con librosa.amplitude_to_db"""
+        rng = np.random.default_rng(1)
+        amplitude = np.abs(rng.standard_normal(2049)) * np.logspace(0, -6, 2049)
+        
+        assert np.allclose(amplitude_to_db(amplitude),
+                           librosa.amplitude_to_db(amplitude, ref=np.max), atol=1e-4)
+        assert np.allclose(amplitude_to_db(amplitude, ref=1.0),
+                           librosa.amplitude_to_db(amplitude), atol=1e-4)
+    
+    def test_cutoff_of_band_limited_noise(self):
+        """Test de frecuencia de corte y presencia de ruido limitado a 16 kHz"""
+        rng = np.random.default_rng(2)
+        sr = 44100
+        spectrum = np.fft.rfft(rng.standard_normal(sr * 3))
+        spectrum[np.fft.rfftfreq(sr * 3, 1 / sr) > 16000] = 0
+        signal = np.fft.irfft(spectrum, sr * 3).astype(np.float32)
+        
+        features, spectrum_db = extract_features(signal, sr)
+        
+        assert 15500 < features['cutoff_frequency'] < 16500
+        assert features['spectral_presence'] == 0
+        assert not features['has_content_above_20k']
+        assert features['has_hires_content'] is None
+        assert spectrum_db.shape == (2049,)
+    
+    def test_segments_are_framed_independently(self):
+        """Test de que cada ventana se enmarca como una señal independiente"""
+        rng = np.random.default_rng(3)
+        first = (rng.standard_normal(30000) * 0.1).astype(np.float32)
+        second = (rng.standard_normal(20000) * 0.1).astype(np.float32)
+        
+        avg_spectrum, rms = accumulate(np.concatenate([first, second]),
+                                       segment_lengths=[len(first), len(second)])
+        
+        spectrum_a, rms_a = accumulate(first)
+        spectrum_b, rms_b = accumulate(second)
+        expected = (spectrum_a * len(rms_a) + spectrum_b * len(rms_b)) / (len(rms_a) + len(rms_b))
+        
+        assert np.allclose(avg_spectrum, expected)
+        assert np.allclose(rms, np.concatenate([rms_a, rms_b]))
+    
+    def test_batch_matches_single_with_padded_buffer(self):
+        """Test de lotes de clips cortos en un buffer más largo que el más largo de ellos"""
+        rng = np.random.default_rng(4)
+        clips = [(rng.standard_normal(n) * 0.1).astype(np.float32) for n in (20000, 7000)]
+        pad = 4096 // 2
+        buffer = np.zeros((len(clips), 44100 * 2 + 2 * pad), dtype=np.float32)
+        for row, clip in enumerate(clips):
+            buffer[row, pad:pad + len(clip)] = clip
+        
+        batch = extract_features_batch(buffer, [len(clip) for clip in clips], 44100, block_frames=32)
+        
+        for clip, (features, spectrum_db) in zip(clips, batch):
+            expected_features, expected_db = extract_features(clip, 44100)
+            assert np.allclose(spectrum_db, expected_db, atol=1e-3)
+            assert features['dynamic_range'] == pytest.approx(expected_features['dynamic_range'], abs=1e-3)
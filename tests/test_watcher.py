@@ -0,0 +1,152 @@
+"""
+Tests para el modo vigilancia
+"""
+import os
+import shutil
+import pytest
+from src.reporter import Reporter
+from src.scanner import AudioScanner
+from src.watcher import LibraryWatcher
+
+
+def bump_mtime(path):
+    """Adelanta el mtime (independiente de la resolución del sistema de archivos)"""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def names(paths):
+    return sorted(path.name for path in paths)
+
+
+class TestLibraryWatcher:
+    """Tests para la clase LibraryWatcher"""
+
+    @pytest.fixture
+    def library(self, tmp_path):
+        (tmp_path / 'album').mkdir()
+        (tmp_path / 'one.mp3').write_bytes(b'\x00')
+        (tmp_path / 'album' / 'two.flac').write_bytes(b'\x00')
+        return tmp_path
+
+    @pytest.fixture
+    def watcher(self, library):
+        watcher = LibraryWatcher(AudioScanner(str(library)), sweep_every=0)
+        changed, removed = watcher.poll()
+        assert names(changed) == ['one.mp3', 'two.flac']
+        assert removed == []
+        return watcher
+
+    @pytest.mark.skipif(not hasattr(os, 'symlink'), reason='Requiere enlaces simbólicos')
+    def test_symlinked_directories(self, library):
+        """Test de enlaces a carpetas: se vigilan una vez y un ciclo no se recorre"""
+        try:
+            (library / 'alias').symlink_to(library / 'album', target_is_directory=True)
+            (library / 'album' / 'loop').symlink_to(library, target_is_directory=True)
+        except OSError:
+            pytest.skip('No se pueden crear enlaces simbólicos')
+        watcher = LibraryWatcher(AudioScanner(str(library)), sweep_every=0)
+
+        changed, _ = watcher.poll()
+        assert names(changed) == ['one.mp3', 'two.flac']
+
+        shutil.rmtree(library / 'album')
+        bump_mtime(library)
+        _, removed = watcher.poll()
+        assert names(removed) == ['two.flac']
+
+    def test_no_changes(self, watcher):
+        """Test de sondeo sin cambios"""
+        assert watcher.poll() == ([], [])
+
+    def test_added_and_removed(self, library, watcher):
+        """Test de altas y bajas en un directorio"""
+        (library / 'album' / 'three.wav').write_bytes(b'\x00')
+        (library / 'one.mp3').unlink()
+        bump_mtime(library)
+        bump_mtime(library / 'album')
+
+        changed, removed = watcher.poll()
+
+        assert names(changed) == ['three.wav']
+        assert names(removed) == ['one.mp3']
+        assert len(watcher) == 2
+
+    def test_new_and_deleted_directories(self, library, watcher):
+        """Test de subdirectorios creados y eliminados"""
+        shutil.rmtree(library / 'album')
+        (library / 'new' / 'cd1').mkdir(parents=True)
+        (library / 'new' / 'cd1' / 'four.mp3').write_bytes(b'\x00')
+        bump_mtime(library)
+
+        changed, removed = watcher.poll()
+
+        assert names(changed) == ['four.mp3']
+        assert names(removed) == ['two.flac']
+
+    def test_in_place_modification_needs_sweep(self, library, watcher):
+        """Test de modificación que no cambia el directorio"""
+        (library / 'album' / 'two.flac').write_bytes(b'\x00\x01')
+        album_stat = os.stat(library / 'album')
+        os.utime(library / 'album', ns=(album_stat.st_atime_ns, album_stat.st_mtime_ns))
+
+        assert watcher.poll() == ([], [])
+
+        watcher.sweep_every = 1
+        changed, _ = watcher.poll()
+
+        assert names(changed) == ['two.flac']
+
+
+class TestReporterUpsert:
+    """Tests para la actualización incremental del reporte"""
+
+    def test_upsert_and_remove(self):
+        reporter = Reporter()
+        for name in ['a', 'b', 'c']:
+            reporter.add_result({'file_path': name, 'classification': 'fake'})
+
+        reporter.upsert_result({'file_path': 'b', 'classification': 'legitimate'})
+        assert reporter.remove_result('a')
+        assert not reporter.remove_result('missing')
+        reporter.upsert_result({'file_path': 'd', 'classification': 'fake'})
+
+        by_path = {r['file_path']: r['classification'] for r in reporter.results}
+        assert by_path == {'b': 'legitimate', 'c': 'fake', 'd': 'fake'}
+
+    def test_export_is_repeatable(self, tmp_path):
+        """Test de exportación repetida (el bitrate no se modifica)"""
+        reporter = Reporter()
+        reporter.add_result({'file_path': 'a', 'bitrate': 320000, 'classification': 'fake'})
+
+        reporter.export_csv(str(tmp_path / 'report.csv'))
+        reporter.export_csv(str(tmp_path / 'report.csv'))
+
+        assert reporter.results[0]['bitrate'] == 320000
+        assert '320 kbps' in (tmp_path / 'report.csv').read_text(encoding='utf-8')
+        assert os.listdir(tmp_path) == ['report.csv']
+
+    def test_export_after_last_removal(self, tmp_path):
+        """Test de que al eliminar el último resultado los reportes quedan vacíos"""
+        import json
+        import pandas as pd
+
+        reporter = Reporter()
+        reporter.add_result({'file_path': 'a', 'format': '.mp3', 'classification': 'fake'})
+        paths = {kind: tmp_path / f"report.{kind}" for kind in ('csv', 'json', 'jsonl', 'parquet')}
+        exports = {'csv': reporter.export_csv, 'json': reporter.export_json,
+                   'jsonl': reporter.export_jsonl, 'parquet': reporter.export_parquet}
+        for kind, export in exports.items():
+            export(str(paths[kind]))
+
+        assert reporter.remove_result('a')
+        for kind, export in exports.items():
+            export(str(paths[kind]))
+
+        assert paths['csv'].read_text(encoding='utf-8').splitlines()[0].startswith('file_name,')
+        assert len(paths['csv'].read_text(encoding='utf-8').splitlines()) == 1
+        assert json.loads(paths['json'].read_text(encoding='utf-8')) == []
+        assert paths['jsonl'].read_text(encoding='utf-8') == ''
+        frame = pd.read_parquet(paths['parquet'])
+        assert len(frame) == 0 and 'classification' in frame.columns
+        assert sorted(os.listdir(tmp_path)) == sorted(path.name for path in paths.values())
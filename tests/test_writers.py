@@ -0,0 +1,71 @@
+"""
+Tests para los escritores incrementales de reportes
+"""
+import csv
+import json
+from src.reporter import Reporter
+from src.writers import CSVReportWriter, JSONReportWriter, JSONLinesReportWriter
+
+
+RESULTS = [
+    {'file_path': '/music/a.mp3', 'file_name': 'a.mp3', 'bitrate': 320000,
+     'classification': 'fake', 'reason': 'corte bajo', 'cutoff_frequency': 16000.0},
+    {'file_path': '/music/ñ.flac', 'file_name': 'ñ.flac', 'bitrate': None,
+     'classification': 'legitimate', 'reason': 'ok', 'cutoff_frequency': 21500.0},
+]
+
+
+class TestReportWriters:
+    """Tests para los escritores CSV, JSON y JSON Lines"""
+
+    def test_json_matches_json_dump(self, tmp_path):
+        """Test de que el JSON incremental es idéntico a json.dump(indent=2)"""
+        with JSONReportWriter(tmp_path / 'report.json') as writer:
+            for result in RESULTS:
+                writer.write(result)
+
+        text = (tmp_path / 'report.json').read_text(encoding='utf-8')
+        assert text == json.dumps(RESULTS, indent=2, ensure_ascii=False)
+
+    def test_jsonl_one_object_per_line(self, tmp_path):
+        with JSONLinesReportWriter(tmp_path / 'report.jsonl') as writer:
+            for result in RESULTS:
+                writer.write(result)
+
+        lines = (tmp_path / 'report.jsonl').read_text(encoding='utf-8').splitlines()
+        assert [json.loads(line) for line in lines] == RESULTS
+
+    def test_csv_does_not_mutate_results(self, tmp_path):
+        """Test de conversión del bitrate sin modificar el resultado"""
+        with CSVReportWriter(tmp_path / 'report.csv') as writer:
+            for result in RESULTS:
+                writer.write(result)
+
+        with open(tmp_path / 'report.csv', newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        assert rows[0]['bitrate'] == '320 kbps'
+        assert rows[1]['file_name'] == 'ñ.flac'
+        assert RESULTS[0]['bitrate'] == 320000
+
+    def test_no_results_no_file(self, tmp_path):
+        """Test de que un reporte sin resultados no crea archivo"""
+        JSONReportWriter(tmp_path / 'report.json').close()
+
+        assert not (tmp_path / 'report.json').exists()
+
+
+class TestStreamingReporter:
+    """Tests para el Reporter sin retención de resultados"""
+
+    def test_streams_and_counts(self, tmp_path):
+        reporter = Reporter(keep_results=False)
+        reporter.open_streams(jsonl_path=str(tmp_path / 'report.jsonl'))
+
+        for result in RESULTS:
+            reporter.add_result(result)
+        reporter.close_streams()
+
+        assert len(reporter.results) == 0
+        assert reporter.counts['fake'] == 1
+        assert reporter.counts['legitimate'] == 1
+        assert len((tmp_path / 'report.jsonl').read_text(encoding='utf-8').splitlines()) == 2